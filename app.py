@@ -2,16 +2,50 @@ from __future__ import annotations
 
 import json
 import math
+import mmap
+import multiprocessing
+import os
+import pickle
 import re
+import struct
 import argparse
+import bisect
+import collections.abc
+import contextlib
+import contextvars
+import gc
+import heapq
+import itertools
 import sys
-from dataclasses import dataclass, field
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 
 DATA_DIR = Path(__file__).resolve().parent / "json"
+SNAPSHOT_ENV_VAR = "SPARQ_DATASTORE_SNAPSHOT"
+CATALOG_BUNDLE_ENV_VAR = "SPARQ_CATALOG_BUNDLE"
+DIAGNOSTICS_ENV_VAR = "SPARQ_DIAGNOSTICS"
+WARM_CC_ENV_VAR = "SPARQ_WARM_CC_ARTICULATION"
+SCHEDULE_DELTA_FORMAT = "sparq-schedule-delta"
+# Written by class_schedule_updater.py next to schedule.json when only open seats moved
+SCHEDULE_DELTA_FILE = "schedule_delta.json"
+SNAPSHOT_VERSION = 8
+
+
+try:
+	import ijson  # optional: incremental parser with a C backend
+except ImportError:
+	ijson = None
+
+JSON_STREAM_CHUNK_SIZE = 1 << 16
 
 
 def _read_json(path: Path) -> Any:
@@ -19,10 +53,79 @@ def _read_json(path: Path) -> Any:
 		return json.load(handle)
 
 
+def _iter_json_array(path: Path) -> Iterator[Any]:
+	"""Yield the elements of a top-level JSON array one at a time.
+
+	Uses ijson when it is installed; otherwise decodes element by element from
+	fixed-size chunks with the stdlib decoder. Either way only one raw element is
+	alive at a time instead of the whole parsed list.
+	"""
+	if ijson is not None:
+		with path.open("rb") as handle:
+			yield from ijson.items(handle, "item", use_float=True)
+		return
+	decoder = json.JSONDecoder()
+	with path.open("r", encoding="utf-8") as handle:
+		buffer = ""
+		position = 0
+		eof = False
+
+		def fill() -> bool:
+			nonlocal buffer, position, eof
+			chunk = handle.read(JSON_STREAM_CHUNK_SIZE)
+			if not chunk:
+				eof = True
+				return False
+			buffer = buffer[position:] + chunk
+			position = 0
+			return True
+
+		def next_token() -> str:
+			nonlocal position
+			while True:
+				while position < len(buffer) and buffer[position] in " \t\r\n":
+					position += 1
+				if position < len(buffer):
+					return buffer[position]
+				if not fill():
+					return ""
+
+		if next_token() != "[":
+			raise ValueError(f"{path}: expected a top-level JSON array")
+		position += 1
+		expect_value = True
+		while True:
+			token = next_token()
+			if token == "]":
+				return
+			if not expect_value:
+				if token != ",":
+					raise ValueError(f"{path}: expected ',' or ']' at offset {position}")
+				position += 1
+				expect_value = True
+				continue
+			while True:
+				try:
+					value, end = decoder.raw_decode(buffer, position)
+				except json.JSONDecodeError:
+					# The element runs past the buffered text; read more and retry
+					if eof or not fill():
+						raise
+					continue
+				# A bare number running up to the buffer edge may have been cut short
+				if not eof and not buffer[end:].strip("0123456789.eE+-") and fill():
+					continue
+				break
+			position = end
+			expect_value = False
+			yield value
+
+
 def _normalize_spaces(value: str) -> str:
 	return re.sub(r"\s+", " ", value.strip())
 
 
+@lru_cache(maxsize=65536)
 def normalize_course_code(value: str) -> str:
 	value = value.replace("_", " ")
 	value = re.sub(r"[^A-Z0-9 ]", " ", value.upper())
@@ -229,6 +332,322 @@ class CourseInfo:
 	corequisites: List[PrereqGroup] = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class CompiledPrereqGroup:
+	kind: str  # "ANY" or "ALL"; SINGLE groups are resolved at compile time
+	option_codes: Tuple[Tuple[str, ...], ...]
+	option_slugs: Tuple[FrozenSet[str], ...]
+
+	@classmethod
+	def compile(cls, group: PrereqGroup) -> Optional[CompiledPrereqGroup]:
+		options = group.course_option_groups()
+		if not options:
+			return None
+		kind = group.kind
+		if kind == "SINGLE" and (len(options) > 1 or len(options[0]) > 1):
+			kind = "ANY"
+		if kind != "ANY":
+			kind = "ALL"
+		return cls(
+			kind=kind,
+			option_codes=tuple(tuple(option) for option in options),
+			option_slugs=tuple(frozenset(course_code_to_slug(code) for code in option) for option in options),
+		)
+
+	def is_satisfied(self, completed: AbstractSet[str], required_slugs: AbstractSet[str]) -> bool:
+		"""Only options that reference a course in the program can block a group."""
+		if self.kind == "ANY":
+			references_program = False
+			for slugs in self.option_slugs:
+				if not slugs.isdisjoint(completed):
+					return True
+				if not references_program and not slugs.isdisjoint(required_slugs):
+					references_program = True
+			return not references_program
+		for slugs in self.option_slugs:
+			if not slugs.isdisjoint(required_slugs) and slugs.isdisjoint(completed):
+				return False
+		return True
+
+
+class PrereqGraph:
+	"""Prerequisite and corequisite groups for every catalog course, compiled once.
+
+	Courses (and any course referenced only as a prerequisite) get integer ids;
+	prereq_ids and dependents hold the edges of the graph in both directions.
+	"""
+
+	def __init__(self, course_catalog: Dict[str, CourseInfo]) -> None:
+		self.ids: Dict[str, int] = {}
+		self.slugs: List[str] = []
+		for slug in course_catalog:
+			self._intern(slug)
+		prerequisites = [self._compile_groups(course_catalog[slug].prerequisites) for slug in self.slugs]
+		corequisites = [self._compile_groups(course_catalog[slug].corequisites) for slug in self.slugs]
+		edges: List[Set[int]] = []
+		for groups in prerequisites:
+			edges.append({self._intern(slug) for group in groups for slugs in group.option_slugs for slug in slugs})
+		# Courses referenced only as prerequisites have no groups of their own
+		missing = len(self.slugs) - len(prerequisites)
+		self.prerequisites: Tuple[Tuple[CompiledPrereqGroup, ...], ...] = tuple(prerequisites) + ((),) * missing
+		self.corequisites: Tuple[Tuple[CompiledPrereqGroup, ...], ...] = tuple(corequisites) + ((),) * missing
+		edges.extend(set() for _ in range(missing))
+		self.prereq_ids: Tuple[FrozenSet[int], ...] = tuple(frozenset(targets) for targets in edges)
+		dependents: List[Set[int]] = [set() for _ in self.slugs]
+		for course_id, targets in enumerate(edges):
+			for target in targets:
+				dependents[target].add(course_id)
+		self.dependents: Tuple[FrozenSet[int], ...] = tuple(frozenset(sources) for sources in dependents)
+
+	def _intern(self, slug: str) -> int:
+		course_id = self.ids.get(slug)
+		if course_id is None:
+			course_id = len(self.slugs)
+			self.ids[slug] = course_id
+			self.slugs.append(slug)
+		return course_id
+
+	@staticmethod
+	def _compile_groups(groups: Iterable[PrereqGroup]) -> Tuple[CompiledPrereqGroup, ...]:
+		compiled: List[CompiledPrereqGroup] = []
+		for group in groups:
+			entry = CompiledPrereqGroup.compile(group)
+			if entry is not None:
+				compiled.append(entry)
+		return tuple(compiled)
+
+	def prerequisites_for(self, course_slug: str) -> Tuple[CompiledPrereqGroup, ...]:
+		course_id = self.ids.get(course_slug)
+		if course_id is None:
+			return ()
+		return self.prerequisites[course_id]
+
+	def corequisites_for(self, course_slug: str) -> Tuple[CompiledPrereqGroup, ...]:
+		course_id = self.ids.get(course_slug)
+		if course_id is None:
+			return ()
+		return self.corequisites[course_id]
+
+	def prerequisites_satisfied(
+		self,
+		course_slug: str,
+		completed: AbstractSet[str],
+		required_slugs: AbstractSet[str],
+	) -> bool:
+		for group in self.prerequisites_for(course_slug):
+			if not group.is_satisfied(completed, required_slugs):
+				return False
+		return True
+
+
+class GESuggestionIndex:
+	"""Lookups behind GE course suggestions, built once from the GE catalog.
+
+	area_courses keeps the catalog spellings (e.g. "||ENGL_1A") because suggestions
+	are returned as listed; area_entries and slug_areas are keyed by course slug.
+	"""
+
+	LAB_SCIENCE_AREA = "GE_AREA_5C"
+
+	def __init__(self, ge_catalog: Dict[str, Dict[str, Any]]) -> None:
+		self.area_courses: Dict[str, FrozenSet[str]] = {}
+		self.area_entries: Dict[str, Dict[str, str]] = {}
+		slug_areas: Dict[str, Set[str]] = {}
+		for area, info in ge_catalog.items():
+			courses = [course for course in info.get("courses", []) if isinstance(course, str)]
+			self.area_courses[area] = frozenset(courses)
+			entries: Dict[str, str] = {}
+			for course in courses:
+				slug = course_code_to_slug(course)
+				entries.setdefault(slug, course.lstrip("|&").strip())
+				slug_areas.setdefault(slug, set()).add(area)
+			self.area_entries[area] = entries
+		self.slug_areas: Dict[str, FrozenSet[str]] = {
+			slug: frozenset(areas) for slug, areas in slug_areas.items()
+		}
+		self._ge_catalog = ge_catalog
+		self._intersections: Dict[Tuple[str, ...], Optional[List[str]]] = {}
+
+	def areas_for(self, course_code: str) -> FrozenSet[str]:
+		return self.slug_areas.get(course_code_to_slug(course_code), frozenset())
+
+	def courses_for_areas(self, areas: Sequence[str]) -> Optional[List[str]]:
+		"""Courses listed under every area; None when none of the areas list courses."""
+		if len(areas) == 1:
+			info = self._ge_catalog.get(areas[0])
+			# A copy: callers hand the list to responses, and the catalog is shared
+			courses = info.get("courses", []) if info else None
+			return list(courses) if courses is not None else None
+		key = tuple(areas)
+		if key not in self._intersections:
+			candidate_sets = [self.area_courses[area] for area in areas if self.area_courses.get(area)]
+			if candidate_sets:
+				self._intersections[key] = list(candidate_sets[0].intersection(*candidate_sets[1:]))
+			else:
+				self._intersections[key] = None
+		cached = self._intersections[key]
+		return list(cached) if cached is not None else None
+
+	def lab_science_courses(self, course_codes: Iterable[str]) -> List[str]:
+		"""Return the GE catalog spelling of each code that is approved for Area 5C."""
+		entries = self.area_entries.get(self.LAB_SCIENCE_AREA, {})
+		results: List[str] = []
+		for code in course_codes:
+			entry = entries.get(course_code_to_slug(code.lstrip("|&").strip()))
+			if entry is not None:
+				results.append(entry)
+		return results
+
+
+def _parse_equivalent_combos(equivalents: List[str]) -> List[Tuple[str, Tuple[str, ...]]]:
+	"""Split an articulation "equivalents" list on its ||/&& markers into (kind, codes)."""
+	combos: List[Tuple[str, Tuple[str, ...]]] = []
+	current: List[str] = []
+	current_kind = "SINGLE"
+	for item in equivalents:
+		if item.startswith("||"):
+			if current:
+				combos.append((current_kind, tuple(current)))
+			current_kind = "ANY"
+			current = [normalize_course_code(item[2:])]
+		elif item.startswith("&&"):
+			if current:
+				combos.append((current_kind, tuple(current)))
+			current_kind = "ALL"
+			current = [normalize_course_code(item[2:])]
+		else:
+			if not current:
+				current_kind = "SINGLE"
+			current.append(normalize_course_code(item))
+	if current:
+		combos.append((current_kind, tuple(current)))
+	return [(kind, codes) for kind, codes in combos if codes and codes[0] != "NONE"]
+
+
+class ArticulationIndex:
+	"""One community college's articulation agreement, compiled for transcript matching.
+
+	combos[i] lists the (kind, cc_codes) ways to earn slugs[i], in agreement order;
+	by_cc_course maps a normalized CC course code to the positions it can help earn.
+	"""
+
+	def __init__(self, institution: str, data: Dict[str, Any]) -> None:
+		self.institution = institution
+		positions: Dict[str, int] = {}
+		slugs: List[str] = []
+		combos: List[List[Tuple[str, Tuple[str, ...]]]] = []
+		for section in data.get("output", []):
+			for mapped in section.get("courses", []):
+				sjsu_course = normalize_course_code(mapped.get("sjsu_course", ""))
+				if not sjsu_course or sjsu_course == "NONE":
+					continue
+				slug = course_code_to_slug(sjsu_course)
+				position = positions.get(slug)
+				if position is None:
+					position = positions[slug] = len(slugs)
+					slugs.append(slug)
+					combos.append([])
+				combos[position].extend(_parse_equivalent_combos(mapped.get("equivalents") or []))
+		by_cc_course: Dict[str, Set[int]] = {}
+		for position, slug_combos in enumerate(combos):
+			for _, codes in slug_combos:
+				for code in codes:
+					by_cc_course.setdefault(code, set()).add(position)
+		self.slugs: Tuple[str, ...] = tuple(slugs)
+		self.combos: Tuple[Tuple[Tuple[str, Tuple[str, ...]], ...], ...] = tuple(tuple(c) for c in combos)
+		self.by_cc_course: Dict[str, Tuple[int, ...]] = {
+			code: tuple(sorted(found)) for code, found in by_cc_course.items()
+		}
+
+	def match(self, student_cc: AbstractSet[str]) -> Iterator[Tuple[str, List[str]]]:
+		"""Yield (slug, cc_courses_used) for each SJSU course the transcript earns.
+
+		Only mappings that mention one of the student's courses are looked at, and they
+		are yielded in agreement order so results match a full scan.
+		"""
+		candidates: Set[int] = set()
+		for code in student_cc:
+			candidates.update(self.by_cc_course.get(code, ()))
+		for position in sorted(candidates):
+			for kind, codes in self.combos[position]:
+				if kind == "ALL":
+					if all(code in student_cc for code in codes):
+						yield self.slugs[position], list(codes)
+						break
+				else:  # ANY or SINGLE
+					used = next((code for code in codes if code in student_cc), None)
+					if used is not None:
+						yield self.slugs[position], [used]
+						break
+
+
+def _articulation_filename(institution: str) -> str:
+	return re.sub(r"[^a-z0-9]+", "_", institution.lower()).strip("_") + ".json"
+
+
+_WORKER_BUNDLES: Dict[Path, CatalogBundle] = {}
+
+
+def _compile_articulation_file(path: Path, bundle: Optional[Any] = None) -> Tuple[str, ArticulationIndex, float]:
+	"""Compile one agreement, from the catalog bundle (or its path, in a worker process) when current."""
+	started = time.perf_counter()
+	if isinstance(bundle, Path):
+		if bundle not in _WORKER_BUNDLES:
+			_WORKER_BUNDLES[bundle] = CatalogBundle(bundle)
+		bundle = _WORKER_BUNDLES[bundle]
+	name = f"community_college/{path.name}"
+	if bundle is not None and bundle.is_current(name, path):
+		data = bundle.view(name)
+	else:
+		data = _read_json(path)
+	index = ArticulationIndex(path.stem.replace("_", " "), data)
+	return path.stem, index, time.perf_counter() - started
+
+
+def _current_rss_bytes() -> Optional[int]:
+	"""Resident set size of this process, or None where it cannot be read."""
+	try:
+		with open("/proc/self/statm", "r", encoding="ascii") as handle:
+			return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except (OSError, ValueError, IndexError, AttributeError):
+		pass
+	try:
+		import resource
+	except ImportError:
+		return None
+	# Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class ArticulationWarmupReport:
+	file_seconds: Dict[str, float] = field(default_factory=dict)
+	errors: Dict[str, str] = field(default_factory=dict)
+	skipped: List[str] = field(default_factory=list)
+	total_seconds: float = 0.0
+	rss_before: Optional[int] = None
+	rss_after: Optional[int] = None
+
+	@property
+	def rss_delta(self) -> Optional[int]:
+		if self.rss_before is None or self.rss_after is None:
+			return None
+		return self.rss_after - self.rss_before
+
+	def format(self, slowest: int = 5) -> str:
+		lines = [f"Warmed {len(self.file_seconds)} articulation files in {self.total_seconds:.2f}s"]
+		if self.rss_after is not None:
+			lines.append(f"RSS: {self.rss_after / 2**20:.1f} MiB ({(self.rss_delta or 0) / 2**20:+.1f} MiB)")
+		for name, seconds in sorted(self.file_seconds.items(), key=lambda item: -item[1])[:slowest]:
+			lines.append(f"  {name}: {seconds * 1000:.1f} ms")
+		if self.skipped:
+			lines.append(f"Skipped {len(self.skipped)} files whose names no institution lookup resolves to")
+		for name, error in self.errors.items():
+			lines.append(f"  {name}: FAILED ({error})")
+		return "\n".join(lines)
+
+
 @dataclass
 class Completion:
 	code: str
@@ -279,8 +698,24 @@ def _parse_days(days_string: str) -> List[str]:
 	return results
 
 
-@dataclass
+DAY_BITS = {day: 1 << position for position, day in enumerate(DAY_ORDER)}
+# Every possible day set, shared by all sections with the same meeting days
+_DAY_SETS: Tuple[FrozenSet[str], ...] = tuple(
+	frozenset(day for day, bit in DAY_BITS.items() if mask & bit) for mask in range(1 << len(DAY_ORDER))
+)
+
+
+def _day_mask(days: Iterable[str]) -> int:
+	mask = 0
+	for day in days:
+		mask |= DAY_BITS.get(day, 0)
+	return mask
+
+
+@dataclass(slots=True)
 class ScheduleSection:
+	"""One schedule row. Slotted, with days stored as a 7-bit mask (see DAY_BITS)."""
+
 	course_slug: str
 	course_code: str
 	section: str
@@ -291,7 +726,7 @@ class ScheduleSection:
 	units: float
 	section_type: str
 	day_pattern: str
-	day_set: Set[str]
+	day_mask: int
 	start_minutes: Optional[int]
 	end_minutes: Optional[int]
 	time_string: str
@@ -300,6 +735,11 @@ class ScheduleSection:
 	dates: str
 	open_seats: Optional[int]
 	notes: str
+	section_id: int = -1  # position in DataStore.section_index.sections
+
+	@property
+	def day_set(self) -> FrozenSet[str]:
+		return _DAY_SETS[self.day_mask]
 
 	def to_plan_dict(self) -> Dict[str, Any]:
 		return {
@@ -316,6 +756,159 @@ class ScheduleSection:
 		}
 
 
+def _parse_open_seats(value: Any) -> Optional[int]:
+	try:
+		return int(value)
+	except (TypeError, ValueError):
+		return None
+
+
+def _section_key(section: ScheduleSection) -> str:
+	"""Class Number identifies a section across schedule refreshes; fall back to its name."""
+	return section.class_number or section.section
+
+
+_SECTION_VALUE_FIELDS = tuple(item.name for item in fields(ScheduleSection) if item.name != "section_id")
+
+
+def _section_values(section: ScheduleSection) -> Tuple[Any, ...]:
+	return tuple(getattr(section, name) for name in _SECTION_VALUE_FIELDS)
+
+
+class ScheduleSectionIndex:
+	"""One loaded schedule: sections per course plus secondary indexes by integer id.
+
+	Building the index numbers every section (ScheduleSection.section_id) course by
+	course, so course_ids[slug] is a contiguous range. Derived id sets (e.g. "meets on
+	a day in this mask") are cached, since requests tend to repeat the same filters.
+	Apart from open_seats (see DataStore.apply_schedule_delta), the index is never
+	modified after it is built, which is what lets DataStore.reload_schedule swap in
+	a new one under running requests.
+	"""
+
+	CACHE_LIMIT = 1024
+
+	def __init__(self, schedule_index: Dict[str, List[ScheduleSection]]) -> None:
+		self.courses = schedule_index
+		self.sections: List[ScheduleSection] = []
+		self.course_ids: Dict[str, range] = {}
+		self.by_day_mask: Dict[int, Set[int]] = {}
+		self.by_day_pattern: Dict[str, Set[int]] = {}
+		self.by_mode: Dict[str, Set[int]] = {}
+		self.by_type: Dict[str, Set[int]] = {}
+		self.by_instructor: Dict[str, Set[int]] = {}
+		self.by_class_number: Dict[str, List[ScheduleSection]] = {}
+		for course_slug, sections in schedule_index.items():
+			start = len(self.sections)
+			for section in sections:
+				section_id = len(self.sections)
+				section.section_id = section_id
+				self.sections.append(section)
+				self.by_day_mask.setdefault(section.day_mask, set()).add(section_id)
+				self.by_day_pattern.setdefault(section.day_pattern, set()).add(section_id)
+				self.by_mode.setdefault(section.instruction_mode.strip().lower(), set()).add(section_id)
+				self.by_type.setdefault(section.section_type.strip().lower(), set()).add(section_id)
+				self.by_instructor.setdefault(section.instructor.strip().lower(), set()).add(section_id)
+				if section.class_number:
+					self.by_class_number.setdefault(section.class_number, []).append(section)
+			self.course_ids[course_slug] = range(start, len(self.sections))
+		timed = [section for section in self.sections if section.start_minutes is not None]
+		self._by_start = sorted(timed, key=lambda section: section.start_minutes)
+		self._start_keys = [section.start_minutes for section in self._by_start]
+		ended = [section for section in self.sections if section.end_minutes is not None]
+		self._by_end = sorted(ended, key=lambda section: section.end_minutes)
+		self._end_keys = [section.end_minutes for section in self._by_end]
+		self._derived: Dict[Tuple[Any, ...], FrozenSet[int]] = {}
+
+	def __len__(self) -> int:
+		return len(self.sections)
+
+	def by_key(self) -> Dict[str, ScheduleSection]:
+		return {_section_key(section): section for section in self.sections}
+
+	def _cached(self, key: Tuple[Any, ...], build: Callable[[], Iterable[int]]) -> FrozenSet[int]:
+		ids = self._derived.get(key)
+		if ids is None:
+			if len(self._derived) >= self.CACHE_LIMIT:
+				self._derived.clear()
+			ids = self._derived[key] = frozenset(build())
+		return ids
+
+	def _days_where(self, key: Tuple[Any, ...], predicate: Callable[[int], bool]) -> FrozenSet[int]:
+		return self._cached(
+			key,
+			lambda: (section_id for mask, ids in self.by_day_mask.items() if predicate(mask) for section_id in ids),
+		)
+
+	def meeting_on_any(self, day_mask: int) -> FrozenSet[int]:
+		return self._days_where(("any", day_mask), lambda mask: bool(mask & day_mask))
+
+	def meeting_outside(self, day_mask: int) -> FrozenSet[int]:
+		return self._days_where(("outside", day_mask), lambda mask: bool(mask & ~day_mask))
+
+	def missing_any_of(self, day_mask: int) -> FrozenSet[int]:
+		"""Sections with scheduled days that do not include every day in day_mask."""
+		return self._days_where(("missing", day_mask), lambda mask: bool(mask and day_mask & ~mask))
+
+	def starting_before(self, minutes: int) -> FrozenSet[int]:
+		return self._cached(
+			("start<", minutes),
+			lambda: (section.section_id for section in self._by_start[: bisect.bisect_left(self._start_keys, minutes)]),
+		)
+
+	def ending_after(self, minutes: int) -> FrozenSet[int]:
+		return self._cached(
+			("end>", minutes),
+			lambda: (section.section_id for section in self._by_end[bisect.bisect_right(self._end_keys, minutes) :]),
+		)
+
+	def matching(self, field_name: str, keys: Iterable[str]) -> FrozenSet[int]:
+		"""Union of one of the by_* indexes over keys, e.g. matching("mode", {"online"})."""
+		index: Dict[str, Set[int]] = getattr(self, f"by_{field_name}")
+		keys = frozenset(keys)
+		return self._cached(
+			(field_name, keys),
+			lambda: (section_id for key in keys for section_id in index.get(key, ())),
+		)
+
+
+@dataclass
+class ScheduleReload:
+	"""Sections (by Class Number) that differ between two loaded schedules."""
+
+	added: List[str] = field(default_factory=list)
+	removed: List[str] = field(default_factory=list)
+	changed: List[str] = field(default_factory=list)
+	courses: Set[str] = field(default_factory=set)
+	unknown: List[str] = field(default_factory=list)  # delta entries with no matching section
+	seconds: float = 0.0
+
+	@property
+	def has_changes(self) -> bool:
+		return bool(self.added or self.removed or self.changed)
+
+	@classmethod
+	def compare(cls, old: ScheduleSectionIndex, new: ScheduleSectionIndex) -> ScheduleReload:
+		report = cls()
+		old_sections = old.by_key()
+		new_sections = new.by_key()
+		for key, section in new_sections.items():
+			previous = old_sections.get(key)
+			if previous is None:
+				report.added.append(key)
+			elif _section_values(previous) != _section_values(section):
+				report.changed.append(key)
+				report.courses.add(previous.course_slug)
+			else:
+				continue
+			report.courses.add(section.course_slug)
+		for key, section in old_sections.items():
+			if key not in new_sections:
+				report.removed.append(key)
+				report.courses.add(section.course_slug)
+		return report
+
+
 SEMESTER_ORDER = {"Fall": 0, "Spring": 1, "Summer": 2, "Winter": 3}
 
 
@@ -371,24 +964,575 @@ class StudentRecord:
 			self.fulfilled_ai.setdefault(area, completion.source)
 
 
+CATALOG_BUNDLE_MAGIC = b"SPARQCB\x00"
+CATALOG_BUNDLE_VERSION = 1
+# Directories under data_dir whose JSON files go into a catalog bundle
+CATALOG_BUNDLE_DIRECTORIES = ("roadmaps", "academic_catalog", "community_college")
+
+# magic, version, document count, then byte offsets of the string table, the
+# value region, the document directory and the end of the file
+_BUNDLE_HEADER = struct.Struct("<8sIIQQQQ")
+# name string id, root value offset, source size, source mtime_ns
+_BUNDLE_DOCUMENT = struct.Struct("<IIqq")
+
+# Every value starts with a u32 tag and is padded to a 4-byte boundary
+_TAG_MISSING, _TAG_NULL, _TAG_TRUE, _TAG_FALSE, _TAG_INT, _TAG_FLOAT, _TAG_STR, _TAG_LIST, _TAG_DICT, _TAG_TABLE, _TAG_BIGINT = range(11)
+# Marks an offset not yet in a decode memo (None is a valid decoded value)
+_UNDECODED = object()
+
+
+def _table_columns(rows: List[Any]) -> Optional[List[str]]:
+	"""Column order for a list of records, or None when it is not a table.
+
+	Records may omit keys, but the keys they have must appear in one shared order
+	so a decoded row comes back with its original key order.
+	"""
+	if len(rows) < 2 or not all(type(row) is dict for row in rows):
+		return None
+	columns: List[str] = []
+	position: Dict[str, int] = {}
+	for row in rows:
+		last = -1
+		for key in row:
+			if type(key) is not str:
+				return None
+			index = position.get(key)
+			if index is None:
+				index = position[key] = len(columns)
+				columns.append(key)
+			if index < last:
+				return None
+			last = index
+	return columns
+
+
+class _CatalogBundleWriter:
+	"""Encodes JSON documents into one string table and one hash-consed value region."""
+
+	def __init__(self) -> None:
+		self.strings: Dict[str, int] = {}
+		self.values = bytearray(struct.pack("<I", _TAG_MISSING))
+		self._offsets: Dict[bytes, int] = {}
+		self.documents: List[Tuple[int, int, int, int]] = []
+
+	def string(self, value: str) -> int:
+		string_id = self.strings.get(value)
+		if string_id is None:
+			string_id = self.strings[value] = len(self.strings)
+		return string_id
+
+	def _emit(self, encoded: bytes) -> int:
+		# Identical values (scalars and whole subtrees alike) are stored once
+		offset = self._offsets.get(encoded)
+		if offset is None:
+			offset = self._offsets[encoded] = len(self.values)
+			self.values += encoded
+		return offset
+
+	def value(self, value: Any) -> int:
+		if value is None:
+			return self._emit(struct.pack("<I", _TAG_NULL))
+		if value is True or value is False:
+			return self._emit(struct.pack("<I", _TAG_TRUE if value else _TAG_FALSE))
+		if isinstance(value, int):
+			if -(1 << 63) <= value < (1 << 63):
+				return self._emit(struct.pack("<Iq", _TAG_INT, value))
+			return self._emit(struct.pack("<II", _TAG_BIGINT, self.string(str(value))))
+		if isinstance(value, float):
+			return self._emit(struct.pack("<Id", _TAG_FLOAT, value))
+		if isinstance(value, str):
+			return self._emit(struct.pack("<II", _TAG_STR, self.string(value)))
+		if isinstance(value, dict):
+			keys = [self.string(str(key)) for key in value]
+			offsets = [self.value(item) for item in value.values()]
+			return self._emit(struct.pack(f"<II{len(keys)}I{len(offsets)}I", _TAG_DICT, len(keys), *keys, *offsets))
+		if isinstance(value, (list, tuple)):
+			columns = _table_columns(value)
+			if columns is not None:
+				# Column-major: all of one field's value offsets are contiguous
+				cells = [
+					self.value(row[column]) if column in row else 0
+					for column in columns
+					for row in value
+				]
+				keys = [self.string(column) for column in columns]
+				return self._emit(struct.pack(
+					f"<III{len(keys)}I{len(cells)}I", _TAG_TABLE, len(value), len(keys), *keys, *cells
+				))
+			offsets = [self.value(item) for item in value]
+			return self._emit(struct.pack(f"<II{len(offsets)}I", _TAG_LIST, len(offsets), *offsets))
+		raise TypeError(f"Cannot store {type(value).__name__} in a catalog bundle")
+
+	def add_document(self, name: str, path: Path) -> None:
+		stat = path.stat()
+		root = self.value(_read_json(path))
+		self.documents.append((self.string(name), root, stat.st_size, stat.st_mtime_ns))
+
+	def write(self, path: Path) -> None:
+		strings = [value.encode("utf-8") for value in self.strings]
+		string_offsets = [0]
+		for encoded in strings:
+			string_offsets.append(string_offsets[-1] + len(encoded))
+		string_table = struct.pack(f"<I{len(string_offsets)}I", len(strings), *string_offsets) + b"".join(strings)
+		string_table += b"\0" * (-len(string_table) % 8)
+		directory = b"".join(_BUNDLE_DOCUMENT.pack(*entry) for entry in self.documents)
+
+		strings_offset = _BUNDLE_HEADER.size
+		values_offset = strings_offset + len(string_table)
+		documents_offset = values_offset + len(self.values) + (-len(self.values) % 8)
+		end = documents_offset + len(directory)
+		end += -end % 8
+		header = _BUNDLE_HEADER.pack(
+			CATALOG_BUNDLE_MAGIC, CATALOG_BUNDLE_VERSION, len(self.documents),
+			strings_offset, values_offset, documents_offset, end,
+		)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = path.with_name(path.name + ".tmp")
+		with tmp_path.open("wb") as handle:
+			handle.write(header)
+			handle.write(string_table)
+			handle.write(self.values)
+			handle.write(b"\0" * (documents_offset - values_offset - len(self.values)))
+			handle.write(directory)
+			handle.write(b"\0" * (end - documents_offset - len(directory)))
+		os.replace(tmp_path, path)
+
+
+def catalog_bundle_sources(data_dir: Path = DATA_DIR) -> List[str]:
+	"""Names (relative to data_dir) of the JSON files a catalog bundle holds."""
+	data_dir = Path(data_dir)
+	names = [name for name in DataStore.SNAPSHOT_SOURCES if (data_dir / name).exists()]
+	for directory in CATALOG_BUNDLE_DIRECTORIES:
+		folder = data_dir / directory
+		if folder.is_dir():
+			names.extend(f"{directory}/{path.name}" for path in sorted(folder.glob("*.json")) if path.is_file())
+	return names
+
+
+def build_catalog_bundle(path: Path, data_dir: Path = DATA_DIR) -> CatalogBundle:
+	"""Encode every DataStore JSON source under data_dir into a bundle at path and open it."""
+	writer = _CatalogBundleWriter()
+	for name in catalog_bundle_sources(data_dir):
+		writer.add_document(name, Path(data_dir) / name)
+	writer.write(Path(path))
+	return CatalogBundle(path)
+
+
+class BundleMapping(collections.abc.Mapping):
+	"""Read-only dict view over a bundle object or table row; values decode on access."""
+
+	__slots__ = ("_bundle", "_keys", "_cells", "_positions")
+
+	def __init__(self, bundle: CatalogBundle, keys: List[str], cells: List[int]) -> None:
+		self._bundle = bundle
+		self._keys = keys
+		self._cells = cells
+		self._positions: Optional[Dict[str, int]] = None
+
+	def __getitem__(self, key: str) -> Any:
+		if self._positions is None:
+			self._positions = {name: index for index, name in enumerate(self._keys)}
+		return self._bundle._view(self._cells[self._positions[key]])
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(self._keys)
+
+	def __len__(self) -> int:
+		return len(self._keys)
+
+	def materialize(self) -> Dict[str, Any]:
+		return {key: self._bundle._decode(cell) for key, cell in zip(self._keys, self._cells)}
+
+
+class BundleSequence(collections.abc.Sequence):
+	"""Read-only list view over a bundle list or table; elements decode on access."""
+
+	__slots__ = ("_bundle", "_word", "_count", "_table")
+
+	def __init__(self, bundle: CatalogBundle, word: int) -> None:
+		self._bundle = bundle
+		self._word = word
+		self._table = bundle._words[word] == _TAG_TABLE
+		self._count = bundle._words[word + 1]
+
+	def __getitem__(self, index: Any) -> Any:
+		if isinstance(index, slice):
+			return [self[position] for position in range(self._count)[index]]
+		if index < 0:
+			index += self._count
+		if not 0 <= index < self._count:
+			raise IndexError("bundle sequence index out of range")
+		if self._table:
+			return self._bundle._table_row_view(self._word, index)
+		return self._bundle._view(self._bundle._words[self._word + 2 + index])
+
+	def __len__(self) -> int:
+		return self._count
+
+	def materialize(self) -> List[Any]:
+		return [item.materialize() if isinstance(item, (BundleMapping, BundleSequence)) else item for item in self]
+
+
+class CatalogBundle:
+	"""Read-only, memory-mapped view of a file written by build_catalog_bundle.
+
+	Documents are decoded from the mapping on request, so processes that open the
+	same bundle share its pages through the OS page cache; view() goes further and
+	decodes nested objects only when they are looked at. Each document records
+	the size and mtime of the JSON it was built from; is_current reports whether
+	that file is unchanged (or absent, when only the bundle is deployed).
+	"""
+
+	def __init__(self, path: Path) -> None:
+		self.path = Path(path)
+		with self.path.open("rb") as handle:
+			self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			magic, version, count, strings_offset, values_offset, documents_offset, end = _BUNDLE_HEADER.unpack_from(self._map, 0)
+			if magic != CATALOG_BUNDLE_MAGIC or version != CATALOG_BUNDLE_VERSION or end != len(self._map):
+				raise ValueError(f"{self.path} is not a version {CATALOG_BUNDLE_VERSION} catalog bundle")
+		except (struct.error, ValueError):
+			self._map.close()
+			raise
+		if sys.byteorder == "little":
+			self._words = memoryview(self._map).cast("I")
+		else:
+			words = array("I", self._map)
+			words.byteswap()
+			self._words = memoryview(words)
+		self._values_offset = values_offset
+		string_count = self._words[strings_offset // 4]
+		self._string_offsets = strings_offset // 4 + 1
+		self._string_base = strings_offset + 4 * (string_count + 2)
+		# Only object keys are cached: there are few distinct ones and every record repeats
+		# them. Values are decoded on each access, so nothing read once stays resident.
+		self._keys: Dict[int, str] = {}
+		self.documents: Dict[str, Tuple[int, int, int]] = {}
+		for index in range(count):
+			name_id, root, size, mtime_ns = _BUNDLE_DOCUMENT.unpack_from(self._map, documents_offset + index * _BUNDLE_DOCUMENT.size)
+			self.documents[self.string(name_id)] = (root, size, mtime_ns)
+
+	def close(self) -> None:
+		self._words.release()
+		self._map.close()
+
+	def __contains__(self, name: object) -> bool:
+		return name in self.documents
+
+	def __len__(self) -> int:
+		return len(self.documents)
+
+	@property
+	def size(self) -> int:
+		return len(self._map)
+
+	def string(self, string_id: int) -> str:
+		start = self._string_base + self._words[self._string_offsets + string_id]
+		stop = self._string_base + self._words[self._string_offsets + string_id + 1]
+		return self._map[start:stop].decode("utf-8")
+
+	def _key(self, string_id: int) -> str:
+		key = self._keys.get(string_id)
+		if key is None:
+			key = self._keys[string_id] = sys.intern(self.string(string_id))
+		return key
+
+	def is_current(self, name: str, path: Path) -> bool:
+		entry = self.documents.get(name)
+		if entry is None:
+			return False
+		try:
+			stat = path.stat()
+		except OSError:
+			return True
+		return (stat.st_size, stat.st_mtime_ns) == entry[1:]
+
+	def document(self, name: str) -> Any:
+		"""Decode a whole document; equal to json.load of its source file."""
+		return self._decode(self.documents[name][0])
+
+	def view(self, name: str) -> Any:
+		"""Lazy view of a document.
+
+		Objects and lists that contain other objects or lists come back as
+		BundleMapping / BundleSequence views; those holding only scalars (a list of
+		course codes, a flat record) are decoded to plain dicts and lists, so what a
+		caller copies into its output is always JSON-serializable.
+		"""
+		return self._view(self.documents[name][0])
+
+	def records(self, name: str) -> Iterator[Any]:
+		"""Yield a list document's elements one at a time.
+
+		Scalars are memoized by offset for the whole iteration, so a value repeated
+		across records (a mode, an instructor, a room) is decoded once; containers are
+		decoded afresh for every record.
+		"""
+		offset = self.documents[name][0]
+		word = (self._values_offset + offset) // 4
+		tag = self._words[word]
+		memo: Dict[int, Any] = {}
+		if tag == _TAG_LIST:
+			for index in range(self._words[word + 1]):
+				yield self._decode(self._words[word + 2 + index], memo)
+		elif tag == _TAG_TABLE:
+			yield from self._table_rows(word, memo)
+		else:
+			raise ValueError(f"{name} is not a list document")
+
+	def _is_container(self, offset: int) -> bool:
+		return self._words[(self._values_offset + offset) // 4] in (_TAG_DICT, _TAG_LIST, _TAG_TABLE)
+
+	def _is_flat(self, offset: int) -> bool:
+		word = (self._values_offset + offset) // 4
+		tag = self._words[word]
+		if tag == _TAG_DICT:
+			count = self._words[word + 1]
+			children = self._words[word + 2 + count:word + 2 + 2 * count]
+		elif tag == _TAG_LIST:
+			children = self._words[word + 2:word + 2 + self._words[word + 1]]
+		else:
+			return tag != _TAG_TABLE
+		return not any(self._is_container(child) for child in children)
+
+	def _view(self, offset: int) -> Any:
+		if self._is_flat(offset):
+			return self._decode(offset)
+		word = (self._values_offset + offset) // 4
+		if self._words[word] == _TAG_DICT:
+			count = self._words[word + 1]
+			keys = [self._key(key) for key in self._words[word + 2:word + 2 + count]]
+			return BundleMapping(self, keys, list(self._words[word + 2 + count:word + 2 + 2 * count]))
+		return BundleSequence(self, word)
+
+	def _table_row_view(self, word: int, row: int) -> Any:
+		rows, cols = self._words[word + 1], self._words[word + 2]
+		start = word + 3 + cols
+		keys: List[str] = []
+		cells: List[int] = []
+		for column in range(cols):
+			cell = self._words[start + column * rows + row]
+			if cell:
+				keys.append(self._key(self._words[word + 3 + column]))
+				cells.append(cell)
+		if not any(self._is_container(cell) for cell in cells):
+			return {key: self._decode(cell) for key, cell in zip(keys, cells)}
+		return BundleMapping(self, keys, cells)
+
+	def _table_rows(self, word: int, memo: Dict[int, Any]) -> Iterator[Dict[str, Any]]:
+		rows, cols = self._words[word + 1], self._words[word + 2]
+		start = word + 3 + cols
+		# Cells are stored column-major: slice out each column once, then walk the rows
+		columns = [
+			(self._key(self._words[word + 3 + column]), self._words[start + column * rows:start + (column + 1) * rows])
+			for column in range(cols)
+		]
+		for row in range(rows):
+			record: Dict[str, Any] = {}
+			for key, cells in columns:
+				cell = cells[row]
+				if cell:
+					value = memo.get(cell, _UNDECODED)
+					record[key] = self._decode(cell, memo) if value is _UNDECODED else value
+			yield record
+
+	def _decode(self, offset: int, memo: Optional[Dict[int, Any]] = None) -> Any:
+		"""Decode the value at offset. Values are hash-consed, so memo (offset -> scalar)
+		lets a value that recurs within one decode be read from the mapping once."""
+		if memo is None:
+			memo = {}
+		value = memo.get(offset, _UNDECODED)
+		if value is not _UNDECODED:
+			return value
+		word = (self._values_offset + offset) // 4
+		tag = self._words[word]
+		if tag == _TAG_STR:
+			value = self.string(self._words[word + 1])
+		elif tag == _TAG_DICT:
+			count = self._words[word + 1]
+			keys = self._words[word + 2:word + 2 + count]
+			values = self._words[word + 2 + count:word + 2 + 2 * count]
+			return {self._key(key): self._decode(item, memo) for key, item in zip(keys, values)}
+		elif tag == _TAG_LIST:
+			count = self._words[word + 1]
+			return [self._decode(item, memo) for item in self._words[word + 2:word + 2 + count]]
+		elif tag == _TAG_TABLE:
+			return list(self._table_rows(word, memo))
+		elif tag == _TAG_INT:
+			value = struct.unpack_from("<q", self._map, self._values_offset + offset + 4)[0]
+		elif tag == _TAG_FLOAT:
+			value = struct.unpack_from("<d", self._map, self._values_offset + offset + 4)[0]
+		elif tag == _TAG_NULL:
+			return None
+		elif tag == _TAG_TRUE:
+			return True
+		elif tag == _TAG_FALSE:
+			return False
+		elif tag == _TAG_BIGINT:
+			value = int(self.string(self._words[word + 1]))
+		else:
+			raise ValueError(f"{self.path}: bad value tag {tag} at offset {offset}")
+		memo[offset] = value
+		return value
+
+
 class DataStore:
-	def __init__(self, data_dir: Path = DATA_DIR) -> None:
+	# Files parsed eagerly in __init__; their stat info fingerprints a snapshot.
+	SNAPSHOT_SOURCES = (
+		"all_sjsu_courses_with_ge.json",
+		"ge_courses.json",
+		"ap_courses.json",
+		"american_institutions.json",
+		"sjsu_majors.json",
+		"schedule.json",
+	)
+	# Per-file lazy caches are rebuilt on demand rather than persisted.
+	_TRANSIENT_ATTRS = (
+		"bundle",
+		"_lock",
+		"_roadmap_cache",
+		"_cc_cache",
+		"_course_areas_cache",
+		"_academic_catalog_cache",
+		"_skeleton_cache",
+		"_reload_executor",
+	)
+	SKELETON_CACHE_SIZE = 256
+
+	def __init__(self, data_dir: Path = DATA_DIR, bundle: Optional[CatalogBundle] = None) -> None:
 		self.data_dir = data_dir
+		self.bundle = bundle
 		self.course_catalog = self._load_course_catalog()
+		# Bit positions for the bitset audit; slugs outside the catalog get the next free ID on first use
+		self.course_ids: Dict[str, int] = {slug: index for index, slug in enumerate(self.course_catalog)}
+		self.area_ids: Dict[str, int] = {}
+		self.prereq_graph = PrereqGraph(self.course_catalog)
 		self.ge_catalog = self._load_ge_catalog()
+		self.ge_index = GESuggestionIndex(self.ge_catalog)
 		self.ap_catalog = self._load_ap_catalog()
 		self.american_institutions = self._load_american_institutions()
 		self.major_index = self._build_major_index()
-		self._roadmap_cache: Dict[str, List[Dict[str, Any]]] = {}
-		self._cc_cache: Dict[str, Dict[str, Any]] = {}
+		self._init_caches()
+		self.section_index = ScheduleSectionIndex(self._load_schedule())
+		# (size, mtime) of the schedule_delta.json already applied to section_index
+		self.schedule_delta_version: Optional[Tuple[int, int]] = None
+		self._apply_schedule_delta_on_load()
+
+	def _init_caches(self) -> None:
+		self._lock = threading.RLock()
+		self._roadmap_cache: Dict[str, Sequence[Dict[str, Any]]] = {}
+		self._cc_cache: Dict[str, Optional[ArticulationIndex]] = {}
+		self._course_areas_cache: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
 		self._academic_catalog_cache: Dict[str, Dict[str, Any]] = {}
-		self.schedule_index = self._load_schedule()
+		self._skeleton_cache: OrderedDict[Tuple[str, Tuple[int, int]], RequirementSkeleton] = OrderedDict()
+		self._reload_executor: Optional[ThreadPoolExecutor] = None
+
+	def __getstate__(self) -> Dict[str, Any]:
+		state = self.__dict__.copy()
+		for name in self._TRANSIENT_ATTRS:
+			state.pop(name, None)
+		return state
+
+	def __setstate__(self, state: Dict[str, Any]) -> None:
+		self.__dict__.update(state)
+		self.bundle = None
+		self._init_caches()
+
+	def _bundled(self, name: str) -> bool:
+		"""Whether data_dir/name should be read from the catalog bundle instead of JSON."""
+		return self.bundle is not None and self.bundle.is_current(name, self.data_dir / name)
+
+	def _has_source(self, name: str) -> bool:
+		return self._bundled(name) or (self.data_dir / name).exists()
+
+	def _read_source(self, name: str) -> Any:
+		if self._bundled(name):
+			return self.bundle.document(name)
+		return _read_json(self.data_dir / name)
+
+	def _view_source(self, name: str) -> Any:
+		"""Like _read_source, but a bundled document comes back as a lazy view."""
+		if self._bundled(name):
+			return self.bundle.view(name)
+		return _read_json(self.data_dir / name)
+
+	def _iter_source(self, name: str) -> Iterator[Any]:
+		if self._bundled(name):
+			return self.bundle.records(name)
+		return _iter_json_array(self.data_dir / name)
+
+	@classmethod
+	def source_fingerprint(cls, data_dir: Path = DATA_DIR) -> Tuple[Tuple[str, int, int], ...]:
+		fingerprint: List[Tuple[str, int, int]] = []
+		for name in cls.SNAPSHOT_SOURCES:
+			path = Path(data_dir) / name
+			try:
+				stat = path.stat()
+			except OSError:
+				fingerprint.append((name, -1, -1))
+				continue
+			fingerprint.append((name, stat.st_size, stat.st_mtime_ns))
+		return tuple(fingerprint)
+
+	def save_snapshot(self, path: Path) -> None:
+		"""Write the parsed indexes to a pickle that from_snapshot can reload."""
+		path = Path(path)
+		payload = {
+			"version": SNAPSHOT_VERSION,
+			"fingerprint": self.source_fingerprint(self.data_dir),
+			"state": self.__getstate__(),
+		}
+		path.parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = path.with_name(path.name + ".tmp")
+		with tmp_path.open("wb") as handle:
+			pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_path, path)
+
+	@classmethod
+	def from_snapshot(cls, path: Path, data_dir: Path = DATA_DIR) -> Optional[DataStore]:
+		"""Load a snapshot, or return None when it is missing or the JSON sources changed."""
+		path = Path(path)
+		try:
+			with path.open("rb") as handle:
+				payload = pickle.load(handle)
+		except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+			return None
+		if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+			return None
+		if payload.get("fingerprint") != cls.source_fingerprint(data_dir):
+			return None
+		datastore = cls.__new__(cls)
+		datastore.__setstate__(payload["state"])
+		datastore.data_dir = data_dir
+		# A delta written after the snapshot was saved does not change its fingerprint
+		datastore._apply_schedule_delta_on_load()
+		return datastore
+
+	@classmethod
+	def load_or_build(
+		cls,
+		data_dir: Path = DATA_DIR,
+		snapshot_path: Optional[Path] = None,
+		bundle_path: Optional[Path] = None,
+	) -> DataStore:
+		"""Build a DataStore, warm-starting from a snapshot and reading a catalog bundle when given."""
+		bundle = CatalogBundle(bundle_path) if bundle_path is not None else None
+		if snapshot_path is None:
+			return cls(data_dir, bundle)
+		datastore = cls.from_snapshot(snapshot_path, data_dir)
+		if datastore is not None:
+			datastore.bundle = bundle
+			return datastore
+		datastore = cls(data_dir, bundle)
+		try:
+			datastore.save_snapshot(snapshot_path)
+		except OSError:
+			pass
+		return datastore
 
 	def _load_course_catalog(self) -> Dict[str, CourseInfo]:
-		catalog_path = self.data_dir / "all_sjsu_courses_with_ge.json"
-		raw_catalog = _read_json(catalog_path)
 		courses: Dict[str, CourseInfo] = {}
-		for entry in raw_catalog:
+		for entry in self._iter_source("all_sjsu_courses_with_ge.json"):
 			code_raw = entry.get("course_id")
 			if not code_raw:
 				continue
@@ -411,8 +1555,7 @@ class DataStore:
 		return courses
 
 	def _load_ge_catalog(self) -> Dict[str, Dict[str, Any]]:
-		ge_path = self.data_dir / "ge_courses.json"
-		data = _read_json(ge_path)
+		data = self._read_source("ge_courses.json")
 		catalog: Dict[str, Dict[str, Any]] = {}
 		for entry in data:
 			areas = entry.get("area")
@@ -447,8 +1590,7 @@ class DataStore:
 		return catalog
 
 	def _load_ap_catalog(self) -> Dict[str, Dict[str, Any]]:
-		ap_path = self.data_dir / "ap_courses.json"
-		entries = _read_json(ap_path)
+		entries = self._read_source("ap_courses.json")
 		catalog: Dict[str, Dict[str, Any]] = {}
 		for entry in entries:
 			key_variants = {
@@ -461,16 +1603,14 @@ class DataStore:
 		return catalog
 
 	def _load_american_institutions(self) -> Dict[str, Dict[str, Any]]:
-		ai_path = self.data_dir / "american_institutions.json"
-		entries = _read_json(ai_path)
+		entries = self._read_source("american_institutions.json")
 		catalog: Dict[str, Dict[str, Any]] = {}
 		for entry in entries:
 			catalog[entry.get("code", "").upper()] = entry
 		return catalog
 
 	def _build_major_index(self) -> Dict[str, Dict[str, Any]]:
-		majors_path = self.data_dir / "sjsu_majors.json"
-		entries = _read_json(majors_path)
+		entries = self._read_source("sjsu_majors.json")
 		index: Dict[str, Dict[str, Any]] = {}
 		for entry in entries:
 			name = entry.get("major")
@@ -501,36 +1641,165 @@ class DataStore:
 				return metadata
 		return None
 
-	def load_roadmap(self, major_name: str) -> List[Dict[str, Any]]:
+	def load_roadmap(self, major_name: str) -> Sequence[Dict[str, Any]]:
 		metadata = self.resolve_major(major_name)
 		if not metadata:
 			raise ValueError(f"Major '{major_name}' not found in catalog")
-		slug = metadata["slug"]
+		return self._load_roadmap_file(metadata["slug"], major_name)
+
+	def _load_roadmap_file(self, slug: str, major_name: str) -> Sequence[Dict[str, Any]]:
 		if slug in self._roadmap_cache:
+			_count("roadmap_cache_hits")
 			return self._roadmap_cache[slug]
-		roadmap_path = self.data_dir / "roadmaps" / slug
-		if not roadmap_path.exists():
-			raise FileNotFoundError(f"Roadmap file not found for major '{major_name}'")
-		raw = _read_json(roadmap_path)
-		output = raw.get("output") if isinstance(raw, dict) else raw
-		if not isinstance(output, list):
-			raise ValueError(f"Unexpected roadmap format for '{major_name}'")
-		self._roadmap_cache[slug] = output
+		_count("roadmap_cache_misses")
+		with self._lock:
+			if slug in self._roadmap_cache:
+				return self._roadmap_cache[slug]
+			if not self._has_source(f"roadmaps/{slug}"):
+				raise FileNotFoundError(f"Roadmap file not found for major '{major_name}'")
+			raw = self._view_source(f"roadmaps/{slug}")
+			output = raw.get("output") if isinstance(raw, collections.abc.Mapping) else raw
+			if not isinstance(output, collections.abc.Sequence) or isinstance(output, str):
+				raise ValueError(f"Unexpected roadmap format for '{major_name}'")
+			self._roadmap_cache[slug] = output
 		return output
 
-	def load_cc_articulation(self, institution: str) -> Optional[Dict[str, Any]]:
+	def requirement_skeleton(self, major_name: str) -> RequirementSkeleton:
+		"""Return the LRU-cached RequirementSkeleton for a major.
+
+		Entries are keyed by the roadmap slug and the roadmap file's size and mtime,
+		so an edited roadmap is re-read and rebuilt on the next lookup.
+		"""
+		metadata = self.resolve_major(major_name)
+		if not metadata:
+			raise ValueError(f"Major '{major_name}' not found in catalog")
+		return self.roadmap_skeleton(metadata["slug"], major_name)
+
+	def roadmap_files(self) -> List[str]:
+		"""File names in roadmaps/, including ones only present in the catalog bundle."""
+		directory = self.data_dir / "roadmaps"
+		names = {path.name for path in directory.glob("*.json")} if directory.exists() else set()
+		if self.bundle is not None:
+			prefix = "roadmaps/"
+			names.update(name[len(prefix):] for name in self.bundle.documents if name.startswith(prefix))
+		return sorted(names)
+
+	def roadmap_skeleton(self, slug: str, major_name: Optional[str] = None) -> RequirementSkeleton:
+		"""requirement_skeleton by roadmap file name, whether or not any major name resolves to it."""
+		major_name = major_name or slug
+		try:
+			stat = (self.data_dir / "roadmaps" / slug).stat()
+			version = (stat.st_size, stat.st_mtime_ns)
+		except OSError:
+			version = (-1, -1)
+		key = (slug, version)
+		with self._lock:
+			skeleton = self._skeleton_cache.get(key)
+			if skeleton is not None:
+				_count("skeleton_cache_hits")
+				self._skeleton_cache.move_to_end(key)
+				return skeleton
+			_count("skeleton_cache_misses")
+			stale = [cached for cached in self._skeleton_cache if cached[0] == slug]
+			if stale:
+				for cached in stale:
+					del self._skeleton_cache[cached]
+				self._roadmap_cache.pop(slug, None)
+			skeleton = RequirementSkeleton.build(slug, version, self._load_roadmap_file(slug, major_name), self)
+			self._skeleton_cache[key] = skeleton
+			while len(self._skeleton_cache) > self.SKELETON_CACHE_SIZE:
+				self._skeleton_cache.popitem(last=False)
+		return skeleton
+
+	def bit_mask(self, keys: Iterable[str], areas: bool = False, assign: bool = True) -> int:
+		"""OR of the bits for course slugs (or GE/AI areas with areas=True).
+
+		With assign=False keys that have no ID yet are skipped; no compiled mask can
+		contain them, so encoding a student never needs to grow the ID space.
+		"""
+		table = self.area_ids if areas else self.course_ids
+		mask = 0
+		for key in keys:
+			index = table.get(key)
+			if index is None:
+				if not assign:
+					continue
+				with self._lock:
+					index = table.setdefault(key, len(table))
+			mask |= 1 << index
+		return mask
+
+	def course_areas(self, slug: str) -> Tuple[List[str], List[str]]:
+		"""split_ge_ai of a catalog course's GE tokens, parsed once per course."""
+		areas = self._course_areas_cache.get(slug)
+		if areas is None:
+			info = self.course_catalog.get(slug)
+			ge_areas, ai_areas = split_ge_ai(info.ge_areas if info else [])
+			areas = self._course_areas_cache[slug] = (tuple(ge_areas), tuple(ai_areas))
+		return list(areas[0]), list(areas[1])
+
+	def load_cc_articulation(self, institution: str) -> Optional[ArticulationIndex]:
 		if not institution:
 			return None
 		key = normalize_key(institution)
 		if key in self._cc_cache:
+			_count("cc_articulation_cache_hits")
 			return self._cc_cache[key]
-		filename = re.sub(r"[^a-z0-9]+", "_", institution.lower()).strip("_") + ".json"
-		path = self.data_dir / "community_college" / filename
-		if not path.exists():
-			return None
-		data = _read_json(path)
-		self._cc_cache[key] = data
-		return data
+		_count("cc_articulation_cache_misses")
+		with self._lock:
+			if key in self._cc_cache:
+				return self._cc_cache[key]
+			name = f"community_college/{_articulation_filename(institution)}"
+			if not self._has_source(name):
+				# Remember the miss so repeat lookups for unknown colleges skip the filesystem
+				self._cc_cache[key] = None
+				return None
+			index = ArticulationIndex(institution, self._view_source(name))
+			self._cc_cache[key] = index
+		return index
+
+	def warm_cc_articulations(self, workers: Optional[int] = None, use_processes: bool = False) -> ArticulationWarmupReport:
+		"""Load and compile every community college agreement now instead of on first use.
+
+		Files are parsed on a thread pool, or a process pool with use_processes=True
+		(JSON parsing holds the GIL, so processes are what scale on multi-core hosts).
+		Colleges that are already cached are skipped.
+		"""
+		report = ArticulationWarmupReport(rss_before=_current_rss_bytes())
+		started = time.perf_counter()
+		directory = self.data_dir / "community_college"
+		filenames = {path.name for path in directory.glob("*.json")} if directory.exists() else set()
+		if self.bundle is not None:
+			prefix = "community_college/"
+			filenames.update(name[len(prefix):] for name in self.bundle.documents if name.startswith(prefix))
+		paths = [directory / filename for filename in sorted(filenames)]
+		reachable = []
+		for path in paths:
+			# load_cc_articulation can only reach files named the way it derives them
+			if _articulation_filename(path.stem) != path.name:
+				report.skipped.append(path.stem)
+			elif self._cc_cache.get(normalize_key(path.stem)) is None:
+				reachable.append(path)
+		paths = reachable
+		if paths:
+			executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+			# Worker processes map the bundle themselves rather than receiving a pickled copy
+			bundle = self.bundle.path if use_processes and self.bundle is not None else self.bundle
+			with executor_cls(max_workers=workers or min(8, os.cpu_count() or 1)) as executor:
+				futures = {path: executor.submit(_compile_articulation_file, path, bundle) for path in paths}
+				for path, future in futures.items():
+					try:
+						name, index, seconds = future.result()
+					except Exception as exc:  # a bad file should not abort startup
+						report.errors[path.stem] = f"{type(exc).__name__}: {exc}"
+						continue
+					with self._lock:
+						if self._cc_cache.get(normalize_key(name)) is None:
+							self._cc_cache[normalize_key(name)] = index
+					report.file_seconds[name] = seconds
+		report.total_seconds = time.perf_counter() - started
+		report.rss_after = _current_rss_bytes()
+		return report
 
 	def load_academic_catalog(self, major_name: str) -> Optional[Dict[str, Any]]:
 		"""Load the academic catalog JSON for a specific major"""
@@ -541,78 +1810,282 @@ class DataStore:
 			return None
 		slug = metadata["slug"]
 		if slug in self._academic_catalog_cache:
+			_count("academic_catalog_cache_hits")
 			return self._academic_catalog_cache[slug]
-		catalog_path = self.data_dir / "academic_catalog" / slug
-		if not catalog_path.exists():
-			return None
-		data = _read_json(catalog_path)
-		self._academic_catalog_cache[slug] = data
+		_count("academic_catalog_cache_misses")
+		with self._lock:
+			if slug in self._academic_catalog_cache:
+				return self._academic_catalog_cache[slug]
+			name = f"academic_catalog/{slug}"
+			if not self._has_source(name):
+				return None
+			data = self._view_source(name)
+			self._academic_catalog_cache[slug] = data
 		return data
 
-	def _load_schedule(self) -> Dict[str, List[ScheduleSection]]:
-		schedule_path = self.data_dir / "schedule.json"
-		if not schedule_path.exists():
-			return {}
-		entries = _read_json(schedule_path)
+	@property
+	def schedule_index(self) -> Dict[str, List[ScheduleSection]]:
+		return self.section_index.courses
+
+	def _load_schedule(self, schedule_path: Optional[Path] = None) -> Dict[str, List[ScheduleSection]]:
+		if schedule_path is None and self._bundled("schedule.json"):
+			entries = self.bundle.records("schedule.json")
+		else:
+			schedule_path = schedule_path or self.data_dir / "schedule.json"
+			if not schedule_path.exists():
+				return {}
+			entries = _iter_json_array(schedule_path)
 		index: Dict[str, List[ScheduleSection]] = {}
-		for entry in entries or []:
+		# Most text columns repeat across rows (modes, instructors, rooms, dates), so
+		# equal values share one string object instead of one copy per section.
+		strings: Dict[str, str] = {}
+
+		def text(value: Any) -> str:
+			value = (value or "").strip()
+			return strings.setdefault(value, value)
+
+		# Rows are converted as they are parsed, so the raw list of dicts never exists
+		for entry in entries:
 			section_name = (entry.get("Section") or "").strip()
 			if not section_name:
 				continue
 			course_part = section_name.split("(", 1)[0].strip()
 			if not course_part:
 				continue
-			course_code = normalize_course_code(course_part)
-			course_slug = course_code_to_slug(course_code)
+			course_code = text(normalize_course_code(course_part))
+			course_slug = text(course_code_to_slug(course_code))
 			if not course_slug:
 				continue
-			class_number = (entry.get("Class Number") or "").strip()
-			instruction_mode = (entry.get("Mode of Instruction") or "").strip()
-			title = (entry.get("Course Title") or "").strip()
-			satisfies = (entry.get("Satisfies") or "").strip()
-			units = parse_units(entry.get("Units"))
-			section_type = (entry.get("Type") or "").strip()
-			days_string = (entry.get("Days") or "").strip()
-			days_list = _parse_days(days_string)
-			day_pattern = "".join(days_list)
+			days_list = _parse_days((entry.get("Days") or "").strip())
 			start_minutes, end_minutes = _parse_time_range(entry.get("Times"))
-			time_string = (entry.get("Times") or "").strip()
-			instructor = (entry.get("Instructor") or "").strip()
-			location = (entry.get("Location") or "").strip()
-			dates = (entry.get("Dates") or "").strip()
-			notes = (entry.get("Notes") or "").strip()
-			open_seats_raw = entry.get("Open Seats")
-			open_seats: Optional[int]
-			try:
-				open_seats = int(open_seats_raw)
-			except (TypeError, ValueError):
-				open_seats = None
 			section = ScheduleSection(
 				course_slug=course_slug,
 				course_code=course_code,
 				section=section_name,
-				class_number=class_number,
-				instruction_mode=instruction_mode,
-				title=title,
-				satisfies=satisfies,
-				units=units,
-				section_type=section_type,
-				day_pattern=day_pattern,
-				day_set=set(days_list),
+				class_number=(entry.get("Class Number") or "").strip(),
+				instruction_mode=text(entry.get("Mode of Instruction")),
+				title=text(entry.get("Course Title")),
+				satisfies=text(entry.get("Satisfies")),
+				units=parse_units(entry.get("Units")),
+				section_type=text(entry.get("Type")),
+				day_pattern=text("".join(days_list)),
+				day_mask=_day_mask(days_list),
 				start_minutes=start_minutes,
 				end_minutes=end_minutes,
-				time_string=time_string,
-				instructor=instructor,
-				location=location,
-				dates=dates,
-				open_seats=open_seats,
-				notes=notes,
+				time_string=text(entry.get("Times")),
+				instructor=text(entry.get("Instructor")),
+				location=text(entry.get("Location")),
+				dates=text(entry.get("Dates")),
+				open_seats=_parse_open_seats(entry.get("Open Seats")),
+				notes=text(entry.get("Notes")),
 			)
 			index.setdefault(course_slug, []).append(section)
 		return index
 
+	def suggest_for_requirement(
+		self,
+		requirement: Requirement,
+		academic_catalog: Optional[Dict[str, Any]] = None,
+	) -> Optional[List[str]]:
+		"""Suggested courses for a GE requirement, or None when nothing applies.
+
+		The major's own course list wins; otherwise 5B/5C science requirements get
+		the major's Science Electives that carry Area 5C, then the courses shared by
+		all of the requirement's GE areas.
+		"""
+		suggested = _major_specific_courses(academic_catalog, requirement.display_name)
+		if suggested or not requirement.ge_areas:
+			return suggested
+		req_lower = requirement.display_name.lower()
+		# If this is a "5B and 5C" or "5C" requirement with Science keyword,
+		# show all major's Science Electives that have lab (5C), not just life science (5B)
+		if ("5b" in req_lower and "5c" in req_lower) or ("science" in req_lower and "5c" in req_lower):
+			major_courses = _major_specific_courses(academic_catalog, "Science Electives")
+			if major_courses:
+				suggested = self.ge_index.lab_science_courses(major_courses)
+				if suggested:
+					return suggested
+		return self.ge_index.courses_for_areas(requirement.ge_areas)
+
 	def get_schedule_sections(self, course_slug: str) -> List[ScheduleSection]:
-		return self.schedule_index.get(course_slug, [])
+		return self.section_index.courses.get(course_slug, [])
+
+	def reload_schedule(self, schedule_path: Optional[Path] = None) -> ScheduleReload:
+		"""Re-read the class schedule (default: schedule.json) and swap it in.
+
+		The new file is parsed and indexed without holding any lock; the swap is one
+		attribute assignment, so a request that took section_index before the swap
+		keeps planning against the old schedule and never sees a half-built one.
+		"""
+		started = time.perf_counter()
+		index = ScheduleSectionIndex(self._load_schedule(schedule_path))
+		delta_version = None
+		if schedule_path is None:
+			delta_version = self._schedule_delta_stat()
+			if delta_version is not None:
+				try:
+					self._apply_open_seats(index, _read_json(self.data_dir / SCHEDULE_DELTA_FILE))
+				except (OSError, ValueError):
+					# Swap in the base schedule; apply_pending_schedule_delta retries the delta
+					delta_version = None
+		with self._lock:
+			previous = self.section_index
+			self.section_index = index
+			self.schedule_delta_version = delta_version
+		report = ScheduleReload.compare(previous, index)
+		report.seconds = time.perf_counter() - started
+		return report
+
+	def apply_schedule_delta(self, delta: Any) -> ScheduleReload:
+		"""Update open seats in place from a schedule delta (a dict or a JSON file path).
+
+		The delta format is {"format": "sparq-schedule-delta", "version": 1,
+		"open_seats": {"<Class Number>": seats, ...}}. Only open_seats is touched, so
+		parsed times, days, codes and every index stay as they are; call save_snapshot
+		afterwards to persist the new counts without re-reading schedule.json.
+		"""
+		started = time.perf_counter()
+		if not isinstance(delta, dict):
+			delta = _read_json(Path(delta))
+		report = self._apply_open_seats(self.section_index, delta)
+		report.seconds = time.perf_counter() - started
+		return report
+
+	def _schedule_delta_stat(self) -> Optional[Tuple[int, int]]:
+		try:
+			stat = (self.data_dir / SCHEDULE_DELTA_FILE).stat()
+		except OSError:
+			return None
+		return stat.st_size, stat.st_mtime_ns
+
+	def apply_pending_schedule_delta(self) -> Optional[ScheduleReload]:
+		"""Apply data_dir/schedule_delta.json if it appeared or changed since the last call.
+
+		The updater writes the delta against schedule.json (it rewrites schedule.json
+		itself, and removes the delta, when anything but seat counts changes), so the
+		newest delta alone brings the base schedule up to date. Returns None when there
+		was nothing new to apply. An unreadable delta raises OSError/ValueError before
+		any seat changes, and schedule_delta_version stays put so the next call retries.
+		"""
+		version = self._schedule_delta_stat()
+		if version is None or version == self.schedule_delta_version:
+			return None
+		report = self.apply_schedule_delta(self.data_dir / SCHEDULE_DELTA_FILE)
+		self.schedule_delta_version = version
+		return report
+
+	def _apply_schedule_delta_on_load(self) -> None:
+		# A bad delta must not stop the DataStore from loading; the base schedule stands
+		try:
+			self.apply_pending_schedule_delta()
+		except (OSError, ValueError):
+			pass
+
+	@staticmethod
+	def _apply_open_seats(index: ScheduleSectionIndex, delta: Dict[str, Any]) -> ScheduleReload:
+		if delta.get("format", SCHEDULE_DELTA_FORMAT) != SCHEDULE_DELTA_FORMAT or delta.get("version", 1) != 1:
+			raise ValueError(f"Unsupported schedule delta: {delta.get('format')!r} version {delta.get('version')!r}")
+		report = ScheduleReload()
+		by_class_number = index.by_class_number
+		for class_number, seats in (delta.get("open_seats") or {}).items():
+			class_number = str(class_number).strip()
+			sections = by_class_number.get(class_number)
+			if not sections:
+				report.unknown.append(class_number)
+				continue
+			open_seats = _parse_open_seats(seats)
+			if all(section.open_seats == open_seats for section in sections):
+				continue
+			for section in sections:
+				section.open_seats = open_seats
+				report.courses.add(section.course_slug)
+			report.changed.append(class_number)
+		return report
+
+	def reload_schedule_in_background(self, schedule_path: Optional[Path] = None) -> Future:
+		"""Run reload_schedule on a worker thread; the Future resolves to its ScheduleReload."""
+		with self._lock:
+			if self._reload_executor is None:
+				self._reload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule-reload")
+			return self._reload_executor.submit(self.reload_schedule, schedule_path)
+
+	def find_sections(
+		self,
+		schedule_preferences: Optional[Dict[str, Any]] = None,
+		course_slugs: Optional[Iterable[str]] = None,
+		instructor: Optional[str] = None,
+	) -> List[ScheduleSection]:
+		"""Sections passing a student's schedule_preferences filters, across all courses
+		unless course_slugs is given, optionally for a single instructor."""
+		preferences = _parse_schedule_preferences(schedule_preferences)
+		return preferences.section_filter(self.section_index).select(course_slugs, instructor)
+
+
+_SHARED_DATASTORES: Dict[Path, DataStore] = {}
+_SHARED_DATASTORES_LOCK = threading.Lock()
+
+
+def get_shared_datastore(
+	data_dir: Path = DATA_DIR,
+	snapshot_path: Optional[Path] = None,
+	warm_cc: Optional[bool] = None,
+	bundle_path: Optional[Path] = None,
+) -> DataStore:
+	"""Return the process-wide DataStore for data_dir, loading it at most once.
+
+	When snapshot_path (or the SPARQ_DATASTORE_SNAPSHOT environment variable) is set,
+	cold starts load the pickled indexes from it and rewrite it if the JSON changed.
+	bundle_path (or SPARQ_CATALOG_BUNDLE) names a catalog bundle to read sources from.
+	warm_cc (default: the SPARQ_WARM_CC_ARTICULATION environment variable) compiles
+	every community college agreement during the cold start.
+	"""
+	key = Path(data_dir).resolve()
+	datastore = _SHARED_DATASTORES.get(key)
+	if datastore is not None:
+		return datastore
+	with _SHARED_DATASTORES_LOCK:
+		datastore = _SHARED_DATASTORES.get(key)
+		if datastore is None:
+			if snapshot_path is None and os.environ.get(SNAPSHOT_ENV_VAR):
+				snapshot_path = Path(os.environ[SNAPSHOT_ENV_VAR])
+			if bundle_path is None and os.environ.get(CATALOG_BUNDLE_ENV_VAR):
+				bundle_path = Path(os.environ[CATALOG_BUNDLE_ENV_VAR])
+			datastore = DataStore.load_or_build(key, snapshot_path, bundle_path)
+			if warm_cc is None:
+				warm_cc = os.environ.get(WARM_CC_ENV_VAR, "").lower() in {"1", "true", "yes"}
+			if warm_cc:
+				datastore.warm_cc_articulations()
+			_SHARED_DATASTORES[key] = datastore
+	return datastore
+
+
+def preload_shared_datastore(
+	data_dir: Path = DATA_DIR,
+	snapshot_path: Optional[Path] = None,
+	bundle_path: Optional[Path] = None,
+) -> DataStore:
+	"""Fully load the shared DataStore in a pre-fork server's parent process.
+
+	Call it before the workers fork (e.g. from gunicorn's on_starting hook or with
+	--preload). Every requirement skeleton and community college agreement is
+	compiled up front, then gc.freeze() moves all of it out of the collector's
+	reach: workers never write to those objects' pages during collection, so the
+	pages stay shared copy-on-write instead of being copied into every worker.
+	"""
+	datastore = get_shared_datastore(data_dir, snapshot_path, warm_cc=True, bundle_path=bundle_path)
+	for slug in datastore.roadmap_files():
+		try:
+			datastore.roadmap_skeleton(slug)
+		except (ValueError, FileNotFoundError):
+			continue
+	gc.collect()
+	gc.freeze()
+	return datastore
+
+
+def clear_shared_datastores() -> None:
+	with _SHARED_DATASTORES_LOCK:
+		_SHARED_DATASTORES.clear()
 
 
 def _parse_time_setting(value: Any) -> Optional[int]:
@@ -717,7 +2190,89 @@ def _parse_instructor_ratings(mapping: Optional[Dict[str, Any]]) -> Dict[str, fl
 	return results
 
 
-def _parse_schedule_preferences(raw: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+@dataclass
+class SchedulePreferences:
+	"""A student's schedule_preferences, parsed and compiled once per request.
+
+	Instructor preferences are merged per course into lowercase lookup maps, and
+	section scores are memoized per (course, section), so scoring a section that was
+	already seen (e.g. by the solver and again by ranked options) is a dict lookup.
+	"""
+
+	enabled: Any
+	earliest_start: Optional[int]
+	latest_end: Optional[int]
+	required_day_patterns: Set[str]
+	allowed_day_patterns: Set[str]
+	avoid_day_patterns: Set[str]
+	preferred_day_patterns: List[str]
+	required_days: Set[str]
+	preferred_days: Set[str]
+	avoid_days: Set[str]
+	only_days: Set[str]
+	allowed_instruction_modes: Set[str]
+	avoid_instruction_modes: Set[str]
+	allowed_section_types: Set[str]
+	avoid_section_types: Set[str]
+	preferred_instructors: Dict[str, List[str]]
+	global_preferred_instructors: List[str]
+	avoid_instructors: Dict[str, List[str]]
+	global_avoid_instructors: List[str]
+	instructor_ratings: Dict[str, float]
+	prefer_open_sections: bool
+	alternatives: int = 0
+
+	def __post_init__(self) -> None:
+		self.required_day_mask = _day_mask(self.required_days)
+		self.preferred_day_mask = _day_mask(self.preferred_days)
+		self.avoid_day_mask = _day_mask(self.avoid_days)
+		self.only_day_mask = _day_mask(self.only_days)
+		self.preferred_day_pattern_set = frozenset(self.preferred_day_patterns)
+		self._rankings: Dict[str, Dict[str, int]] = {}
+		self._avoided: Dict[str, FrozenSet[str]] = {}
+		self._scores: Dict[Tuple[str, int], float] = {}
+		self._filters: Dict[int, SectionFilter] = {}
+
+	def instructor_ranking(self, course_slug: str) -> Dict[str, int]:
+		"""Lowercase instructor -> position in the course's preferred list, then the global one."""
+		ranking = self._rankings.get(course_slug)
+		if ranking is None:
+			course_pref = self.preferred_instructors.get(course_slug, []) or []
+			merged = course_pref + [name for name in self.global_preferred_instructors if name not in course_pref]
+			ranking = {}
+			for position, name in enumerate(merged):
+				ranking.setdefault(name.lower(), position)
+			self._rankings[course_slug] = ranking
+		return ranking
+
+	def avoided_instructors(self, course_slug: str) -> FrozenSet[str]:
+		avoided = self._avoided.get(course_slug)
+		if avoided is None:
+			course_avoid = self.avoid_instructors.get(course_slug, []) or []
+			avoided = frozenset(name.lower() for name in course_avoid + self.global_avoid_instructors)
+			self._avoided[course_slug] = avoided
+		return avoided
+
+	def score(self, section: ScheduleSection, course_slug: str) -> float:
+		if section.section_id < 0:
+			return _score_section(section, self, course_slug)
+		key = (course_slug, section.section_id)
+		score = self._scores.get(key)
+		if score is None:
+			_count("sections_scored")
+			score = self._scores[key] = _score_section(section, self, course_slug)
+		else:
+			_count("section_score_cache_hits")
+		return score
+
+	def section_filter(self, index: ScheduleSectionIndex) -> SectionFilter:
+		section_filter = self._filters.get(id(index))
+		if section_filter is None or section_filter.index is not index:
+			section_filter = self._filters[id(index)] = SectionFilter(self, index)
+		return section_filter
+
+
+def _parse_schedule_preferences(raw: Optional[Dict[str, Any]]) -> SchedulePreferences:
 	preferences_raw = raw or {}
 	enabled = preferences_raw.get("enabled", True)
 	earliest_start = _parse_time_setting(
@@ -750,72 +2305,78 @@ def _parse_schedule_preferences(raw: Optional[Dict[str, Any]]) -> Dict[str, Any]
 	global_avoid = avoid_instructors_map.pop("__global__", [])
 	instructor_ratings = _parse_instructor_ratings(preferences_raw.get("instructor_ratings"))
 	prefer_open_sections = bool(preferences_raw.get("prefer_open_sections", True))
-	return {
-		"enabled": enabled,
-		"earliest_start": earliest_start,
-		"latest_end": latest_end,
-		"required_day_patterns": required_day_patterns,
-		"allowed_day_patterns": allowed_day_patterns,
-		"avoid_day_patterns": avoid_day_patterns,
-		"preferred_day_patterns": preferred_day_patterns,
-		"required_days": required_days,
-		"preferred_days": preferred_days,
-		"avoid_days": avoid_days,
-		"only_days": only_days,
-		"allowed_instruction_modes": allowed_instruction_modes,
-		"avoid_instruction_modes": avoid_instruction_modes,
-		"allowed_section_types": allowed_section_types,
-		"avoid_section_types": avoid_section_types,
-		"preferred_instructors": preferred_instructors_map,
-		"global_preferred_instructors": global_preferred,
-		"avoid_instructors": avoid_instructors_map,
-		"global_avoid_instructors": global_avoid,
-		"instructor_ratings": instructor_ratings,
-		"prefer_open_sections": prefer_open_sections,
-	}
+	try:
+		alternatives = max(0, int(preferences_raw.get("alternatives") or 0))
+	except (TypeError, ValueError):
+		alternatives = 0
+	return SchedulePreferences(
+		enabled=enabled,
+		earliest_start=earliest_start,
+		latest_end=latest_end,
+		required_day_patterns=required_day_patterns,
+		allowed_day_patterns=allowed_day_patterns,
+		avoid_day_patterns=avoid_day_patterns,
+		preferred_day_patterns=preferred_day_patterns,
+		required_days=required_days,
+		preferred_days=preferred_days,
+		avoid_days=avoid_days,
+		only_days=only_days,
+		allowed_instruction_modes=allowed_instruction_modes,
+		avoid_instruction_modes=avoid_instruction_modes,
+		allowed_section_types=allowed_section_types,
+		avoid_section_types=avoid_section_types,
+		preferred_instructors=preferred_instructors_map,
+		global_preferred_instructors=global_preferred,
+		avoid_instructors=avoid_instructors_map,
+		global_avoid_instructors=global_avoid,
+		instructor_ratings=instructor_ratings,
+		prefer_open_sections=prefer_open_sections,
+		alternatives=alternatives,
+	)
 
 
-def _section_matches_filters(section: ScheduleSection, preferences: Dict[str, Any]) -> bool:
-	if preferences["only_days"] and section.day_set:
-		if not section.day_set.issubset(preferences["only_days"]):
+def _section_matches_filters(section: ScheduleSection, preferences: SchedulePreferences) -> bool:
+	day_mask = section.day_mask
+	if preferences.only_day_mask and day_mask:
+		if day_mask & ~preferences.only_day_mask:
 			return False
-	if preferences["required_days"] and section.day_set:
-		if not preferences["required_days"].issubset(section.day_set):
+	if preferences.required_day_mask and day_mask:
+		if preferences.required_day_mask & ~day_mask:
 			return False
-	if preferences["required_day_patterns"]:
-		if section.day_pattern not in preferences["required_day_patterns"]:
+	if preferences.required_day_patterns:
+		if section.day_pattern not in preferences.required_day_patterns:
 			return False
-	if preferences["allowed_day_patterns"]:
-		if section.day_pattern and section.day_pattern not in preferences["allowed_day_patterns"]:
+	if preferences.allowed_day_patterns:
+		if section.day_pattern and section.day_pattern not in preferences.allowed_day_patterns:
 			return False
-	if preferences["avoid_day_patterns"] and section.day_pattern in preferences["avoid_day_patterns"]:
+	if preferences.avoid_day_patterns and section.day_pattern in preferences.avoid_day_patterns:
 		return False
-	if preferences["avoid_days"] and section.day_set and (section.day_set & preferences["avoid_days"]):
+	if day_mask & preferences.avoid_day_mask:
 		return False
-	earliest_start = preferences["earliest_start"]
+	earliest_start = preferences.earliest_start
 	if earliest_start is not None and section.start_minutes is not None:
 		if section.start_minutes < earliest_start:
 			return False
-	latest_end = preferences["latest_end"]
+	latest_end = preferences.latest_end
 	if latest_end is not None and section.end_minutes is not None:
 		if section.end_minutes > latest_end:
 			return False
-	allowed_instruction_modes = preferences["allowed_instruction_modes"]
+	allowed_instruction_modes = preferences.allowed_instruction_modes
 	if allowed_instruction_modes:
 		mode = section.instruction_mode.strip().lower()
 		if mode and mode not in allowed_instruction_modes:
 			return False
-	avoid_instruction_modes = preferences["avoid_instruction_modes"]
+	avoid_instruction_modes = preferences.avoid_instruction_modes
 	if avoid_instruction_modes:
 		mode = section.instruction_mode.strip().lower()
 		if mode and mode in avoid_instruction_modes:
 			return False
-	allowed_section_types = preferences["allowed_section_types"]
+	allowed_section_types = preferences.allowed_section_types
 	if allowed_section_types:
 		kind = section.section_type.strip().lower()
 		if kind and kind not in allowed_section_types:
 			return False
-	avoid_section_types = preferences["avoid_section_types"]
+	avoid_section_types = preferences.avoid_section_types
 	if avoid_section_types:
 		kind = section.section_type.strip().lower()
 		if kind and kind in avoid_section_types:
@@ -823,40 +2384,101 @@ def _section_matches_filters(section: ScheduleSection, preferences: Dict[str, An
 	return True
 
 
-def _instructor_preference_score(instructor: str, preferred_list: List[str]) -> float:
-	if not instructor or not preferred_list:
-		return 0.0
-	for index, name in enumerate(preferred_list):
-		if instructor.lower() == name.lower():
-			return 100.0 - index * 5.0
-	return 0.0
-
-
-
-def _score_section(section: ScheduleSection, preferences: Dict[str, Any], course_slug: str) -> float:
+class SectionFilter:
+	"""_section_matches_filters compiled against a ScheduleSectionIndex.
+
+	Each active preference becomes an id set that sections must be in (allow) or must
+	not be in (deny), so filtering is set intersection and difference over ids.
+	"""
+
+	def __init__(self, preferences: SchedulePreferences, index: ScheduleSectionIndex) -> None:
+		self.index = index
+		self.allow: List[FrozenSet[int]] = []
+		self.deny: List[FrozenSet[int]] = []
+		if preferences.only_day_mask:
+			self.deny.append(index.meeting_outside(preferences.only_day_mask))
+		if preferences.required_day_mask:
+			self.deny.append(index.missing_any_of(preferences.required_day_mask))
+		if preferences.required_day_patterns:
+			self.allow.append(index.matching("day_pattern", preferences.required_day_patterns))
+		if preferences.allowed_day_patterns:
+			self.allow.append(index.matching("day_pattern", preferences.allowed_day_patterns | {""}))
+		if preferences.avoid_day_patterns:
+			self.deny.append(index.matching("day_pattern", preferences.avoid_day_patterns))
+		if preferences.avoid_day_mask:
+			self.deny.append(index.meeting_on_any(preferences.avoid_day_mask))
+		if preferences.earliest_start is not None:
+			self.deny.append(index.starting_before(preferences.earliest_start))
+		if preferences.latest_end is not None:
+			self.deny.append(index.ending_after(preferences.latest_end))
+		# Sections with a blank mode or type are never filtered out by those preferences
+		if preferences.allowed_instruction_modes:
+			self.allow.append(index.matching("mode", preferences.allowed_instruction_modes | {""}))
+		if preferences.avoid_instruction_modes:
+			self.deny.append(index.matching("mode", preferences.avoid_instruction_modes - {""}))
+		if preferences.allowed_section_types:
+			self.allow.append(index.matching("type", preferences.allowed_section_types | {""}))
+		if preferences.avoid_section_types:
+			self.deny.append(index.matching("type", preferences.avoid_section_types - {""}))
+		# Smallest sets first: intersections shrink the candidates fastest
+		self.allow.sort(key=len)
+
+	def filter_ids(self, ids: Optional[Iterable[int]] = None) -> Set[int]:
+		"""Ids among ids (default: the whole schedule) that pass every clause."""
+		allow = self.allow
+		if ids is None:
+			selected = set(allow[0]) if allow else set(range(len(self.index)))
+			allow = allow[1:]
+		else:
+			selected = set(ids)
+		for allowed in allow:
+			selected = selected & allowed
+		for denied in self.deny:
+			selected = selected - denied
+		return selected
+
+	def matches(self, section: ScheduleSection) -> bool:
+		section_id = section.section_id
+		return all(section_id in allowed for allowed in self.allow) and not any(section_id in denied for denied in self.deny)
+
+	def filter(self, sections: List[ScheduleSection]) -> List[ScheduleSection]:
+		"""Sections that pass, in their original order."""
+		if not self.allow and not self.deny:
+			return list(sections)
+		selected = self.filter_ids(section.section_id for section in sections)
+		return [section for section in sections if section.section_id in selected]
+
+	def select(
+		self,
+		course_slugs: Optional[Iterable[str]] = None,
+		instructor: Optional[str] = None,
+	) -> List[ScheduleSection]:
+		"""Matching sections across the schedule (or the given courses), in schedule order."""
+		index = self.index
+		candidates: Optional[Iterable[int]] = None
+		if course_slugs is not None:
+			candidates = [section_id for slug in course_slugs for section_id in index.course_ids.get(slug, ())]
+		if instructor is not None:
+			instructor_ids = index.by_instructor.get(instructor.strip().lower(), set())
+			candidates = instructor_ids if candidates is None else instructor_ids.intersection(candidates)
+		return [index.sections[section_id] for section_id in sorted(self.filter_ids(candidates))]
+
+
+def _score_section(section: ScheduleSection, preferences: SchedulePreferences, course_slug: str) -> float:
 	score = 0.0
-	preferred_map: Dict[str, List[str]] = preferences["preferred_instructors"]
-	avoid_map: Dict[str, List[str]] = preferences["avoid_instructors"]
-	course_pref = preferred_map.get(course_slug, []) or []
-	global_pref = preferences["global_preferred_instructors"]
-	preferred_list = course_pref + [name for name in global_pref if name not in course_pref]
-	course_avoid = avoid_map.get(course_slug, []) or []
-	global_avoid = preferences["global_avoid_instructors"]
-	avoid_list = course_avoid + [name for name in global_avoid if name not in course_avoid]
-	score += _instructor_preference_score(section.instructor, preferred_list)
-	if section.instructor and avoid_list:
-		for name in avoid_list:
-			if section.instructor.lower() == name.lower():
-				score -= 100.0
-				break
-	instructor_ratings = preferences["instructor_ratings"]
-	score += instructor_ratings.get(section.instructor, 0.0) * 10.0
-	if preferences["preferred_day_patterns"] and section.day_pattern in preferences["preferred_day_patterns"]:
+	instructor = section.instructor.lower() if section.instructor else ""
+	if instructor:
+		position = preferences.instructor_ranking(course_slug).get(instructor)
+		if position is not None:
+			score += 100.0 - position * 5.0
+		if instructor in preferences.avoided_instructors(course_slug):
+			score -= 100.0
+	score += preferences.instructor_ratings.get(section.instructor, 0.0) * 10.0
+	if section.day_pattern in preferences.preferred_day_pattern_set:
 		score += 5.0
-	if preferences["preferred_days"] and section.day_set:
-		shared = len(section.day_set & preferences["preferred_days"])
-		score += shared * 1.5
-	if preferences["prefer_open_sections"] and section.open_seats is not None:
+	shared = (section.day_mask & preferences.preferred_day_mask).bit_count()
+	score += shared * 1.5
+	if preferences.prefer_open_sections and section.open_seats is not None:
 		score += min(section.open_seats, 15) * 0.4
 	# Light preference toward mid-day classes if no specific preference supplied
 	if section.start_minutes is not None:
@@ -864,111 +2486,574 @@ def _score_section(section: ScheduleSection, preferences: Dict[str, Any], course
 	return score
 
 
-def _sections_conflict(a: ScheduleSection, b: ScheduleSection) -> bool:
-	if not a.day_set or not b.day_set:
-		return False
-	if not a.day_set.intersection(b.day_set):
-		return False
-	if a.start_minutes is None or b.start_minutes is None:
-		return False
-	end_a = a.end_minutes if a.end_minutes is not None else a.start_minutes
-	end_b = b.end_minutes if b.end_minutes is not None else b.start_minutes
-	return a.start_minutes < end_b and b.start_minutes < end_a
+def _meeting_interval(section: ScheduleSection) -> Optional[Tuple[int, int]]:
+	"""Minutes [start, end) a section meets on each of its days; None if it never blocks time."""
+	if not section.day_mask or section.start_minutes is None:
+		return None
+	end = section.end_minutes if section.end_minutes is not None else section.start_minutes
+	return section.start_minutes, end
 
 
-def _select_section_for_course(
-	course_slug: str,
-	sections: List[ScheduleSection],
-	assigned_sections: List[ScheduleSection],
-	preferences: Dict[str, Any],
-) -> Tuple[Optional[ScheduleSection], Optional[float], str]:
-	filtered = [section for section in sections if _section_matches_filters(section, preferences)]
-	if not filtered:
-		return None, None, "unavailable"
-	scored: List[Tuple[float, ScheduleSection]] = []
-	for section in filtered:
-		if any(_sections_conflict(section, existing) for existing in assigned_sections):
-			continue
-		score = _score_section(section, preferences, course_slug)
-		scored.append((score, section))
-	if not scored:
-		return None, None, "conflict"
-	scored.sort(key=lambda item: (item[0], (item[1].open_seats or -1)), reverse=True)
-	best_score, best_section = scored[0]
-	return best_section, best_score, "matched"
+class TermTimetable:
+	"""Meeting intervals of the sections already placed in one term, indexed by day.
 
+	Placed sections never conflict with each other, so each day's intervals sorted by
+	start also have non-decreasing ends; a candidate only has to be compared with the
+	last interval that starts before it ends, on each day it shares with the term.
+	"""
 
-def assign_sections_to_plan(
-	plan: List[Dict[str, Any]],
-	student_profile: Dict[str, Any],
-	datastore: DataStore,
-) -> List[str]:
-	preferences = _parse_schedule_preferences(student_profile.get("schedule_preferences"))
-	if not preferences.get("enabled", True):
-		return []
-	if not datastore.schedule_index:
-		return ["Schedule data unavailable; could not match course sections."]
-	warnings: List[str] = []
-	for term in plan:
-		assigned_sections: List[ScheduleSection] = []
-		for course_entry in term.get("courses", []):
-			if course_entry.get("type") != "course":
-				continue
-			course_code = course_entry.get("course")
-			if not course_code:
-				continue
-			normalized_code = normalize_course_code(course_code)
-			course_slug = course_code_to_slug(normalized_code)
-			if not course_slug:
-				continue
-			sections = datastore.get_schedule_sections(course_slug)
-			if not sections:
-				message = f"No scheduled sections found for {course_code}."
-				warnings.append(message)
-				course_entry["section_selection"] = {
-					"status": "unavailable",
-					"message": message,
-				}
-				continue
-			selected, score, status = _select_section_for_course(course_slug, sections, assigned_sections, preferences)
-			if selected is None:
-				if status == "conflict":
-					message = f"No available section for {course_code} without time conflicts given preferences."
-				else:
-					message = f"No sections met the filters for {course_code}."
-				warnings.append(message)
-				course_entry["section_selection"] = {
-					"status": status,
-					"message": message,
-				}
+	__slots__ = ("day_mask", "sections", "_days")
+
+	def __init__(self) -> None:
+		self.day_mask = 0
+		self.sections: List[ScheduleSection] = []
+		self._days: List[List[Tuple[int, int]]] = [[] for _ in DAY_ORDER]
+
+	def conflicts(self, section: ScheduleSection) -> bool:
+		shared = section.day_mask & self.day_mask
+		if not shared:
+			return False
+		interval = _meeting_interval(section)
+		if interval is None:
+			return False
+		start, end = interval
+		for position, intervals in enumerate(self._days):
+			if not shared >> position & 1:
 				continue
-			assigned_sections.append(selected)
-			selected_dict = selected.to_plan_dict()
-			if score is not None:
-				selected_dict["score"] = round(score, 2)
-			course_entry["section_selection"] = {
-				"status": status,
-				"section": selected_dict,
-			}
-	return warnings
+			before = bisect.bisect_left(intervals, (end, -1))
+			if before and intervals[before - 1][1] > start:
+				return True
+		return False
 
+	def add(self, section: ScheduleSection) -> None:
+		self.sections.append(section)
+		interval = _meeting_interval(section)
+		if interval is None:
+			return
+		self.day_mask |= section.day_mask
+		for position, intervals in enumerate(self._days):
+			if section.day_mask >> position & 1:
+				bisect.insort(intervals, interval)
 
-def build_student_record(student_profile: Dict[str, Any], datastore: DataStore) -> StudentRecord:
-	record = StudentRecord()
 
-	# Process SJSU courses
-	for course in student_profile.get("sjsu_courses", []) or []:
-		code = normalize_course_code(course.get("code", ""))
-		slug = course_code_to_slug(code)
-		status = (course.get("status") or "").lower()
-		grade = course.get("grade")
+# Courses with several section types (e.g. LEC + LAB) need one section of each;
+# the first type in this order is reported as the course's section.
+SECTION_TYPE_PRIORITY = ("LEC", "SEM", "DIS", "ACT", "LAB", "CLN", "SUP", "PRA", "FLD")
+# Search limits are node counts rather than wall time, so a loaded host picks the same sections
+SECTION_SOLVER_NODE_LIMIT = 10000
+SCHEDULE_OPTIONS_EXPANSION_LIMIT = 20000
+
+
+def _section_type_rank(section_type: str) -> Tuple[int, str]:
+	kind = section_type.upper()
+	if kind in SECTION_TYPE_PRIORITY:
+		return SECTION_TYPE_PRIORITY.index(kind), kind
+	return len(SECTION_TYPE_PRIORITY), kind
+
+
+class TermSectionProblem:
+	"""Section choices for the courses of one planned term.
+
+	Every filtered section becomes a candidate with an integer id; conflicts[c] is the
+	bitmask of candidates that overlap candidate c, so compatibility with a partial
+	schedule is one AND against the mask of the candidates already chosen.
+	components[i] holds, for course i, one candidate list per section type, best first,
+	and component_types[i] the matching section types. A course is "unavailable" when
+	one of its section types has no candidate left; unavailable[i] names that type.
+	"""
+
+	def __init__(
+		self,
+		courses: Sequence[Tuple[str, List[ScheduleSection]]],
+		preferences: SchedulePreferences,
+		section_filter: Optional[SectionFilter] = None,
+	) -> None:
+		self.course_slugs: List[str] = [slug for slug, _ in courses]
+		self.sections: List[ScheduleSection] = []
+		self.scores: List[float] = []
+		self.components: List[List[List[int]]] = []
+		self.component_types: List[List[str]] = []
+		self.unavailable: Dict[int, str] = {}
+		component_of: List[Tuple[int, int]] = []
+		for course_index, (course_slug, sections) in enumerate(courses):
+			by_type: Dict[str, List[ScheduleSection]] = {}
+			for section in sections:
+				by_type.setdefault(section.section_type, [])
+			if section_filter is not None:
+				matching = section_filter.filter(sections)
+			else:
+				matching = [section for section in sections if _section_matches_filters(section, preferences)]
+			for section in matching:
+				by_type[section.section_type].append(section)
+			components: List[List[int]] = []
+			section_types = sorted(by_type, key=_section_type_rank)
+			for section_type in section_types:
+				scored = [(preferences.score(section, course_slug), section) for section in by_type[section_type]]
+				if not scored:
+					self.unavailable[course_index] = section_type
+					break
+				scored.sort(key=lambda item: (item[0], (item[1].open_seats or -1)), reverse=True)
+				candidates: List[int] = []
+				for score, section in scored:
+					candidates.append(len(self.sections))
+					self.sections.append(section)
+					self.scores.append(score)
+					component_of.append((course_index, len(components)))
+				components.append(candidates)
+			self.components.append(components if course_index not in self.unavailable else [])
+			self.component_types.append(section_types)
+		self.conflicts = self._conflict_masks(component_of)
+		# ranked() lists every distinct schedule, so it keeps the dominated candidates too
+		self.all_components = [[list(candidates) for candidates in components] for components in self.components]
+		for components in self.components:
+			for position, candidates in enumerate(components):
+				components[position] = self._undominated(candidates)
+
+	def _conflict_masks(self, component_of: List[Tuple[int, int]]) -> List[int]:
+		# Sections meeting on the same days at the same times conflict identically,
+		# so overlap is computed once per distinct (days, interval) signature.
+		by_signature: Dict[Tuple[int, Tuple[int, int]], List[int]] = {}
+		for candidate, section in enumerate(self.sections):
+			interval = _meeting_interval(section)
+			if interval is not None:
+				by_signature.setdefault((section.day_mask, interval), []).append(candidate)
+		signatures = list(by_signature.items())
+		conflicts = [0] * len(self.sections)
+		for position, ((days_a, (start_a, end_a)), members_a) in enumerate(signatures):
+			for (days_b, (start_b, end_b)), members_b in signatures[position:]:
+				if not days_a & days_b or not (start_a < end_b and start_b < end_a):
+					continue
+				for a in members_a:
+					for b in members_b:
+						if component_of[a] != component_of[b]:
+							conflicts[a] |= 1 << b
+							conflicts[b] |= 1 << a
+		return conflicts
+
+	def _undominated(self, candidates: List[int]) -> List[int]:
+		"""Drop candidates that score no better than an earlier one and conflict with more."""
+		kept: List[int] = []
+		for candidate in candidates:
+			mask = self.conflicts[candidate]
+			if not any(not self.conflicts[other] & ~mask for other in kept):
+				kept.append(candidate)
+		return kept
+
+	def greedy(self) -> Dict[int, List[int]]:
+		"""Course-by-course first fit in plan order; the solver's starting incumbent."""
+		timetable = TermTimetable()
+		chosen: Dict[int, List[int]] = {}
+		for course_index, components in enumerate(self.components):
+			if not components:
+				continue
+			picks: List[int] = []
+			picked_mask = 0
+			for candidates in components:
+				for candidate in candidates:
+					if self.conflicts[candidate] & picked_mask or timetable.conflicts(self.sections[candidate]):
+						continue
+					picks.append(candidate)
+					picked_mask |= 1 << candidate
+					break
+				else:
+					break
+			if len(picks) == len(components):
+				for candidate in picks:
+					timetable.add(self.sections[candidate])
+				chosen[course_index] = picks
+		return chosen
+
+	def blocking_type(self, course_index: int, schedule: Dict[int, List[int]]) -> Optional[str]:
+		"""The section type that keeps an unplaced course out of schedule.
+
+		For a filtered-out course it is the type with no candidates; otherwise the first
+		type (in SECTION_TYPE_PRIORITY order) with no section fitting around the other
+		courses' picks and this course's earlier types, taking the best fit for each.
+		"""
+		if course_index in self.unavailable:
+			return self.unavailable[course_index]
+		used = 0
+		for picks in schedule.values():
+			for candidate in picks:
+				used |= 1 << candidate
+		for section_type, candidates in zip(self.component_types[course_index], self.all_components[course_index]):
+			for candidate in candidates:
+				if not self.conflicts[candidate] & used:
+					used |= 1 << candidate
+					break
+			else:
+				return section_type
+		return None
+
+	def solve(self, node_limit: int = SECTION_SOLVER_NODE_LIMIT) -> Dict[int, List[int]]:
+		"""Branch-and-bound for the most courses placed, then the highest summed score.
+
+		Returns course index -> chosen candidate per section type. After node_limit
+		search nodes the best schedule found so far (never worse than greedy) is
+		returned; the limit is a node count, so the result does not depend on timing.
+		"""
+		scores = self.scores
+		conflicts = self.conflicts
+		best = self.greedy()
+		best_key = [len(best), sum(scores[c] for picks in best.values() for c in picks)]
+		order = sorted(
+			(index for index, components in enumerate(self.components) if components),
+			key=lambda index: math.prod(len(candidates) for candidates in self.components[index]),
+		)
+		# Optimistic score still available from order[k:], and within a course from component j on
+		course_best = {index: [scores[candidates[0]] for candidates in self.components[index]] for index in order}
+		suffix_best = [0.0] * (len(order) + 1)
+		for k in range(len(order) - 1, -1, -1):
+			suffix_best[k] = suffix_best[k + 1] + sum(course_best[order[k]])
+		nodes = 0
+		picks: Dict[int, List[int]] = {}
+
+		def promising(count: int, score: float) -> bool:
+			return count > best_key[0] or (count == best_key[0] and score > best_key[1])
+
+		def place_course(k: int, used: int, count: int, score: float) -> None:
+			nonlocal best, nodes
+			nodes += 1
+			if nodes > node_limit:
+				raise TimeoutError
+			if k == len(order):
+				if promising(count, score):
+					best = {index: list(chosen) for index, chosen in picks.items()}
+					best_key[:] = [count, score]
+				return
+			if not promising(count + len(order) - k, score + suffix_best[k]):
+				return
+			course_index = order[k]
+			components = self.components[course_index]
+			remaining = course_best[course_index]
+			chosen: List[int] = []
+
+			def place_component(j: int, used: int, course_score: float) -> None:
+				if j == len(components):
+					picks[course_index] = chosen
+					place_course(k + 1, used, count + 1, score + course_score)
+					del picks[course_index]
+					return
+				bound = score + course_score + sum(remaining[j:]) + suffix_best[k + 1]
+				if not promising(count + len(order) - k, bound):
+					return
+				for candidate in components[j]:
+					if conflicts[candidate] & used:
+						continue
+					chosen.append(candidate)
+					place_component(j + 1, used | 1 << candidate, course_score + scores[candidate])
+					chosen.pop()
+
+			place_component(0, used, 0.0)
+			place_course(k + 1, used, count, score)
+
+		try:
+			place_course(0, 0, 0, 0.0)
+		except TimeoutError:
+			nodes = node_limit
+			_count("section_solver_timeouts")
+		_count("section_solver_nodes", nodes)
+		return best
+
+
+	def ranked(
+		self,
+		expansion_limit: int = SCHEDULE_OPTIONS_EXPANSION_LIMIT,
+	) -> Iterator[Tuple[float, Dict[int, List[int]]]]:
+		"""Yield (score, schedule) best first, for schedules placing the most courses.
+
+		Best-first search over partial assignments, one section type of one course at a
+		time (most constrained course first). A partial schedule is ranked by the courses
+		it can still place and the score it can still reach, counting for each remaining
+		section type its best section that fits, so complete schedules leave the heap in
+		rank order and only as many are built as the caller consumes. Siblings are
+		queued lazily, one per pop. Iteration stops early after expansion_limit pops.
+		"""
+		order = sorted(
+			(index for index, components in enumerate(self.all_components) if components),
+			key=lambda index: math.prod(len(candidates) for candidates in self.all_components[index]),
+		)
+		variables: List[Tuple[int, int]] = []
+		lists: List[List[int]] = []
+		course_end: List[int] = []
+		for course_index in order:
+			components = self.all_components[course_index]
+			end = len(variables) + len(components)
+			for j, candidates in enumerate(components):
+				variables.append((course_index, j))
+				lists.append(candidates)
+				course_end.append(end)
+		total = len(variables)
+		scores = self.scores
+		conflicts = self.conflicts
+
+		def first_fit(v: int, position: int, used: int) -> int:
+			candidates = lists[v]
+			while position < len(candidates) and conflicts[candidates[position]] & used:
+				position += 1
+			return position
+
+		def outlook(v: int, used: int) -> Optional[Tuple[int, float]]:
+			"""Courses and score still reachable from variable v on; None if v's course is stuck."""
+			courses, score = 0, 0.0
+			while v < total:
+				end = course_end[v]
+				course_score = 0.0
+				for w in range(v, end):
+					position = first_fit(w, 0, used)
+					if position == len(lists[w]):
+						break
+					course_score += scores[lists[w][position]]
+				else:
+					courses += 1 if variables[v][1] == 0 else 0
+					score += course_score
+					v = end
+					continue
+				if variables[v][1] != 0:
+					return None
+				v = end
+			return courses, score
+
+		heap: List[Tuple[int, float, int, int, int, int, int, int, float, Tuple[int, ...], Optional[Tuple[int, float]]]] = []
+		sequence = 0
+
+		def push(
+			v: int,
+			position: int,
+			used: int,
+			count: int,
+			score: float,
+			picks: Tuple[int, ...],
+			rest: Optional[Tuple[int, float]] = None,
+		) -> None:
+			"""Queue "variable v takes lists[v][position] or a later section"; past the end
+			of a course's first list means skipping the course. rest is outlook(v + 1, used).
+			"""
+			nonlocal sequence
+			if v == total:
+				count_bound, score_bound, rest = count, score, (0, 0.0)
+			else:
+				first = variables[v][1] == 0
+				if rest is None:
+					rest = outlook(v + 1, used)
+				if rest is None:
+					# The course's later section types cannot fit; only skipping it is left
+					if not first:
+						return
+					position = len(lists[v])
+				else:
+					position = first_fit(v, position, used)
+				if position < len(lists[v]):
+					count_bound = count + (1 if first else 0) + rest[0]
+					score_bound = score + scores[lists[v][position]] + rest[1]
+				elif first:
+					skipped = outlook(course_end[v], used)
+					count_bound, score_bound = count + skipped[0], score + skipped[1]
+				else:
+					return
+			sequence += 1
+			# Ties go to the deeper partial schedule so equal-scoring sections are completed
+			# one at a time instead of breadth-first.
+			heapq.heappush(
+				heap,
+				(-count_bound, -round(score_bound, 9), -v, sequence, v, position, used, count, score, picks, rest),
+			)
+
+		push(0, 0, 0, 0, 0.0, ())
+		best_count: Optional[int] = None
+		expansions = 0
+		while heap and expansions < expansion_limit:
+			expansions += 1
+			neg_count_bound, _, _, _, v, position, used, count, score, picks, rest = heapq.heappop(heap)
+			if best_count is not None and -neg_count_bound < best_count:
+				return
+			if v == total:
+				best_count = count
+				schedule: Dict[int, List[int]] = {}
+				for (course_index, _), candidate in zip(variables, picks):
+					if candidate >= 0:
+						schedule.setdefault(course_index, []).append(candidate)
+				yield score, schedule
+				continue
+			first = variables[v][1] == 0
+			if position < len(lists[v]):
+				candidate = lists[v][position]
+				push(v, position + 1, used, count, score, picks, rest)
+				push(
+					v + 1,
+					0,
+					used | 1 << candidate,
+					count + (1 if first else 0),
+					score + scores[candidate],
+					picks + (candidate,),
+				)
+			else:
+				skip_to = course_end[v]
+				push(skip_to, 0, used, count, score, picks + (-1,) * (skip_to - v))
+
+
+def _section_selection(
+	problem: TermSectionProblem,
+	candidates: List[int],
+) -> Dict[str, Any]:
+	selected: List[Dict[str, Any]] = []
+	for candidate in candidates:
+		section_dict = problem.sections[candidate].to_plan_dict()
+		section_dict["score"] = round(problem.scores[candidate], 2)
+		selected.append(section_dict)
+	selection: Dict[str, Any] = {"status": "matched", "section": selected[0]}
+	if len(selected) > 1:
+		selection["linked_sections"] = selected[1:]
+	return selection
+
+
+def _term_course_sections(
+	term: Dict[str, Any],
+	schedule: ScheduleSectionIndex,
+) -> List[Tuple[Dict[str, Any], str, List[ScheduleSection]]]:
+	"""(entry, slug, sections) for each scheduled course in the term, in plan order."""
+	results: List[Tuple[Dict[str, Any], str, List[ScheduleSection]]] = []
+	for course_entry in term.get("courses", []):
+		if course_entry.get("type") != "course":
+			continue
+		course_code = course_entry.get("course")
+		if not course_code:
+			continue
+		course_slug = course_code_to_slug(normalize_course_code(course_code))
+		if not course_slug:
+			continue
+		results.append((course_entry, course_slug, schedule.courses.get(course_slug, [])))
+	return results
+
+
+def _schedule_options(
+	problem: TermSectionProblem,
+	course_codes: List[str],
+	k: int,
+	expansion_limit: int,
+) -> List[Dict[str, Any]]:
+	options: List[Dict[str, Any]] = []
+	if not course_codes:
+		return options
+	for rank, (score, schedule) in enumerate(itertools.islice(problem.ranked(expansion_limit), k), start=1):
+		courses: List[Dict[str, Any]] = []
+		for position, course_code in enumerate(course_codes):
+			if position in schedule:
+				selection = _section_selection(problem, schedule[position])
+			else:
+				selection = {"status": "unavailable" if position in problem.unavailable else "conflict"}
+				blocked_by = problem.blocking_type(position, schedule)
+				if blocked_by is not None:
+					selection["blocked_by"] = blocked_by
+			courses.append({"course": course_code, "section_selection": selection})
+		options.append({"rank": rank, "score": round(score, 2), "courses": courses})
+	return options
+
+
+def term_schedule_options(
+	term: Dict[str, Any],
+	student_profile: Dict[str, Any],
+	datastore: DataStore,
+	k: int = 20,
+	expansion_limit: int = SCHEDULE_OPTIONS_EXPANSION_LIMIT,
+) -> List[Dict[str, Any]]:
+	"""The k best conflict-free section combinations for one planned term, best first.
+
+	Only combinations placing as many courses as the best one are listed. Fewer than k
+	come back when no more exist or the search reaches expansion_limit.
+	"""
+	preferences = _parse_schedule_preferences(student_profile.get("schedule_preferences"))
+	schedule = datastore.section_index
+	scheduled = [(entry, slug, sections) for entry, slug, sections in _term_course_sections(term, schedule) if sections]
+	problem = TermSectionProblem(
+		[(slug, sections) for _, slug, sections in scheduled],
+		preferences,
+		preferences.section_filter(schedule),
+	)
+	return _schedule_options(problem, [entry.get("course") for entry, _, _ in scheduled], k, expansion_limit)
+
+
+def assign_sections_to_plan(
+	plan: List[Dict[str, Any]],
+	student_profile: Dict[str, Any],
+	datastore: DataStore,
+	node_limit: int = SECTION_SOLVER_NODE_LIMIT,
+) -> List[str]:
+	"""Pick a conflict-free section (one per section type) for every course of each term.
+
+	Each term is solved as a whole, so an early course no longer takes the only time
+	slot a later course could use; node_limit bounds the search per term. A course
+	left without sections gets "blocked_by", the section type (e.g. LAB) that could
+	not be filled.
+	"""
+	preferences = _parse_schedule_preferences(student_profile.get("schedule_preferences"))
+	if not preferences.enabled:
+		return []
+	# One schedule for the whole plan, even if reload_schedule swaps it meanwhile
+	schedule = datastore.section_index
+	if not schedule.courses:
+		return ["Schedule data unavailable; could not match course sections."]
+	section_filter = preferences.section_filter(schedule)
+	warnings: List[str] = []
+	for term in plan:
+		entries = _term_course_sections(term, schedule)
+		scheduled = [(entry, slug, sections) for entry, slug, sections in entries if sections]
+		problem = TermSectionProblem([(slug, sections) for _, slug, sections in scheduled], preferences, section_filter)
+		solution = problem.solve(node_limit)
+		if preferences.alternatives:
+			term["schedule_options"] = _schedule_options(
+				problem,
+				[entry.get("course") for entry, _, _ in scheduled],
+				preferences.alternatives,
+				SCHEDULE_OPTIONS_EXPANSION_LIMIT,
+			)
+		positions = {id(entry): position for position, (entry, _, _) in enumerate(scheduled)}
+		for course_entry, _, sections in entries:
+			course_code = course_entry.get("course")
+			blocked_by: Optional[str] = None
+			if not sections:
+				message = f"No scheduled sections found for {course_code}."
+				status = "unavailable"
+			else:
+				position = positions[id(course_entry)]
+				if position in solution:
+					course_entry["section_selection"] = _section_selection(problem, solution[position])
+					continue
+				blocked_by = problem.blocking_type(position, solution)
+				# Name the section type only when the course needs more than one
+				linked = f" ({blocked_by})" if blocked_by and len(problem.component_types[position]) > 1 else ""
+				if position in problem.unavailable:
+					message = f"No sections met the filters for {course_code}{linked}."
+					status = "unavailable"
+				else:
+					message = f"No available section for {course_code}{linked} without time conflicts given preferences."
+					status = "conflict"
+			warnings.append(message)
+			course_entry["section_selection"] = {
+				"status": status,
+				"message": message,
+			}
+			if blocked_by is not None:
+				course_entry["section_selection"]["blocked_by"] = blocked_by
+	return warnings
+
+
+def build_student_record(student_profile: Dict[str, Any], datastore: DataStore) -> StudentRecord:
+	record = StudentRecord()
+
+	# Process SJSU courses
+	for course in student_profile.get("sjsu_courses", []) or []:
+		code = normalize_course_code(course.get("code", ""))
+		slug = course_code_to_slug(code)
+		status = (course.get("status") or "").lower()
+		grade = course.get("grade")
 		if status == "in progress":
 			record.in_progress_courses.add(slug)
 			continue
 		if not is_passing_grade(grade):
 			continue
 		info = datastore.course_catalog.get(slug)
-		ge_from_course, ai_from_course = split_ge_ai(info.ge_areas if info else [])
+		ge_from_course, ai_from_course = datastore.course_areas(slug)
 		record.add_completion(
 			slug,
 			Completion(
@@ -1020,7 +3105,7 @@ def build_student_record(student_profile: Dict[str, Any], datastore: DataStore)
 				normalized_code = normalize_course_code(course_code)
 				slug = course_code_to_slug(normalized_code)
 				info = datastore.course_catalog.get(slug)
-				ge_from_course, ai_from_course = split_ge_ai(info.ge_areas if info else [])
+				ge_from_course, ai_from_course = datastore.course_areas(slug)
 				combined_ge = set(ge_from_course) | ge_areas
 				combined_ai = set(ai_from_course) | ai_areas
 				record.add_completion(
@@ -1046,70 +3131,14 @@ def build_student_record(student_profile: Dict[str, Any], datastore: DataStore)
 
 	for institution, courses in by_institution.items():
 		articulation = datastore.load_cc_articulation(institution)
-		if not articulation:
+		if articulation is None:
 			continue
-		catalog_by_code: Dict[str, Dict[str, Any]] = {}
-		for section in articulation.get("output", []):
-			for mapped in section.get("courses", []):
-				sjsu_course = normalize_course_code(mapped.get("sjsu_course", ""))
-				if not sjsu_course or sjsu_course == "NONE":
-					continue
-				slug = course_code_to_slug(sjsu_course)
-				catalog_by_code.setdefault(slug, []).append(mapped.get("equivalents", []))
-
 		student_cc = {normalize_course_code(c.get("code", "")): c for c in courses if is_passing_grade(c.get("grade"))}
-		for slug, equivalent_groups in catalog_by_code.items():
+		for slug, used_courses in articulation.match(student_cc.keys()):
 			if slug in record.completed_courses:
 				continue
-			matched = False
-			used_courses: List[str] = []
-			for equivalents in equivalent_groups:
-				if not equivalents:
-					continue
-				combos = []
-				current: List[str] = []
-				current_kind = "SINGLE"
-				for item in equivalents:
-					if item.startswith("||"):
-						if current:
-							combos.append((current_kind, current.copy()))
-						current_kind = "ANY"
-						current = [normalize_course_code(item[2:])]
-					elif item.startswith("&&"):
-						if current:
-							combos.append((current_kind, current.copy()))
-						current_kind = "ALL"
-						current = [normalize_course_code(item[2:])]
-					else:
-						if not current:
-							current_kind = "SINGLE"
-						current.append(normalize_course_code(item))
-				if current:
-					combos.append((current_kind, current.copy()))
-
-				for kind, requirements in combos:
-					if not requirements or requirements[0] == "NONE":
-						continue
-					if kind == "ALL":
-						if all(req in student_cc for req in requirements):
-							used_courses = requirements
-							matched = True
-							break
-					else:  # ANY or SINGLE
-						for req in requirements:
-							if req in student_cc:
-								used_courses = [req]
-								matched = True
-								break
-						if matched:
-							break
-				if matched:
-					break
-
-			if not matched:
-				continue
 			info = datastore.course_catalog.get(slug)
-			ge_from_course, ai_from_course = split_ge_ai(info.ge_areas if info else [])
+			ge_from_course, ai_from_course = datastore.course_areas(slug)
 			record.add_completion(
 				slug,
 				Completion(
@@ -1274,7 +3303,14 @@ def deduplicate_ge_requirements(
 	datastore: DataStore,
 ) -> List[Requirement]:
 	"""Remove GE requirements that are already satisfied by specific course requirements in the roadmap"""
-	# Build a map of which GE areas are satisfied by course requirements
+	return _filter_redundant_ge(requirements, map_ge_areas_to_courses(requirements, datastore))
+
+
+def map_ge_areas_to_courses(
+	requirements: Sequence[Requirement],
+	datastore: DataStore,
+) -> Dict[str, List[str]]:
+	"""Map each GE area to the required course slugs that satisfy it."""
 	ge_areas_from_courses: Dict[str, List[str]] = {}  # ge_area -> list of course_slugs that satisfy it
 	
 	for req in requirements:
@@ -1286,8 +3322,14 @@ def deduplicate_ge_requirements(
 						if ge_area not in ge_areas_from_courses:
 							ge_areas_from_courses[ge_area] = []
 						ge_areas_from_courses[ge_area].append(slug)
-	
-	# Now filter out GE requirements that are redundant
+	return ge_areas_from_courses
+
+
+def _filter_redundant_ge(
+	requirements: List[Requirement],
+	ge_areas_from_courses: Dict[str, List[str]],
+) -> List[Requirement]:
+	# Filter out GE requirements whose areas are all covered by required courses
 	filtered_requirements = []
 	for req in requirements:
 		if req.requirement_type == "ge" and req.ge_areas:
@@ -1305,6 +3347,60 @@ def deduplicate_ge_requirements(
 	return filtered_requirements
 
 
+def _major_specific_courses(
+	academic_catalog: Optional[Dict[str, Any]],
+	requirement_name: str,
+) -> Optional[List[str]]:
+	"""Extract major-specific course options from academic catalog"""
+	if not academic_catalog:
+		return None
+	
+	catalog_data = academic_catalog.get("output", {})
+	req_key = normalize_key(requirement_name)
+	
+	# Check optional_sequences (like Science Electives)
+	optional_sequences = catalog_data.get("major_requirements", {}).get("optional_sequences", [])
+	for seq in optional_sequences:
+		seq_name = seq.get("name", "")
+		seq_key = normalize_key(seq_name)
+		
+		# Direct match
+		if seq_key == req_key:
+			courses = []
+			for option_group in seq.get("options", []):
+				for option in option_group:
+					course_code = option.lstrip("|&").strip()
+					if course_code and course_code != "NONE":
+						courses.append(course_code)
+			if courses:
+				return courses
+	
+	# Check field_requirements (like Major Electives)
+	field_requirements = catalog_data.get("field_requirements", [])
+	for field in field_requirements:
+		field_name = field.get("field_name", "")
+		field_key = normalize_key(field_name)
+		
+		# For electives, check if the field name matches
+		# "Computer Science Elective" should match "Major Electives" if it contains CS courses
+		if field_key == req_key:
+			courses = field.get("courses", [])
+			if courses:
+				return courses
+		
+		# Fuzzy match: "Computer Science Elective" or "Upper Division Computer Science Elective" 
+		# should match field that has "Major Electives" and contains CS courses
+		if "elective" in req_key and "elective" in field_key:
+			courses = field.get("courses", [])
+			# Check if this is a CS major electives field (has CS courses)
+			if courses and any(c.startswith("CS ") for c in courses[:5] if isinstance(c, str)):
+				# Only match if requirement mentions "computer" or "cs" or is generic "elective"
+				if "computer" in req_key or "cs" in req_key or req_key == "elective":
+					return courses
+	
+	return None
+
+
 def evaluate_requirement(
 	requirement: Requirement,
 	record: StudentRecord,
@@ -1316,8 +3412,9 @@ def evaluate_requirement(
 		"display_name": requirement.display_name,
 		"type": requirement.requirement_type,
 		"units": requirement.units,
-		"ge_areas": requirement.ge_areas,
-		"ai_areas": requirement.ai_areas,
+		# Copies: the requirement belongs to a cached skeleton shared by every request
+		"ge_areas": list(requirement.ge_areas),
+		"ai_areas": list(requirement.ai_areas),
 		"status": "remaining",
 		"source": None,
 		"detail": None,
@@ -1327,56 +3424,6 @@ def evaluate_requirement(
 		info = datastore.course_catalog.get(slug)
 		return info.code if info else slug.replace("_", " ")
 	
-	def _get_major_specific_courses(requirement_name: str) -> Optional[List[str]]:
-		"""Extract major-specific course options from academic catalog"""
-		if not academic_catalog:
-			return None
-		
-		catalog_data = academic_catalog.get("output", {})
-		req_key = normalize_key(requirement_name)
-		
-		# Check optional_sequences (like Science Electives)
-		optional_sequences = catalog_data.get("major_requirements", {}).get("optional_sequences", [])
-		for seq in optional_sequences:
-			seq_name = seq.get("name", "")
-			seq_key = normalize_key(seq_name)
-			
-			# Direct match
-			if seq_key == req_key:
-				courses = []
-				for option_group in seq.get("options", []):
-					for option in option_group:
-						course_code = option.lstrip("|&").strip()
-						if course_code and course_code != "NONE":
-							courses.append(course_code)
-				if courses:
-					return courses
-		
-		# Check field_requirements (like Major Electives)
-		field_requirements = catalog_data.get("field_requirements", [])
-		for field in field_requirements:
-			field_name = field.get("field_name", "")
-			field_key = normalize_key(field_name)
-			
-			# For electives, check if the field name matches
-			# "Computer Science Elective" should match "Major Electives" if it contains CS courses
-			if field_key == req_key:
-				courses = field.get("courses", [])
-				if courses:
-					return courses
-			
-			# Fuzzy match: "Computer Science Elective" or "Upper Division Computer Science Elective" 
-			# should match field that has "Major Electives" and contains CS courses
-			if "elective" in req_key and "elective" in field_key:
-				courses = field.get("courses", [])
-				# Check if this is a CS major electives field (has CS courses)
-				if courses and any(c.startswith("CS ") for c in courses[:5] if isinstance(c, str)):
-					# Only match if requirement mentions "computer" or "cs" or is generic "elective"
-					if "computer" in req_key or "cs" in req_key or req_key == "elective":
-						return courses
-		
-		return None
-
 	if requirement.requirement_type == "course":
 		course_slugs = requirement.all_course_slugs()
 		for slug in course_slugs:
@@ -1416,21 +3463,11 @@ def evaluate_requirement(
 			if not info:
 				continue
 			prereq_strings: List[str] = []
-			for group in info.prerequisites:
-				options = group.course_option_groups()
-				if not options:
-					continue
-				effective_kind = group.kind
-				if effective_kind == "SINGLE" and (
-					len(options) > 1 or (options and len(options[0]) > 1)
-				):
-					effective_kind = "ANY"
+			for group in datastore.prereq_graph.prerequisites_for(slug):
 				display_segments = [
-					" or ".join(code.replace("_", " ") for code in option) for option in options
+					" or ".join(code.replace("_", " ") for code in option) for option in group.option_codes
 				]
-				if not display_segments:
-					continue
-				if effective_kind == "ANY":
+				if group.kind == "ANY":
 					prereq_strings.append(" OR ".join(display_segments))
 				else:
 					prereq_strings.append(" AND ".join(display_segments))
@@ -1472,45 +3509,9 @@ def evaluate_requirement(
 				}
 			)
 		else:
-			# First try to get major-specific courses
-			major_courses = _get_major_specific_courses(requirement.display_name)
-			if major_courses:
-				result["suggested_courses"] = major_courses
-			else:
-				# Fall back to generic GE catalog
-				if requirement.ge_areas:
-					req_lower = requirement.display_name.lower()
-					# Special handling for Science Electives with lab requirement
-					# If this is a "5B and 5C" or "5C" requirement with Science keyword,
-					# show all major's Science Electives that have lab (5C), not just life science (5B)
-					if ("5b" in req_lower and "5c" in req_lower) or ("science" in req_lower and "5c" in req_lower):
-						major_courses = _get_major_specific_courses("Science Electives")
-						if major_courses:
-							# Filter Science Electives to only those with lab component (Area 5C)
-							area_5c_courses = set(datastore.ge_catalog.get("GE_AREA_5C", {}).get("courses", []))
-							if area_5c_courses:
-								cleaned_major = [m.lstrip("|&").strip() for m in major_courses]
-								suggested = [
-									m for m in cleaned_major
-									if any(normalize_course_code(m) == normalize_course_code(c) for c in area_5c_courses)
-								]
-								result["suggested_courses"] = suggested
-					
-					# If no special handling or no results, use standard GE intersection
-					if "suggested_courses" not in result:
-						if len(requirement.ge_areas) > 1:
-							candidate_sets = []
-							for area in requirement.ge_areas:
-								area_courses = set(datastore.ge_catalog.get(area, {}).get("courses", []))
-								if area_courses:
-									candidate_sets.append(area_courses)
-							if candidate_sets:
-								suggested = list(candidate_sets[0].intersection(*candidate_sets[1:]))
-								result["suggested_courses"] = suggested
-						else:
-							ge_info = datastore.ge_catalog.get(requirement.ge_areas[0])
-							if ge_info:
-								result["suggested_courses"] = ge_info.get("courses", [])
+			suggested = datastore.suggest_for_requirement(requirement, academic_catalog)
+			if suggested is not None:
+				result["suggested_courses"] = suggested
 			result.setdefault("units", requirement.units or 3.0)
 			if requirement.ge_areas:
 				ge_info = datastore.ge_catalog.get(requirement.ge_areas[0])
@@ -1520,7 +3521,7 @@ def evaluate_requirement(
 
 	if requirement.requirement_type == "elective":
 		# Check if there are major-specific elective courses
-		major_courses = _get_major_specific_courses(requirement.display_name)
+		major_courses = _major_specific_courses(academic_catalog, requirement.display_name)
 		if major_courses:
 			result.update(
 				{
@@ -1555,15 +3556,20 @@ def evaluate_requirement(
 	return result
 
 
+def load_major_requirements(major_name: str, datastore: DataStore) -> List[Requirement]:
+	"""Return the (cached) requirement list for a major; it does not depend on the student."""
+	return list(datastore.requirement_skeleton(major_name).requirements)
+
+
 def analyze_requirements(
 	student_profile: Dict[str, Any],
 	datastore: DataStore,
+	requirements: Optional[List[Requirement]] = None,
 ) -> Tuple[StudentRecord, List[Dict[str, Any]], List[Dict[str, Any]], List[Requirement]]:
-	roadmap = datastore.load_roadmap(student_profile.get("major", ""))
-	requirements = build_requirements(roadmap)
-	# Remove duplicate GE requirements that are satisfied by specific course requirements
-	requirements = deduplicate_ge_requirements(requirements, datastore)
-	record = build_student_record(student_profile, datastore)
+	if requirements is None:
+		requirements = load_major_requirements(student_profile.get("major", ""), datastore)
+	with _stage("build_student_record"):
+		record = build_student_record(student_profile, datastore)
 	
 	# Load academic catalog for major-specific course suggestions
 	academic_catalog = datastore.load_academic_catalog(student_profile.get("major", ""))
@@ -1602,148 +3608,442 @@ def _requirement_units(requirement: Requirement, datastore: DataStore) -> float:
 	return requirement.units or 3.0
 
 
+def _units_remaining(requirements: Sequence[Requirement], record: StudentRecord, facts: RequirementFacts) -> float:
+	"""Units still owed: untouched course requirements, GE areas not yet met, and activities."""
+	units_remaining = sum(
+		facts.units[id(req)]
+		for req in requirements
+		if req.requirement_type == "course"
+		and facts.slugs[id(req)]
+		and all(slug not in record.completed_courses for slug in facts.slugs[id(req)])
+		and all(slug not in record.in_progress_courses for slug in facts.slugs[id(req)])
+	)
+	units_remaining += sum(
+		facts.units[id(req)]
+		for req in requirements
+		if req.requirement_type == "ge"
+		and any(area not in record.fulfilled_ge for area in req.ge_areas)
+	)
+	units_remaining += sum(
+		facts.units[id(req)]
+		for req in requirements
+		if req.requirement_type == "activity"
+	)
+	return units_remaining
+
+
 def _prerequisites_satisfied(
 	course_slug: str,
 	completed: Set[str],
 	required_slugs: Set[str],
 	datastore: DataStore,
 ) -> bool:
-	info = datastore.course_catalog.get(course_slug)
-	if not info or not info.prerequisites:
-		return True
-	for group in info.prerequisites:
-		option_groups = group.course_option_groups()
-		if not option_groups:
-			continue
+	_count("prerequisites_satisfied_calls")
+	return datastore.prereq_graph.prerequisites_satisfied(course_slug, completed, required_slugs)
 
-		def _options_to_slugs(options: List[str]) -> List[str]:
-			slugs: List[str] = []
-			for option in options:
-				slug = course_code_to_slug(option)
-				if slug in datastore.course_catalog or slug in completed or slug in required_slugs:
-					if slug not in slugs:
-						slugs.append(slug)
-			return slugs
 
-		effective_kind = group.kind
-		if effective_kind == "SINGLE" and (
-			len(option_groups) > 1 or (option_groups and len(option_groups[0]) > 1)
-		):
-			effective_kind = "ANY"
+MIN_UPPER_DIVISION_UNITS = 60.0
+PREREQ_NOTE = "Prerequisite data missing; verify with advisor."
 
-		group_references_program = False
 
-		if effective_kind == "ANY":
-			references_program = False
-			satisfied = False
-			for options in option_groups:
-				slugs = _options_to_slugs(options)
-				if not slugs:
-					continue
-				if any(slug in required_slugs for slug in slugs):
-					references_program = True
-				if any(slug in completed for slug in slugs):
-					satisfied = True
-					break
-			if references_program and not satisfied:
-				return False
-		else:  # ALL or SINGLE
-			for options in option_groups:
-				slugs = _options_to_slugs(options)
-				if not slugs:
-					continue
-				if any(slug in required_slugs for slug in slugs):
-					if not any(slug in completed for slug in slugs):
-						return False
-	return True
+def _slug_is_upper_division(slug: str, datastore: DataStore) -> bool:
+	info = datastore.course_catalog.get(slug)
+	if info and info.code:
+		number = extract_course_number(info.code)
+		if number is not None:
+			return number >= 100
+	# Fallback: parse from slug token
+	parts = slug.split("_")
+	if len(parts) > 1:
+		number = extract_course_number(parts[1]) if parts[1] else None
+		if number is not None:
+			return number >= 100
+	return False
 
 
-def plan_semesters(
-	student_profile: Dict[str, Any],
-	record: StudentRecord,
-	requirements: List[Requirement],
-	datastore: DataStore,
-	academic_catalog: Optional[Dict[str, Any]] = None,
-) -> Tuple[List[Dict[str, Any]], float]:
-	units_per_semester = float(student_profile.get("units_per_semester") or 15)
-	max_semester_units = units_per_semester
-	
-	def get_major_specific_courses(requirement_name: str) -> Optional[List[str]]:
-		"""Extract major-specific course options from academic catalog"""
-		if not academic_catalog:
-			return None
-		
-		catalog_data = academic_catalog.get("output", {})
-		req_key = normalize_key(requirement_name)
-		
-		# Check optional_sequences (like Science Electives)
-		optional_sequences = catalog_data.get("major_requirements", {}).get("optional_sequences", [])
-		for seq in optional_sequences:
-			seq_name = seq.get("name", "")
-			seq_key = normalize_key(seq_name)
-			
-			# Direct match
-			if seq_key == req_key:
-				courses = []
-				for option_group in seq.get("options", []):
-					for option in option_group:
-						course_code = option.lstrip("|&").strip()
-						if course_code and course_code != "NONE":
-							courses.append(course_code)
-				if courses:
-					return courses
-		
-		# Check field_requirements (like Major Electives)
-		field_requirements = catalog_data.get("field_requirements", [])
-		for field in field_requirements:
-			field_name = field.get("field_name", "")
-			field_key = normalize_key(field_name)
-			
-			# For electives, check if the field name matches
-			# "Computer Science Elective" should match "Major Electives" if it contains CS courses
-			if field_key == req_key:
-				courses = field.get("courses", [])
-				if courses:
-					return courses
-			
-			# Fuzzy match: "Computer Science Elective" or "Upper Division Computer Science Elective" 
-			# should match field that has "Major Electives" and contains CS courses
-			if "elective" in req_key and "elective" in field_key:
-				courses = field.get("courses", [])
-				# Check if this is a CS major electives field (has CS courses)
-				if courses and any(c.startswith("CS ") for c in courses[:5] if isinstance(c, str)):
-					# Only match if requirement mentions "computer" or "cs" or is generic "elective"
-					if "computer" in req_key or "cs" in req_key or req_key == "elective":
-						return courses
-		
-		return None
+def _earliest_semester_index(req: Requirement) -> int:
+	if req.year and req.year > 0:
+		year_index = req.year - 1
+	else:
+		year_index = 0
+	term_index = req.term_order if req.term_order is not None else 0
+	if term_index >= 99:
+		term_index = 0
+	if term_index > 1:
+		term_index = 1
+	return max(0, year_index * 2 + term_index)
 
-	def slug_to_display(slug: str) -> str:
-		info = datastore.course_catalog.get(slug)
-		return info.code if info else slug.replace("_", " ")
 
-	def earliest_semester_index(req: Requirement) -> int:
-		if req.year and req.year > 0:
-			year_index = req.year - 1
+def _required_course_slugs(requirements: Iterable[Requirement]) -> FrozenSet[str]:
+	required_slugs: Set[str] = set()
+	for req in requirements:
+		if req.requirement_type == "course":
+			required_slugs.update(req.all_course_slugs())
+	return frozenset(required_slugs)
+
+
+class RequirementFacts:
+	"""Student-independent values the planner reads for each requirement.
+
+	Dicts are keyed by id(requirement) since Requirement is unhashable; the
+	requirements must outlive the facts (RequirementSkeleton holds both).
+	"""
+
+	def __init__(self, requirements: Iterable[Requirement], datastore: DataStore) -> None:
+		self.units: Dict[int, float] = {}
+		# Units evaluate_requirement reports for a requirement no completion covers
+		self.listed_units: Dict[int, float] = {}
+		self.earliest: Dict[int, int] = {}
+		self.slugs: Dict[int, List[str]] = {}
+		self.upper_division: Dict[int, bool] = {}
+		self.has_lower_division: Dict[int, bool] = {}
+		self.upper_division_ge: Dict[int, bool] = {}
+		self.slug_upper: Dict[str, bool] = {}
+		for req in requirements:
+			key = id(req)
+			self.units[key] = _requirement_units(req, datastore)
+			self.earliest[key] = _earliest_semester_index(req)
+			slugs = req.all_course_slugs()
+			self.slugs[key] = slugs
+			self.listed_units[key] = req.units
+			if req.requirement_type == "course":
+				info = next((datastore.course_catalog[slug] for slug in slugs if slug in datastore.course_catalog), None)
+				if info is not None:
+					self.listed_units[key] = info.units or req.units
+			flags = []
+			for slug in slugs:
+				if slug not in self.slug_upper:
+					self.slug_upper[slug] = _slug_is_upper_division(slug, datastore)
+				flags.append(self.slug_upper[slug])
+			self.upper_division[key] = any(flags)
+			self.has_lower_division[key] = not all(flags)
+			name_lower = req.display_name.lower()
+			self.upper_division_ge[key] = "upper division" in name_lower or "upper-division" in name_lower
+
+	def covers(self, requirements: Iterable[Requirement]) -> bool:
+		return all(id(req) in self.units for req in requirements)
+
+
+@dataclass(frozen=True)
+class RequirementSkeleton:
+	"""Everything about a major's requirements that does not depend on the student."""
+
+	major_slug: str
+	version: Tuple[int, int]
+	requirements: Tuple[Requirement, ...]
+	required_slugs: FrozenSet[str]
+	ge_areas_from_courses: Dict[str, List[str]]
+	facts: RequirementFacts
+	masks: RequirementMasks
+
+	@classmethod
+	def build(
+		cls,
+		major_slug: str,
+		version: Tuple[int, int],
+		roadmap: Sequence[Dict[str, Any]],
+		datastore: DataStore,
+	) -> RequirementSkeleton:
+		requirements = build_requirements(roadmap)
+		ge_map = map_ge_areas_to_courses(requirements, datastore)
+		# Remove duplicate GE requirements that are satisfied by specific course requirements
+		requirements = _filter_redundant_ge(requirements, ge_map)
+		facts = RequirementFacts(requirements, datastore)
+		return cls(
+			major_slug=major_slug,
+			version=version,
+			requirements=tuple(requirements),
+			required_slugs=_required_course_slugs(requirements),
+			ge_areas_from_courses=ge_map,
+			facts=facts,
+			masks=RequirementMasks(requirements, facts, datastore),
+		)
+
+
+class StudentBits:
+	"""A StudentRecord as bitsets over DataStore.course_ids and DataStore.area_ids."""
+
+	__slots__ = ("completed", "in_progress", "ge", "ai")
+
+	def __init__(self, record: StudentRecord, datastore: DataStore) -> None:
+		self.completed = datastore.bit_mask(record.completed_courses, assign=False)
+		self.in_progress = datastore.bit_mask(record.in_progress_courses, assign=False)
+		self.ge = datastore.bit_mask(record.fulfilled_ge, areas=True, assign=False)
+		self.ai = datastore.bit_mask(record.fulfilled_ai, areas=True, assign=False)
+
+
+class RequirementMasks:
+	"""A major's requirements compiled to bitmasks, for auditing many students at once.
+
+	Each course requirement becomes the mask of its course slugs and each GE
+	requirement the masks of its GE and AI areas, so checking a student is a few
+	integer ANDs per requirement. remaining() agrees with _audit_requirement on which
+	requirements are still "remaining", and units_remaining() with _units_remaining.
+	"""
+
+	def __init__(self, requirements: Sequence[Requirement], facts: RequirementFacts, datastore: DataStore) -> None:
+		self.identifiers = [req.identifier for req in requirements]
+		# (requirement index, course mask, units)
+		self.courses: List[Tuple[int, int, float]] = []
+		# (requirement index, GE mask, AI mask, any AI area suffices, units)
+		self.ge: List[Tuple[int, int, int, bool, float]] = []
+		# Electives and activities never count as done; activities always add their units
+		self.open_requirements: List[int] = []
+		self.activity_units = 0.0
+		for index, req in enumerate(requirements):
+			units = facts.units[id(req)]
+			if req.requirement_type == "course":
+				self.courses.append((index, datastore.bit_mask(facts.slugs[id(req)]), units))
+			elif req.requirement_type == "ge":
+				self.ge.append((
+					index,
+					datastore.bit_mask(req.ge_areas or [], areas=True),
+					datastore.bit_mask(req.ai_areas or [], areas=True),
+					"or" in req.display_name.lower(),
+					units,
+				))
+			elif req.requirement_type in {"elective", "activity"}:
+				self.open_requirements.append(index)
+				if req.requirement_type == "activity":
+					self.activity_units += units
+
+	def units_remaining(self, student: StudentBits) -> float:
+		taken = student.completed | student.in_progress
+		units_remaining = sum(units for _, mask, units in self.courses if mask and not taken & mask)
+		units_remaining += sum(units for _, ge_mask, _, _, units in self.ge if ge_mask & student.ge != ge_mask)
+		return units_remaining + self.activity_units
+
+	def remaining(self, student: StudentBits) -> int:
+		"""Bitset over requirement indices of the requirements still to do."""
+		taken = student.completed | student.in_progress
+		pending = 0
+		for index, mask, _ in self.courses:
+			if not taken & mask:
+				pending |= 1 << index
+		for index, ge_mask, ai_mask, any_ai, _ in self.ge:
+			if ge_mask & student.ge != ge_mask:
+				pending |= 1 << index
+			elif ai_mask and not (ai_mask & student.ai if any_ai else ai_mask & student.ai == ai_mask):
+				pending |= 1 << index
+		for index in self.open_requirements:
+			pending |= 1 << index
+		return pending
+
+	def identifiers_in(self, requirements: int) -> List[str]:
+		return [identifier for index, identifier in enumerate(self.identifiers) if requirements >> index & 1]
+
+
+class _TermState:
+	__slots__ = ("courses", "units", "completed", "max_units")
+
+	def __init__(self, max_units: float) -> None:
+		self.courses: List[Dict[str, Any]] = []
+		self.units = 0.0
+		self.completed: Set[str] = set()
+		self.max_units = max_units
+
+	def is_full(self) -> bool:
+		return self.units >= self.max_units - 0.5
+
+
+class SemesterPlanner:
+	"""Greedy semester planner driven by a prerequisite ready queue.
+
+	Every requirement attribute the greedy passes look at (units, upper-division
+	flags, earliest semester) is computed once up front. Prerequisite readiness is
+	tracked per course slug as the list of still-unsatisfied compiled groups; when
+	a semester closes, only the dependents of the newly completed courses are
+	re-checked, and a course requirement moves from the blocked set onto the ready
+	queue once one of its slugs has no unsatisfied groups left. The course pass
+	walks only the ready queue. Pending unit totals and counts are kept as running
+	totals.
+	"""
+
+	def __init__(
+		self,
+		student_profile: Dict[str, Any],
+		record: StudentRecord,
+		requirements: List[Requirement],
+		datastore: DataStore,
+		academic_catalog: Optional[Dict[str, Any]] = None,
+		skeleton: Optional[RequirementSkeleton] = None,
+	) -> None:
+		self.datastore = datastore
+		self.record = record
+		self.requirements = requirements
+		self.academic_catalog = academic_catalog
+		self.units_per_semester = float(student_profile.get("units_per_semester") or 15)
+		self.max_semester_units = self.units_per_semester
+		self._major_courses_cache: Dict[str, Optional[List[str]]] = {}
+		self._ge_suggestions_cache: Dict[int, List[str]] = {}
+
+		self.completed_prior: Set[str] = set(record.completed_courses.keys()) | set(record.in_progress_courses)
+		if skeleton is not None:
+			self.required_slugs: AbstractSet[str] = skeleton.required_slugs
+		else:
+			self.required_slugs = _required_course_slugs(requirements)
+
+		self.pending_courses = [
+			req
+			for req in requirements
+			if req.requirement_type == "course"
+			and req.all_course_slugs()
+			and all(slug not in record.completed_courses for slug in req.all_course_slugs())
+			and all(slug not in record.in_progress_courses for slug in req.all_course_slugs())
+		]
+		self.pending_ge = [
+			req
+			for req in requirements
+			if req.requirement_type == "ge"
+			and any(area not in record.fulfilled_ge for area in req.ge_areas)
+		]
+		self.pending_electives = [req for req in requirements if req.requirement_type == "elective"]
+		self.pending_activities = [req for req in requirements if req.requirement_type == "activity"]
+
+		if skeleton is not None and skeleton.facts.covers(requirements):
+			facts = skeleton.facts
+		else:
+			facts = RequirementFacts(requirements, datastore)
+		self._units = facts.units
+		self._earliest = facts.earliest
+		self._slugs = facts.slugs
+		self._upper_division = facts.upper_division
+		self._has_lower_division = facts.has_lower_division
+		self._upper_division_ge = facts.upper_division_ge
+		self._slug_upper = dict(facts.slug_upper)
+
+		self.pending_courses.sort(
+			key=lambda req: (
+				self._upper_division[id(req)],
+				req.year or 99,
+				req.term_order or 99,
+				req.order_index,
+			)
+		)
+		# Sort GE with lower-division first, then upper-division
+		self.pending_ge.sort(key=lambda req: (
+			self._upper_division_ge[id(req)],
+			req.year or 99,
+			req.term_order or 99,
+			req.order_index
+		))
+		self.pending_electives.sort(key=lambda req: (req.year or 99, req.term_order or 99, req.order_index))
+		self.pending_activities.sort(key=lambda req: (req.year or 99, req.term_order or 99, req.order_index))
+
+		self.pending_units = {
+			"course": sum(self._units[id(req)] for req in self.pending_courses),
+			"ge": sum(self._units[id(req)] for req in self.pending_ge),
+			"elective": sum(self._units[id(req)] for req in self.pending_electives),
+			"activity": sum(self._units[id(req)] for req in self.pending_activities),
+		}
+		self.initial_total_units = (
+			self.pending_units["course"]
+			+ self.pending_units["ge"]
+			+ self.pending_units["elective"]
+			+ self.pending_units["activity"]
+		)
+		self._lower_division_courses = sum(1 for req in self.pending_courses if self._has_lower_division[id(req)])
+
+		completed_unit_total = sum((comp.units or 0.0) for comp in record.completed_courses.values())
+		for slug in record.in_progress_courses:
+			info = datastore.course_catalog.get(slug)
+			if info and info.units:
+				completed_unit_total += info.units
+		self.completed_unit_total = completed_unit_total
+		self.scheduled_unit_total = 0.0
+
+		# Ready tracking: unsatisfied prerequisite groups for every pending course slug
+		graph = datastore.prereq_graph
+		self._unsatisfied: Dict[str, List[CompiledPrereqGroup]] = {}
+		for req in self.pending_courses:
+			for slug in self._slugs[id(req)]:
+				if slug in self._unsatisfied:
+					continue
+				self._unsatisfied[slug] = [
+					group
+					for group in graph.prerequisites_for(slug)
+					if not group.is_satisfied(self.completed_prior, self.required_slugs)
+				]
+		# Ready queue: ranks (positions in the sorted pending list) of course requirements
+		# with a takeable slug, ascending; every other pending course requirement is blocked
+		self._ranked = list(self.pending_courses)
+		self._rank = {id(req): rank for rank, req in enumerate(self._ranked)}
+		self._requirements_by_slug: Dict[str, List[Requirement]] = {}
+		for req in self._ranked:
+			for slug in self._slugs[id(req)]:
+				self._requirements_by_slug.setdefault(slug, []).append(req)
+		self._blocked: Set[int] = set()
+		self._ready: List[int] = []
+		for rank, req in enumerate(self._ranked):
+			if self._is_blocked(req):
+				self._blocked.add(id(req))
+			else:
+				self._ready.append(rank)
+		self._upper_division_gate_open = False
+
+	# -- readiness -------------------------------------------------------
+
+	def _prereqs_ready(self, slug: str) -> bool:
+		_count("prereq_ready_checks")
+		unsatisfied = self._unsatisfied.get(slug)
+		if unsatisfied is None:
+			return _prerequisites_satisfied(slug, self.completed_prior, self.required_slugs, self.datastore)
+		return not unsatisfied
+
+	def _mark_completed(self, slugs: Iterable[str]) -> None:
+		graph = self.datastore.prereq_graph
+		new_slugs = [slug for slug in slugs if slug not in self.completed_prior]
+		self.completed_prior.update(new_slugs)
+		# Completed slugs stop counting as takeable; newly ready dependents start to
+		changed: Set[str] = set(new_slugs)
+		for slug in new_slugs:
+			course_id = graph.ids.get(slug)
+			if course_id is None:
+				continue
+			for dependent_id in graph.dependents[course_id]:
+				dependent = graph.slugs[dependent_id]
+				unsatisfied = self._unsatisfied.get(dependent)
+				if unsatisfied:
+					unsatisfied[:] = [
+						group for group in unsatisfied
+						if not group.is_satisfied(self.completed_prior, self.required_slugs)
+					]
+					if not unsatisfied:
+						changed.add(dependent)
+		for slug in changed:
+			for req in self._requirements_by_slug.get(slug, ()):
+				if id(req) in self._rank:
+					self._update_readiness(req)
+
+	def _update_readiness(self, req: Requirement) -> None:
+		key = id(req)
+		blocked = self._is_blocked(req)
+		if blocked == (key in self._blocked):
+			return
+		rank = self._rank[key]
+		if blocked:
+			self._blocked.add(key)
+			del self._ready[bisect.bisect_left(self._ready, rank)]
 		else:
-			year_index = 0
-		term_index = req.term_order if req.term_order is not None else 0
-		if term_index >= 99:
-			term_index = 0
-		if term_index > 1:
-			term_index = 1
-		return max(0, year_index * 2 + term_index)
-
-	def can_take_in_semester(req: Requirement, semester_idx: int) -> bool:
-		roadmap_index = earliest_semester_index(req)
-		if semester_idx >= roadmap_index:
+			self._blocked.discard(key)
+			bisect.insort(self._ready, rank)
+
+	def _is_blocked(self, req: Requirement) -> bool:
+		return not any(
+			self._prereqs_ready(slug) for slug in self._slugs[id(req)] if slug not in self.completed_prior
+		)
+
+	# -- requirement predicates ------------------------------------------
+
+	def can_take_in_semester(self, req: Requirement, semester_idx: int) -> bool:
+		if semester_idx >= self._earliest[id(req)]:
 			return True
 		# Allow earlier scheduling when prerequisites are already satisfied by prior credit
 		if req.requirement_type == "course":
-			for slug in req.all_course_slugs():
-				if slug in completed_prior:
+			for slug in self._slugs[id(req)]:
+				if slug in self.completed_prior:
 					return False
-				if _prerequisites_satisfied(slug, completed_prior, required_slugs, datastore):
+				if self._prereqs_ready(slug):
 					return True
 			return False
 		# GE, activities, and electives can be pulled forward if needed
@@ -1751,688 +4051,453 @@ def plan_semesters(
 			return True
 		return False
 
-	pending_courses = [
-		req
-		for req in requirements
-		if req.requirement_type == "course"
-		and req.all_course_slugs()
-		and all(slug not in record.completed_courses for slug in req.all_course_slugs())
-		and all(slug not in record.in_progress_courses for slug in req.all_course_slugs())
-	]
-	pending_ge = [
-		req
-		for req in requirements
-		if req.requirement_type == "ge"
-		and any(area not in record.fulfilled_ge for area in req.ge_areas)
-	]
-	pending_electives = [
-		req
-		for req in requirements
-		if req.requirement_type == "elective"
-	]
-	pending_activities = [
-		req
-		for req in requirements
-		if req.requirement_type == "activity"
-	]
+	def lower_division_requirements_remaining(self) -> bool:
+		if self._upper_division_gate_open:
+			return False
+		return bool(self._lower_division_courses or self.pending_ge or self.pending_activities)
 
-	def slug_is_upper_division(slug: str) -> bool:
-		info = datastore.course_catalog.get(slug)
-		if info and info.code:
-			number = extract_course_number(info.code)
-			if number is not None:
-				return number >= 100
-		# Fallback: parse from slug token
-		parts = slug.split("_")
-		if len(parts) > 1:
-			number = extract_course_number(parts[1]) if parts[1] else None
-			if number is not None:
-				return number >= 100
-		return False
+	def can_schedule_upper_division(self, slug: str) -> bool:
+		upper = self._slug_upper.get(slug)
+		if upper is None:
+			upper = self._slug_upper[slug] = _slug_is_upper_division(slug, self.datastore)
+		if not upper:
+			return True
+		if self._upper_division_gate_open:
+			return True
+		current_total = self.completed_unit_total + self.scheduled_unit_total
+		if current_total >= MIN_UPPER_DIVISION_UNITS:
+			return True
+		return not self.lower_division_requirements_remaining()
 
-	def requirement_is_upper_division(req: Requirement) -> bool:
-		for slug in req.all_course_slugs():
-			if slug_is_upper_division(slug):
-				return True
-		return False
+	def _available_slug(self, req: Requirement, term_completed: Set[str]) -> Optional[str]:
+		for slug in self._slugs[id(req)]:
+			if slug not in self.completed_prior and slug not in term_completed:
+				return slug
+		return None
 
-	def requirement_is_upper_division_ge(req: Requirement) -> bool:
-		"""Check if a GE requirement is upper-division"""
-		name_lower = req.display_name.lower()
-		return "upper division" in name_lower or "upper-division" in name_lower
+	# -- pending bookkeeping ---------------------------------------------
 
-	pending_courses.sort(
-		key=lambda req: (
-			requirement_is_upper_division(req),
-			req.year or 99,
-			req.term_order or 99,
-			req.order_index,
-		)
-	)
-	# Sort GE with lower-division first, then upper-division
-	pending_ge.sort(key=lambda req: (
-		requirement_is_upper_division_ge(req),
-		req.year or 99,
-		req.term_order or 99,
-		req.order_index
-	))
-	pending_electives.sort(key=lambda req: (req.year or 99, req.term_order or 99, req.order_index))
-	pending_activities.sort(key=lambda req: (req.year or 99, req.term_order or 99, req.order_index))
-
-	total_units = sum(_requirement_units(req, datastore) for req in pending_courses)
-	total_units += sum(_requirement_units(req, datastore) for req in pending_ge)
-	total_units += sum(_requirement_units(req, datastore) for req in pending_electives)
-	total_units += sum(_requirement_units(req, datastore) for req in pending_activities)
-	initial_total_units = total_units
-	completed_unit_total = sum((comp.units or 0.0) for comp in record.completed_courses.values())
-	for slug in record.in_progress_courses:
-		info = datastore.course_catalog.get(slug)
-		if info and info.units:
-			completed_unit_total += info.units
-	scheduled_unit_total = 0.0
-	MIN_UPPER_DIVISION_UNITS = 60.0
+	def _remove_course(self, req: Requirement, index: Optional[int] = None) -> None:
+		if index is None:
+			self.pending_courses.remove(req)
+		else:
+			self.pending_courses.pop(index)
+		self.pending_units["course"] -= self._units[id(req)]
+		if self._has_lower_division[id(req)]:
+			self._lower_division_courses -= 1
+		rank = self._rank.pop(id(req))
+		if id(req) in self._blocked:
+			self._blocked.discard(id(req))
+		else:
+			del self._ready[bisect.bisect_left(self._ready, rank)]
 
-	completed_prior: Set[str] = set(record.completed_courses.keys()) | set(record.in_progress_courses)
-	required_slugs: Set[str] = set()
-	for req in requirements:
-		if req.requirement_type == "course":
-			for slug in req.all_course_slugs():
-				required_slugs.add(slug)
-	plan: List[Dict[str, Any]] = []
-	semester_index = 0
+	def _remove_ge(self, req: Requirement, index: Optional[int] = None) -> None:
+		if index is None:
+			self.pending_ge.remove(req)
+		else:
+			self.pending_ge.pop(index)
+		self.pending_units["ge"] -= self._units[id(req)]
 
-	def lower_division_requirements_remaining() -> bool:
-		for req in pending_courses:
-			for slug in req.all_course_slugs():
-				if not slug_is_upper_division(slug):
-					return True
-		return bool(pending_ge or pending_activities)
+	def _remove_elective(self, req: Requirement, index: Optional[int] = None) -> None:
+		if index is None:
+			self.pending_electives.remove(req)
+		else:
+			self.pending_electives.pop(index)
+		self.pending_units["elective"] -= self._units[id(req)]
 
-	def can_schedule_upper_division(slug: str) -> bool:
-		if not slug_is_upper_division(slug):
-			return True
-		current_total = completed_unit_total + scheduled_unit_total
-		if current_total >= MIN_UPPER_DIVISION_UNITS:
-			return True
-		return not lower_division_requirements_remaining()
+	def _remove_activity(self, req: Requirement, index: Optional[int] = None) -> None:
+		if index is None:
+			self.pending_activities.remove(req)
+		else:
+			self.pending_activities.pop(index)
+		self.pending_units["activity"] -= self._units[id(req)]
 
-	while pending_courses or pending_ge or pending_electives or pending_activities:
-		term_label = f"Semester {semester_index + 1}"
-		term_units = 0.0
-		term_courses: List[Dict[str, Any]] = []
-		term_completed: Set[str] = set()
-		
-		# Calculate how many courses are blocked by prerequisites
-		# If we have many blocked courses, we should save electives for later
-		blocked_courses = 0
-		for req in pending_courses:
-			if not can_take_in_semester(req, semester_index):
+	# -- plan entries ----------------------------------------------------
+
+	def get_major_specific_courses(self, requirement_name: str) -> Optional[List[str]]:
+		if requirement_name not in self._major_courses_cache:
+			self._major_courses_cache[requirement_name] = _major_specific_courses(
+				self.academic_catalog, requirement_name
+			)
+		return self._major_courses_cache[requirement_name]
+
+	def slug_to_display(self, slug: str) -> str:
+		info = self.datastore.course_catalog.get(slug)
+		return info.code if info else slug.replace("_", " ")
+
+	def _ge_suggestions(self, ge_req: Requirement) -> List[str]:
+		key = id(ge_req)
+		if key not in self._ge_suggestions_cache:
+			suggested = self.datastore.suggest_for_requirement(ge_req, self.academic_catalog)
+			self._ge_suggestions_cache[key] = suggested or []
+		# Each plan entry gets its own list
+		return list(self._ge_suggestions_cache[key])
+
+	def _ge_entry(self, ge_req: Requirement) -> Dict[str, Any]:
+		return {
+			"course": ge_req.display_name,
+			"title": "Select approved GE course",
+			"units": self._units[id(ge_req)],
+			"type": "ge",
+			"suggested_courses": self._ge_suggestions(ge_req),
+		}
+
+	def _course_entry(
+		self,
+		req: Requirement,
+		slug: Optional[str],
+		info: Optional[CourseInfo],
+		course_units: float,
+		note: Optional[str] = None,
+	) -> Dict[str, Any]:
+		if info:
+			course = info.code
+		elif slug:
+			course = self.slug_to_display(slug)
+		else:
+			course = req.display_name
+		entry: Dict[str, Any] = {
+			"course": course,
+			"title": info.name if info else req.display_name,
+			"units": course_units,
+			"type": "course",
+		}
+		if note:
+			entry["note"] = note
+		if req.alternatives:
+			entry["alternatives"] = [
+				self.slug_to_display(alt) for alt in req.alternatives if alt != slug
+			]
+		return entry
+
+	def _activity_entry(self, activity_req: Requirement) -> Dict[str, Any]:
+		return {
+			"course": activity_req.display_name,
+			"title": activity_req.display_name,
+			"units": self._units[id(activity_req)],
+			"type": "activity",
+		}
+
+	def _elective_entry(self, elective_req: Requirement) -> Dict[str, Any]:
+		# Get major-specific elective courses
+		suggested = self.get_major_specific_courses(elective_req.display_name)
+		elective_entry = {
+			"course": elective_req.display_name,
+			"title": elective_req.display_name,
+			"units": self._units[id(elective_req)],
+			"type": "elective",
+			"detail": "Work with advisor to choose an appropriate elective.",
+		}
+		if suggested:
+			elective_entry["suggested_courses"] = list(suggested)
+		return elective_entry
+
+	def _course_units(self, req: Requirement, info: Optional[CourseInfo]) -> float:
+		return info.units if info and info.units else max(req.units, 3.0)
+
+	# -- semester passes -------------------------------------------------
+
+	def _schedule_ge(self, term: _TermState, semester_index: int, upper_division: bool) -> bool:
+		made_progress = False
+		for ge_req in list(self.pending_ge):
+			if term.is_full():
+				break
+			if not self.can_take_in_semester(ge_req, semester_index):
+				continue
+			if self._upper_division_ge[id(ge_req)] != upper_division:
+				continue
+			ge_units = self._units[id(ge_req)]
+			if term.units + ge_units <= self.max_semester_units:
+				self._remove_ge(ge_req)
+				self._add(term, self._ge_entry(ge_req), ge_units)
+				made_progress = True
+		return made_progress
+
+	def _schedule_ready_courses(self, term: _TermState, semester_index: int) -> bool:
+		# Blocked requirements would fail the readiness check below, so only the queue is walked
+		made_progress = False
+		for req in [self._ranked[rank] for rank in self._ready]:
+			if not self.can_take_in_semester(req, semester_index):
+				continue
+			if term.is_full():
+				break
+			# Prioritize lower-division courses in early semesters
+			if self._upper_division[id(req)] and self.lower_division_requirements_remaining():
+				continue
+			available_slug = self._available_slug(req, term.completed)
+			if not available_slug:
+				continue
+			if not self._prereqs_ready(available_slug):
+				continue
+			if not self.can_schedule_upper_division(available_slug):
+				continue
+			info = self.datastore.course_catalog.get(available_slug)
+			course_units = self._course_units(req, info)
+			if term.units + course_units > self.max_semester_units:
+				continue
+			self._add(term, self._course_entry(req, available_slug, info, course_units), course_units)
+			term.completed.add(available_slug)
+			self._remove_course(req)
+			made_progress = True
+
+			# Check if this course satisfies any pending GE requirements
+			if info and info.ge_areas:
+				for ge_req in list(self.pending_ge):
+					# Check if any of the course's GE areas match this requirement's GE areas
+					if any(course_ge in ge_req.ge_areas for course_ge in info.ge_areas):
+						# This course satisfies this GE requirement, remove it
+						self._remove_ge(ge_req)
+		return made_progress
+
+	def _schedule_activities(self, term: _TermState, semester_index: int) -> bool:
+		made_progress = False
+		for activity_req in list(self.pending_activities):
+			if term.is_full():
+				break
+			if not self.can_take_in_semester(activity_req, semester_index):
+				continue
+			activity_units = self._units[id(activity_req)]
+			if term.units + activity_units <= self.max_semester_units:
+				self._remove_activity(activity_req)
+				self._add(term, self._activity_entry(activity_req), activity_units)
+				made_progress = True
+		return made_progress
+
+	def _electives_target(self, term: _TermState) -> float:
+		# Leave room for blocked required courses AND don't over-schedule electives
+		max_semester_units = self.max_semester_units
+		electives_target = max_semester_units
+		# Strategy: distribute electives evenly across remaining semesters
+		remaining_elective_units = self.pending_units["elective"]
+		total_remaining = (
+			remaining_elective_units
+			+ self.pending_units["course"]
+			+ self.pending_units["ge"]
+			+ self.pending_units["activity"]
+		)
+		if total_remaining > 0 and remaining_elective_units > 0:
+			# Estimate semesters needed
+			semesters_ahead = max(1, math.ceil(total_remaining / max_semester_units))
+			electives_per_semester = remaining_elective_units / semesters_ahead
+			electives_this_semester = min(remaining_elective_units, max(electives_per_semester, 3))
+			electives_target = min(max_semester_units, term.units + electives_this_semester)
+		blocked_required_count = len(self._blocked)
+		if blocked_required_count > 0:
+			# Leave extra room for blocked courses
+			reserve_units = min(blocked_required_count * 3, 6)
+			electives_target = min(electives_target, max(12, max_semester_units - reserve_units))
+		return electives_target
+
+	def _schedule_electives(self, term: _TermState, semester_index: int) -> bool:
+		made_progress = False
+		electives_target = self._electives_target(term)
+		for elective_req in list(self.pending_electives):
+			if term.units >= electives_target - 0.5:
+				break
+			if not self.can_take_in_semester(elective_req, semester_index):
+				continue
+			elective_units = self._units[id(elective_req)]
+			if term.units + elective_units <= electives_target:
+				self._remove_elective(elective_req)
+				self._add(term, self._elective_entry(elective_req), elective_units)
+				made_progress = True
+		return made_progress
+
+	def _schedule_blocked_courses(self, term: _TermState, semester_index: int) -> None:
+		# Work backwards to try blocked courses; popping at idx leaves earlier indices intact
+		for idx in range(len(self.pending_courses) - 1, -1, -1):
+			if term.is_full():
+				break
+			fallback = self.pending_courses[idx]
+			if not self.can_take_in_semester(fallback, semester_index):
+				continue
+			fallback_slug = self._available_slug(fallback, term.completed)
+			if not fallback_slug:
 				continue
-			available_slug = None
-			for slug in req.all_course_slugs():
-				if slug not in completed_prior:
-					available_slug = slug
+			# If prereqs are satisfied, this should have been scheduled in main loop - skip it
+			if self._prereqs_ready(fallback_slug):
+				continue
+			info = self.datastore.course_catalog.get(fallback_slug)
+			course_units = self._course_units(fallback, info)
+			if not self.can_schedule_upper_division(fallback_slug):
+				continue
+			if term.units + course_units > self.max_semester_units:
+				continue
+			self._remove_course(fallback, idx)
+			entry = self._course_entry(fallback, fallback_slug, info, course_units, PREREQ_NOTE)
+			self._add(term, entry, course_units)
+			term.completed.add(fallback_slug)
+
+	def _fill_activities_in_order(self, term: _TermState, semester_index: int) -> None:
+		while not term.is_full() and self.pending_activities:
+			activity_req = None
+			for candidate in self.pending_activities:
+				if self.can_take_in_semester(candidate, semester_index):
+					activity_req = candidate
 					break
-			if available_slug and not _prerequisites_satisfied(available_slug, completed_prior, required_slugs, datastore):
-				blocked_courses += 1
-		
-		# Schedule courses with satisfied prerequisites, filling semester to capacity
+			if not activity_req:
+				break
+			activity_units = self._units[id(activity_req)]
+			if term.units + activity_units > self.max_semester_units:
+				break
+			self._remove_activity(activity_req)
+			self._add(term, self._activity_entry(activity_req), activity_units)
+
+	def _schedule_deadlocked(self, term: _TermState, semester_index: int) -> None:
+		# Schedule pending courses ignoring prerequisites, then fill with GE/electives
+		# instead of creating many 3-unit semesters
+		while not term.is_full() and self.pending_courses:
+			fallback = self.pending_courses[0]
+			if not self.can_take_in_semester(fallback, semester_index):
+				break
+			fallback_slug = self._available_slug(fallback, term.completed)
+			if fallback_slug and not self.can_schedule_upper_division(fallback_slug):
+				break
+			info = self.datastore.course_catalog.get(fallback_slug) if fallback_slug else None
+			course_units = self._course_units(fallback, info)
+			# Leave it for next semester if adding it would overfill
+			if term.units + course_units > self.max_semester_units:
+				break
+			self._remove_course(fallback, 0)
+			entry = self._course_entry(fallback, fallback_slug, info, course_units, PREREQ_NOTE)
+			self._add(term, entry, course_units)
+			if fallback_slug:
+				term.completed.add(fallback_slug)
+
+		while not term.is_full() and self.pending_ge:
+			ge_req = self.pending_ge[0]
+			if not self.can_take_in_semester(ge_req, semester_index):
+				break
+			ge_units = self._units[id(ge_req)]
+			if term.units + ge_units > self.max_semester_units:
+				break
+			self._remove_ge(ge_req, 0)
+			self._add(term, self._ge_entry(ge_req), ge_units)
+
+		self._fill_front(term, semester_index, self.pending_activities, self._remove_activity, self._activity_entry)
+		self._fill_front(term, semester_index, self.pending_electives, self._remove_elective, self._elective_entry)
+
+		# If still no courses (only GE/electives left), handle those
+		if not term.courses:
+			if self.pending_ge:
+				self._fill_front(term, semester_index, self.pending_ge, self._remove_ge, self._ge_entry)
+			elif self.pending_activities:
+				self._fill_front(term, semester_index, self.pending_activities, self._remove_activity, self._activity_entry)
+			elif self.pending_electives:
+				self._fill_front(term, semester_index, self.pending_electives, self._remove_elective, self._elective_entry)
+
+	def _fill_front(
+		self,
+		term: _TermState,
+		semester_index: int,
+		pending: List[Requirement],
+		remove: Callable[[Requirement, Optional[int]], None],
+		make_entry: Callable[[Requirement], Dict[str, Any]],
+	) -> None:
+		while not term.is_full() and pending:
+			req = pending[0]
+			if not self.can_take_in_semester(req, semester_index):
+				break
+			req_units = self._units[id(req)]
+			if term.units + req_units > self.max_semester_units:
+				break
+			remove(req, 0)
+			self._add(term, make_entry(req), req_units)
+
+	def _add(self, term: _TermState, entry: Dict[str, Any], units: float) -> None:
+		term.courses.append(entry)
+		term.units += units
+		self.scheduled_unit_total += units
+
+	def _is_stalled(self, semester_index: int) -> bool:
+		"""True when an empty semester will repeat forever: every pending requirement
+		is already past its earliest semester, so nothing changes between terms."""
+		for pending in (self.pending_courses, self.pending_ge, self.pending_electives, self.pending_activities):
+			for req in pending:
+				if self._earliest[id(req)] > semester_index:
+					return False
+		return True
+
+	def _plan_term(self, semester_index: int) -> _TermState:
+		term = _TermState(self.max_semester_units)
+
 		# Keep trying to add courses, GE, and electives until we reach capacity or run out
 		# PRIORITIZE lower-division GE courses early
 		made_progress = True
-		while made_progress and term_units < max_semester_units - 0.5:
-			made_progress = False
-			
-			# FIRST: Try to add lower-division GE courses (these should be done early)
-			for ge_req in list(pending_ge):
-				if term_units >= max_semester_units - 0.5:
-					break
-				if not can_take_in_semester(ge_req, semester_index):
-					continue
-				# Only schedule lower-division GE in this phase
-				if requirement_is_upper_division_ge(ge_req):
-					continue
-				ge_units = _requirement_units(ge_req, datastore)
-				if term_units + ge_units <= max_semester_units:
-					pending_ge.remove(ge_req)
-					# Get major-specific courses or fall back to GE catalog
-					suggested = get_major_specific_courses(ge_req.display_name)
-					if not suggested and ge_req.ge_areas:
-						req_lower = ge_req.display_name.lower()
-						# Special handling for Science Electives with lab requirement
-						# If this is a "5B and 5C" or "5C" requirement with Science keyword,
-						# show all major's Science Electives that have lab (5C), not just life science (5B)
-						if ("5b" in req_lower and "5c" in req_lower) or ("science" in req_lower and "5c" in req_lower):
-							major_courses = get_major_specific_courses("Science Electives")
-							if major_courses:
-								# Filter Science Electives to only those with lab component (Area 5C)
-								area_5c_courses = set(datastore.ge_catalog.get("GE_AREA_5C", {}).get("courses", []))
-								if area_5c_courses:
-									cleaned_major = [m.lstrip("|&").strip() for m in major_courses]
-									# Find matching courses and keep the GE catalog format (with underscores)
-									suggested = []
-									for m in cleaned_major:
-										for c in area_5c_courses:
-											if normalize_course_code(m) == normalize_course_code(c):
-												suggested.append(c.lstrip("|&").strip())
-												break
-						
-						# If no special handling or no results, use standard GE intersection
-						if not suggested:
-							if len(ge_req.ge_areas) > 1:
-								# Look for courses that appear in all required GE areas
-								candidate_sets = []
-								for area in ge_req.ge_areas:
-									area_courses = set(datastore.ge_catalog.get(area, {}).get("courses", []))
-									if area_courses:
-										candidate_sets.append(area_courses)
-								if candidate_sets:
-									# Intersection of all sets
-									suggested = list(candidate_sets[0].intersection(*candidate_sets[1:]))
-							else:
-								suggested = datastore.ge_catalog.get(ge_req.ge_areas[0], {}).get("courses", [])
-					term_courses.append(
-						{
-							"course": ge_req.display_name,
-							"title": "Select approved GE course",
-							"units": ge_units,
-							"type": "ge",
-							"suggested_courses": suggested or [],
-						}
-					)
-					term_units += ge_units
-					scheduled_unit_total += ge_units
-					total_units -= ge_units
-					made_progress = True
-			
-			# SECOND: Try to add lower-division courses with satisfied prerequisites
-			for req in list(pending_courses):
-				if not can_take_in_semester(req, semester_index):
-					continue
-				if term_units >= max_semester_units - 0.5:
-					break
-				# Prioritize lower-division courses in early semesters
-				if requirement_is_upper_division(req) and lower_division_requirements_remaining():
-					continue
-				available_slug = None
-				for slug in req.all_course_slugs():
-					if slug not in completed_prior and slug not in term_completed:
-						available_slug = slug
-						break
-				if not available_slug:
-					continue
-				if not _prerequisites_satisfied(available_slug, completed_prior, required_slugs, datastore):
-					continue
-				if not can_schedule_upper_division(available_slug):
-					continue
-				info = datastore.course_catalog.get(available_slug)
-				course_units = info.units if info and info.units else max(req.units, 3.0)
-				if term_units + course_units > max_semester_units:
-					continue
-				entry = {
-					"course": info.code if info else slug_to_display(available_slug),
-					"title": info.name if info else req.display_name,
-					"units": course_units,
-					"type": "course",
-				}
-				if req.alternatives:
-					entry["alternatives"] = [
-						slug_to_display(alt) for alt in req.alternatives if alt != available_slug
-					]
-				term_courses.append(entry)
-				term_units += course_units
-				scheduled_unit_total += course_units
-				total_units -= course_units
-				term_completed.add(available_slug)
-				pending_courses.remove(req)
-				made_progress = True
-				
-				# Check if this course satisfies any pending GE requirements
-				if info and info.ge_areas:
-					for ge_req in list(pending_ge):
-						# Check if any of the course's GE areas match this requirement's GE areas
-						if any(course_ge in ge_req.ge_areas for course_ge in info.ge_areas):
-							# This course satisfies this GE requirement, remove it
-							pending_ge.remove(ge_req)
-							ge_units = _requirement_units(ge_req, datastore)
-							total_units -= ge_units
-			
-			# THIRD: Now try upper-division GE if we have space and met the 60-unit threshold
-			current_total = completed_unit_total + scheduled_unit_total
-			if current_total >= MIN_UPPER_DIVISION_UNITS:
-				for ge_req in list(pending_ge):
-					if term_units >= max_semester_units - 0.5:
-						break
-					if not can_take_in_semester(ge_req, semester_index):
-						continue
-					# Only upper-division GE in this phase
-					if not requirement_is_upper_division_ge(ge_req):
-						continue
-					ge_units = _requirement_units(ge_req, datastore)
-					if term_units + ge_units <= max_semester_units:
-						pending_ge.remove(ge_req)
-						# Get major-specific courses or fall back to GE catalog
-						suggested = get_major_specific_courses(ge_req.display_name)
-						if not suggested and ge_req.ge_areas:
-							req_lower = ge_req.display_name.lower()
-							# Special handling for Science Electives with lab requirement
-							# If this is a "5B and 5C" or "5C" requirement with Science keyword,
-							# show all major's Science Electives that have lab (5C), not just life science (5B)
-							if ("5b" in req_lower and "5c" in req_lower) or ("science" in req_lower and "5c" in req_lower):
-								major_courses = get_major_specific_courses("Science Electives")
-								if major_courses:
-									# Filter Science Electives to only those with lab component (Area 5C)
-									area_5c_courses = set(datastore.ge_catalog.get("GE_AREA_5C", {}).get("courses", []))
-									if area_5c_courses:
-										cleaned_major = [m.lstrip("|&").strip() for m in major_courses]
-										# Find matching courses and keep the GE catalog format (with underscores)
-										suggested = []
-										for m in cleaned_major:
-											for c in area_5c_courses:
-												if normalize_course_code(m) == normalize_course_code(c):
-													suggested.append(c.lstrip("|&").strip())
-													break
-							
-							# If no special handling or no results, use standard GE intersection
-							if not suggested:
-								if len(ge_req.ge_areas) > 1:
-									# Look for courses that appear in all required GE areas
-									candidate_sets = []
-									for area in ge_req.ge_areas:
-										area_courses = set(datastore.ge_catalog.get(area, {}).get("courses", []))
-										if area_courses:
-											candidate_sets.append(area_courses)
-									if candidate_sets:
-										# Intersection of all sets
-										suggested = list(candidate_sets[0].intersection(*candidate_sets[1:]))
-								else:
-									suggested = datastore.ge_catalog.get(ge_req.ge_areas[0], {}).get("courses", [])
-						term_courses.append(
-							{
-								"course": ge_req.display_name,
-								"title": "Select approved GE course",
-								"units": ge_units,
-								"type": "ge",
-								"suggested_courses": suggested or [],
-							}
-						)
-						term_units += ge_units
-						scheduled_unit_total += ge_units
-						total_units -= ge_units
-						made_progress = True
-
-			# Schedule short activity requirements (e.g., Physical Education)
-			# Loop through ALL activities to pack the semester
-			for activity_req in list(pending_activities):
-				if term_units >= max_semester_units - 0.5:
-					break
-				if not can_take_in_semester(activity_req, semester_index):
-					continue
-				activity_units = _requirement_units(activity_req, datastore)
-				if term_units + activity_units <= max_semester_units:
-					pending_activities.remove(activity_req)
-					entry = {
-						"course": activity_req.display_name,
-						"title": activity_req.display_name,
-						"units": activity_units,
-						"type": "activity",
-					}
-					term_courses.append(entry)
-					term_units += activity_units
-					scheduled_unit_total += activity_units
-					total_units -= activity_units
-					made_progress = True
-			
-			# After trying courses and GE, try electives if we still have space
-			# Loop through ALL electives to pack the semester - don't create light semesters if we can avoid it
-			# But leave room for blocked required courses AND don't over-schedule electives
-			electives_target = max_semester_units
-			blocked_required_count = sum(1 for req in pending_courses 
-				if not any(_prerequisites_satisfied(slug, completed_prior, required_slugs, datastore) 
-					for slug in req.all_course_slugs() if slug not in completed_prior))
-			
-			# Calculate how many electives we should schedule this semester
-			# Strategy: distribute electives evenly across remaining semesters
-			remaining_elective_units = sum(_requirement_units(req, datastore) for req in pending_electives)
-			remaining_required_units = sum(_requirement_units(req, datastore) for req in pending_courses)
-			total_remaining = remaining_elective_units + remaining_required_units + sum(_requirement_units(req, datastore) for req in pending_ge) + sum(_requirement_units(req, datastore) for req in pending_activities)
-			
-			if total_remaining > 0 and remaining_elective_units > 0:
-				# Estimate semesters needed
-				semesters_ahead = max(1, math.ceil(total_remaining / max_semester_units))
-				electives_per_semester = remaining_elective_units / semesters_ahead
-				electives_this_semester = min(remaining_elective_units, max(electives_per_semester, 3))
-				electives_target = min(max_semester_units, term_units + electives_this_semester)
-			
-			if blocked_required_count > 0:
-				# Leave extra room for blocked courses
-				reserve_units = min(blocked_required_count * 3, 6)
-				electives_target = min(electives_target, max(12, max_semester_units - reserve_units))
-			
-			for elective_req in list(pending_electives):
-				if term_units >= electives_target - 0.5:
-					break
-				if not can_take_in_semester(elective_req, semester_index):
-					continue
-				elective_units = _requirement_units(elective_req, datastore)
-				if term_units + elective_units <= electives_target:
-					pending_electives.remove(elective_req)
-					# Get major-specific elective courses
-					suggested = get_major_specific_courses(elective_req.display_name)
-					elective_entry = {
-						"course": elective_req.display_name,
-						"title": elective_req.display_name,
-						"units": elective_units,
-						"type": "elective",
-						"detail": "Work with advisor to choose an appropriate elective.",
-					}
-					if suggested:
-						elective_entry["suggested_courses"] = suggested
-					term_courses.append(elective_entry)
-					term_units += elective_units
-					scheduled_unit_total += elective_units
-					total_units -= elective_units
-					made_progress = True
+		while made_progress and not term.is_full():
+			made_progress = self._schedule_ge(term, semester_index, upper_division=False)
+			made_progress = self._schedule_ready_courses(term, semester_index) or made_progress
+			# Upper-division GE only once the 60-unit threshold is met
+			if self.completed_unit_total + self.scheduled_unit_total >= MIN_UPPER_DIVISION_UNITS:
+				made_progress = self._schedule_ge(term, semester_index, upper_division=True) or made_progress
+			made_progress = self._schedule_activities(term, semester_index) or made_progress
+			made_progress = self._schedule_electives(term, semester_index) or made_progress
 
 		# If we have space remaining in the semester, try to add blocked courses with prerequisite notes
 		# This prevents creating many small semesters at the end
-		if term_courses and term_units < max_semester_units - 0.5 and pending_courses:
-			for idx in range(len(pending_courses) - 1, -1, -1):  # Work backwards to try blocked courses
-				if term_units >= max_semester_units - 0.5:
-					break
-					
-				fallback = pending_courses[idx]
-				if not can_take_in_semester(fallback, semester_index):
-					continue
-					
-				fallback_slug = None
-				for slug in fallback.all_course_slugs():
-					if slug not in completed_prior and slug not in term_completed:
-						fallback_slug = slug
+		if term.courses and not term.is_full() and self.pending_courses:
+			self._schedule_blocked_courses(term, semester_index)
+
+		self._fill_activities_in_order(term, semester_index)
+
+		if not term.courses:
+			self._schedule_deadlocked(term, semester_index)
+		return term
+
+	def run(self) -> Tuple[List[Dict[str, Any]], int]:
+		plan: List[Dict[str, Any]] = []
+		semester_index = 0
+		while self.pending_courses or self.pending_ge or self.pending_electives or self.pending_activities:
+			_count("planner_loop_iterations")
+			term = self._plan_term(semester_index)
+			if not term.courses:
+				if self._is_stalled(semester_index):
+					if self._upper_division_gate_open:
+						# Nothing left fits in a semester at all
 						break
-				if not fallback_slug:
-					continue
-				
-				# Check if prerequisites are satisfied (if not, we'll add a note)
-				prereqs_ok = _prerequisites_satisfied(fallback_slug, completed_prior, required_slugs, datastore)
-				
-				# If prereqs are satisfied, this should have been scheduled in main loop - skip it
-				if prereqs_ok:
-					continue
-				
-				info = datastore.course_catalog.get(fallback_slug) if fallback_slug else None
-				course_units = info.units if info and info.units else max(fallback.units, 3.0)
-				
-				if not can_schedule_upper_division(fallback_slug):
-					continue
-				
-				# Check if adding this would overfill
-				if term_units + course_units > max_semester_units:
-					continue
-				
-				pending_courses.pop(idx)
-				entry = {
-					"course": info.code if info else slug_to_display(fallback_slug),
-					"title": info.name if info else fallback.display_name,
-					"units": course_units,
-					"type": "course",
-					"note": "Prerequisite data missing; verify with advisor.",
-				}
-				if fallback.alternatives:
-					entry["alternatives"] = [
-						slug_to_display(alt) for alt in fallback.alternatives if alt != fallback_slug
-					]
-				term_courses.append(entry)
-				term_units += course_units
-				scheduled_unit_total += course_units
-				total_units -= course_units
-				if fallback_slug:
-					term_completed.add(fallback_slug)
-
-		while term_units < max_semester_units - 0.5 and pending_activities:
-			activity_req = None
-			for candidate in pending_activities:
-				if can_take_in_semester(candidate, semester_index):
-					activity_req = candidate
-					break
-			if not activity_req:
-				break
-			activity_units = _requirement_units(activity_req, datastore)
-			if term_units + activity_units > max_semester_units:
-				break
-			pending_activities.remove(activity_req)
-			term_courses.append(
+					# Only the upper-division gate is holding the remaining courses back
+					self._upper_division_gate_open = True
+				# Nothing could be scheduled this term; advance to next semester without adding an empty term
+				semester_index += 1
+				continue
+
+			plan.append(
 				{
-					"course": activity_req.display_name,
-					"title": activity_req.display_name,
-					"units": activity_units,
-					"type": "activity",
+					"term": f"Semester {semester_index + 1}",
+					"courses": term.courses,
+					"total_units": round(term.units, 1),
 				}
 			)
-			term_units += activity_units
-			scheduled_unit_total += activity_units
-			total_units -= activity_units
-
-		if not term_courses:
-			# Deadlock: schedule pending courses ignoring prerequisites
-			# Try to fill the semester with multiple deadlocked courses + electives
-			# instead of creating many 3-unit semesters
-			added_any = False
-			while term_units < max_semester_units - 0.5 and pending_courses:
-				fallback = pending_courses[0]
-				if not can_take_in_semester(fallback, semester_index):
-					break
-				fallback_slug = None
-				for slug in fallback.all_course_slugs():
-					if slug not in completed_prior and slug not in term_completed:
-						fallback_slug = slug
-						break
-				if fallback_slug and not can_schedule_upper_division(fallback_slug):
-					break
-				fallback = pending_courses.pop(0)
-				info = datastore.course_catalog.get(fallback_slug) if fallback_slug else None
-				course_units = info.units if info and info.units else max(fallback.units, 3.0)
-				
-				# Check if adding this would overfill
-				if term_units + course_units > max_semester_units:
-					# Put it back for next semester
-					pending_courses.insert(0, fallback)
-					break
-					
-				entry = {
-					"course": info.code if info else slug_to_display(fallback_slug) if fallback_slug else fallback.display_name,
-					"title": info.name if info else fallback.display_name,
-					"units": course_units,
-					"type": "course",
-					"note": "Prerequisite data missing; verify with advisor.",
-				}
-				if fallback.alternatives:
-					entry["alternatives"] = [
-						slug_to_display(alt) for alt in fallback.alternatives if alt != fallback_slug
-					]
-				term_courses.append(entry)
-				term_units += course_units
-				scheduled_unit_total += course_units
-				total_units -= course_units
-				if fallback_slug:
-					term_completed.add(fallback_slug)
-				added_any = True
-			
-			# After adding deadlocked courses, fill up the semester with GE/electives
-			while term_units < max_semester_units - 0.5 and pending_ge:
-				ge_req = pending_ge[0]
-				if not can_take_in_semester(ge_req, semester_index):
-					break
-				ge_units = _requirement_units(ge_req, datastore)
-				if term_units + ge_units > max_semester_units:
-					break
-				pending_ge.pop(0)
-				# Get major-specific courses or fall back to GE catalog
-				suggested = get_major_specific_courses(ge_req.display_name)
-				if not suggested and ge_req.ge_areas:
-					suggested = datastore.ge_catalog.get(ge_req.ge_areas[0], {}).get("courses", [])
-				term_courses.append(
-					{
-						"course": ge_req.display_name,
-						"title": "Select approved GE course",
-						"units": ge_units,
-						"type": "ge",
-						"suggested_courses": suggested or [],
-					}
-				)
-				term_units += ge_units
-				scheduled_unit_total += ge_units
-				total_units -= ge_units
-
-			while term_units < max_semester_units - 0.5 and pending_activities:
-				activity_req = pending_activities[0]
-				if not can_take_in_semester(activity_req, semester_index):
-					break
-				activity_units = _requirement_units(activity_req, datastore)
-				if term_units + activity_units > max_semester_units:
-					break
-				pending_activities.pop(0)
-				term_courses.append(
-					{
-						"course": activity_req.display_name,
-						"title": activity_req.display_name,
-						"units": activity_units,
-						"type": "activity",
-					}
-				)
-				term_units += activity_units
-				scheduled_unit_total += activity_units
-				total_units -= activity_units
-			
-			while term_units < max_semester_units - 0.5 and pending_electives:
-				elective_req = pending_electives[0]
-				if not can_take_in_semester(elective_req, semester_index):
-					break
-				elective_units = _requirement_units(elective_req, datastore)
-				if term_units + elective_units > max_semester_units:
-					break
-				pending_electives.pop(0)
-				# Get major-specific elective courses
-				suggested = get_major_specific_courses(elective_req.display_name)
-				elective_entry = {
-					"course": elective_req.display_name,
-					"title": elective_req.display_name,
-					"units": elective_units,
-					"type": "elective",
-					"detail": "Work with advisor to choose an appropriate elective.",
-				}
-				if suggested:
-					elective_entry["suggested_courses"] = suggested
-				term_courses.append(elective_entry)
-				term_units += elective_units
-				scheduled_unit_total += elective_units
-				total_units -= elective_units
-			
-			# If still no courses (only GE/electives left), handle those
-			if not term_courses:
-				if pending_ge:
-					while term_units < max_semester_units - 0.5 and pending_ge:
-						ge_req = pending_ge[0]
-						if not can_take_in_semester(ge_req, semester_index):
-							break
-						pending_ge.pop(0)
-						ge_units = _requirement_units(ge_req, datastore)
-						if term_units + ge_units > max_semester_units:
-							pending_ge.insert(0, ge_req)
-							break
-						# Get major-specific courses or fall back to GE catalog
-						suggested = get_major_specific_courses(ge_req.display_name)
-						if not suggested and ge_req.ge_areas:
-							suggested = datastore.ge_catalog.get(ge_req.ge_areas[0], {}).get("courses", [])
-						term_courses.append(
-							{
-								"course": ge_req.display_name,
-								"title": "Select approved GE course",
-								"units": ge_units,
-								"type": "ge",
-								"suggested_courses": suggested or [],
-							}
-						)
-						term_units += ge_units
-						scheduled_unit_total += ge_units
-						total_units -= ge_units
-				elif pending_activities:
-					while term_units < max_semester_units - 0.5 and pending_activities:
-						activity_req = pending_activities[0]
-						if not can_take_in_semester(activity_req, semester_index):
-							break
-						pending_activities.pop(0)
-						activity_units = _requirement_units(activity_req, datastore)
-						if term_units + activity_units > max_semester_units:
-							pending_activities.insert(0, activity_req)
-							break
-						term_courses.append(
-							{
-								"course": activity_req.display_name,
-								"title": activity_req.display_name,
-								"units": activity_units,
-								"type": "activity",
-							}
-						)
-						term_units += activity_units
-						scheduled_unit_total += activity_units
-						total_units -= activity_units
-				elif pending_electives:
-					while term_units < max_semester_units - 0.5 and pending_electives:
-						elective_req = pending_electives[0]
-						if not can_take_in_semester(elective_req, semester_index):
-							break
-						pending_electives.pop(0)
-						elective_units = _requirement_units(elective_req, datastore)
-						if term_units + elective_units > max_semester_units:
-							pending_electives.insert(0, elective_req)
-							break
-						# Get major-specific elective courses
-						suggested = get_major_specific_courses(elective_req.display_name)
-						elective_entry = {
-							"course": elective_req.display_name,
-							"title": elective_req.display_name,
-							"units": elective_units,
-							"type": "elective",
-							"detail": "Work with advisor to choose an appropriate elective.",
-						}
-						if suggested:
-							elective_entry["suggested_courses"] = suggested
-						term_courses.append(elective_entry)
-						term_units += elective_units
-						scheduled_unit_total += elective_units
-						total_units -= elective_units
-
-		if not term_courses:
-			# Nothing could be scheduled this term; advance to next semester without adding an empty term
 			semester_index += 1
-			continue
-
-		plan.append(
-			{
-				"term": term_label,
-				"courses": term_courses,
-				"total_units": round(term_units, 1),
-			}
-		)
-		semester_index += 1
-		completed_prior.update(term_completed)
+			self._mark_completed(term.completed)
 
-	# Consolidate light semesters at the end - move courses from underloaded semesters into earlier ones
-	if plan and units_per_semester:
+		plan = self._consolidate(plan)
+		units_per_semester = self.units_per_semester
+		if units_per_semester:
+			estimated_semesters = max(len(plan), math.ceil(self.initial_total_units / units_per_semester))
+		else:
+			estimated_semesters = len(plan)
+		return plan, int(estimated_semesters)
+
+	def _consolidate(self, plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+		# Consolidate light semesters at the end - move courses from underloaded semesters into earlier ones
+		units_per_semester = self.units_per_semester
+		max_semester_units = self.max_semester_units
+		if not (plan and units_per_semester):
+			return plan
 		min_reasonable_load = min(12, units_per_semester * 0.75)  # At least 12 units or 75% of target
-		
+
 		# Work backwards through the plan
 		for i in range(len(plan) - 1, 0, -1):  # Start from last semester, go backwards (but not semester 0)
 			current_sem = plan[i]
 			if current_sem['total_units'] >= min_reasonable_load:
 				continue  # This semester is fine
-			
+
 			# Try to move courses from this light semester into earlier semesters
 			courses_to_redistribute = current_sem['courses'][:]
 			current_sem['courses'] = []
 			current_sem['total_units'] = 0
-			
+
 			for course in courses_to_redistribute:
 				placed = False
 				# Try to place in earlier semesters
@@ -2443,24 +4508,30 @@ def plan_semesters(
 						target_sem['total_units'] = round(target_sem['total_units'] + course['units'], 1)
 						placed = True
 						break
-				
+
 				# If we couldn't place it earlier, keep it here
 				if not placed:
 					current_sem['courses'].append(course)
 					current_sem['total_units'] = round(current_sem['total_units'] + course['units'], 1)
-		
+
 		# Remove any empty semesters
 		plan = [sem for sem in plan if sem['courses']]
-		
+
 		# Renumber semesters after consolidation
 		for idx, sem in enumerate(plan):
 			sem['term'] = f"Semester {idx + 1}"
+		return plan
 
-	if units_per_semester:
-		estimated_semesters = max(len(plan), math.ceil(initial_total_units / units_per_semester))
-	else:
-		estimated_semesters = len(plan)
-	return plan, int(estimated_semesters)
+
+def plan_semesters(
+	student_profile: Dict[str, Any],
+	record: StudentRecord,
+	requirements: List[Requirement],
+	datastore: DataStore,
+	academic_catalog: Optional[Dict[str, Any]] = None,
+	skeleton: Optional[RequirementSkeleton] = None,
+) -> Tuple[List[Dict[str, Any]], float]:
+	return SemesterPlanner(student_profile, record, requirements, datastore, academic_catalog, skeleton).run()
 
 
 def validate_semester_plan(
@@ -2489,52 +4560,28 @@ def validate_semester_plan(
 			slug = course_code_to_slug(normalize_course_code(course_code))
 			info = datastore.course_catalog.get(slug)
 			
-			if info and info.prerequisites:
-				for group in info.prerequisites:
-					option_groups = group.course_option_groups()
-					if not option_groups:
-						continue
-					
-					# For each prerequisite group, check if it's satisfied
-					effective_kind = group.kind
-					if effective_kind == "SINGLE" and (
-						len(option_groups) > 1 or (option_groups and len(option_groups[0]) > 1)
-					):
-						effective_kind = "ANY"
-					
-					if effective_kind == "ANY":
+			if info:
+				for group in datastore.prereq_graph.prerequisites_for(slug):
+					if group.kind == "ANY":
 						# At least one option must be satisfied
-						group_satisfied = False
-						for option_group in option_groups:
-							option_satisfied = any(
-								course_code_to_slug(normalize_course_code(prereq)) in completed 
-								for prereq in option_group
-							)
-							if option_satisfied:
-								group_satisfied = True
-								break
-						
+						group_satisfied = any(not option.isdisjoint(completed) for option in group.option_slugs)
 						if not group_satisfied and 'note' not in course:
 							issues.append({
 								'semester': term,
 								'course': course_code,
 								'title': info.name,
-								'missing_prereqs': [" or ".join(opt) for opt in option_groups],
+								'missing_prereqs': [" or ".join(opt) for opt in group.option_codes],
 								'type': 'prerequisite_violation'
 							})
-					else:  # ALL or SINGLE
+					else:  # ALL
 						# All options must be satisfied
-						for option_group in option_groups:
-							option_satisfied = any(
-								course_code_to_slug(normalize_course_code(prereq)) in completed 
-								for prereq in option_group
-							)
-							if not option_satisfied and 'note' not in course:
+						for option_codes, option_slugs in zip(group.option_codes, group.option_slugs):
+							if option_slugs.isdisjoint(completed) and 'note' not in course:
 								issues.append({
 									'semester': term,
 									'course': course_code,
 									'title': info.name,
-									'missing_prereqs': option_group,
+									'missing_prereqs': list(option_codes),
 									'type': 'prerequisite_violation'
 								})
 			
@@ -2588,6 +4635,18 @@ def generate_validation_report(
 				slug = course_code_to_slug(normalize_course_code(course['course']))
 				scheduled_course_slugs.add(slug)
 	
+	# Fulfilled course identifiers (like "MATH_30", matching req.course_slug) -> their
+	# position in summary['fulfilled'] and source; the earliest match names the source
+	fulfilled_courses: Dict[str, Tuple[int, str]] = {}
+	fulfilled_ge = 0
+	for position, fulfilled_req in enumerate(summary.get('fulfilled', [])):
+		if fulfilled_req.get('type') == 'course':
+			fulfilled_courses.setdefault(
+				fulfilled_req.get('identifier', ''), (position, fulfilled_req.get('source', 'Fulfilled'))
+			)
+		elif fulfilled_req.get('type') == 'ge':
+			fulfilled_ge += 1
+
 	report.append("\n1. Required Courses Coverage:")
 	missing_courses = 0
 	for req in required_courses:
@@ -2596,27 +4655,14 @@ def generate_validation_report(
 			# Check if scheduled in plan
 			included = req.course_slug in scheduled_course_slugs
 			
-			# Check if already fulfilled (from fulfilled requirements)
-			is_fulfilled = False
-			fulfilled_source = ""
-			for fulfilled_req in summary.get('fulfilled', []):
-				if fulfilled_req.get('type') == 'course':
-					# The identifier in fulfilled is like "MATH_30", which matches req.course_slug
-					fulfilled_identifier = fulfilled_req.get('identifier', '')
-					
-					if fulfilled_identifier == req.course_slug:
-						is_fulfilled = True
-						fulfilled_source = fulfilled_req.get('source', 'Fulfilled')
-						break
-					# Check if fulfilled via alternative
-					if req.alternatives:
-						for alt in req.alternatives:
-							if fulfilled_identifier == alt:
-								is_fulfilled = True
-								fulfilled_source = fulfilled_req.get('source', 'Fulfilled')
-								break
-					if is_fulfilled:
-						break
+			# Check if already fulfilled, directly or via an alternative
+			matches = [
+				fulfilled_courses[slug]
+				for slug in (req.course_slug, *req.alternatives)
+				if slug in fulfilled_courses
+			]
+			is_fulfilled = bool(matches)
+			fulfilled_source = min(matches)[1] if matches else ""
 			
 			# Check alternatives in the plan
 			if not included and not is_fulfilled and req.alternatives:
@@ -2715,7 +4761,6 @@ def generate_validation_report(
 	report.append("\n6. GE Requirements:")
 	ge_reqs = [r for r in requirements if r.requirement_type == 'ge']
 	scheduled_ge = sum(1 for sem in plan for c in sem['courses'] if c['type'] == 'ge')
-	fulfilled_ge = len([r for r in summary.get('fulfilled', []) if r.get('type') == 'ge'])
 	remaining_ge = len([r for r in summary.get('remaining', []) if r.get('type') == 'ge'])
 	
 	report.append(f"   • Total GE requirements: {len(ge_reqs)}")
@@ -2752,38 +4797,116 @@ def generate_validation_report(
 	return "\n".join(report)
 
 
+MetricsSink = Callable[[Dict[str, Any]], None]
+
+
+class Diagnostics:
+	"""Stage wall times and hot-path counters for one instrumented recommendation_engine call.
+
+	The _stage and _count hooks only record while a Diagnostics is active in the
+	current context, so uninstrumented requests pay one ContextVar lookup per hook.
+	Stages nest: analyze_requirements includes build_student_record.
+	"""
+
+	def __init__(self) -> None:
+		self.stages: Dict[str, float] = {}
+		self.counters: Dict[str, int] = {}
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"stages_ms": {name: round(seconds * 1000.0, 3) for name, seconds in self.stages.items()},
+			"counters": dict(sorted(self.counters.items())),
+		}
+
+
+_ACTIVE_DIAGNOSTICS: contextvars.ContextVar[Optional[Diagnostics]] = contextvars.ContextVar("sparq_diagnostics", default=None)
+_METRICS_SINK: Optional[MetricsSink] = None
+
+
+def set_metrics_sink(sink: Optional[MetricsSink]) -> None:
+	"""Pass every instrumented run's diagnostics (with "major" added) to sink; None removes it."""
+	global _METRICS_SINK
+	_METRICS_SINK = sink
+
+
+def _count(name: str, amount: int = 1) -> None:
+	diagnostics = _ACTIVE_DIAGNOSTICS.get()
+	if diagnostics is not None:
+		diagnostics.counters[name] = diagnostics.counters.get(name, 0) + amount
+
+
+@contextlib.contextmanager
+def _stage(name: str) -> Iterator[None]:
+	diagnostics = _ACTIVE_DIAGNOSTICS.get()
+	if diagnostics is None:
+		yield
+		return
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		diagnostics.stages[name] = diagnostics.stages.get(name, 0.0) + time.perf_counter() - started
+
+
 def recommendation_engine(
 	student_profile: Dict[str, Any],
 	datastore: Optional[DataStore] = None,
+	diagnostics: Optional[bool] = None,
+	include_validation: bool = False,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int]:
+	"""Analyze a student profile and build the semester plan.
+
+	summary["validation_report"] is the generate_validation_report checklist with
+	include_validation=True, and None otherwise (most callers never show it).
+
+	With diagnostics=True (default: the SPARQ_DIAGNOSTICS environment variable) the
+	summary gains a "diagnostics" block of per-stage milliseconds and hot-path
+	counters, which is also handed to the sink registered with set_metrics_sink.
+	"""
+	if diagnostics is None:
+		diagnostics = os.environ.get(DIAGNOSTICS_ENV_VAR, "").lower() in {"1", "true", "yes"}
+	if not diagnostics:
+		return _recommendation_engine(student_profile, datastore, include_validation)
+	collected = Diagnostics()
+	token = _ACTIVE_DIAGNOSTICS.set(collected)
+	started = time.perf_counter()
+	try:
+		summary, plan, semesters = _recommendation_engine(student_profile, datastore, include_validation)
+	finally:
+		_ACTIVE_DIAGNOSTICS.reset(token)
+	collected.stages["total"] = time.perf_counter() - started
+	report = summary["diagnostics"] = collected.as_dict()
+	if _METRICS_SINK is not None:
+		try:
+			_METRICS_SINK({"major": student_profile.get("major"), **report})
+		except Exception as exc:  # exporting metrics must not fail the request
+			report["sink_error"] = f"{type(exc).__name__}: {exc}"
+	return summary, plan, semesters
+
+
+def _recommendation_engine(
+	student_profile: Dict[str, Any],
+	datastore: Optional[DataStore] = None,
+	include_validation: bool = False,
 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int]:
-	datastore = datastore or DataStore()
-	record, fulfilled, remaining, requirements = analyze_requirements(student_profile, datastore)
+	with _stage("load"):
+		datastore = datastore or get_shared_datastore()
+		skeleton = datastore.requirement_skeleton(student_profile.get("major", ""))
+	with _stage("analyze_requirements"):
+		record, fulfilled, remaining, requirements = analyze_requirements(
+			student_profile, datastore, list(skeleton.requirements)
+		)
 	
 	# Load academic catalog for major-specific course suggestions
-	academic_catalog = datastore.load_academic_catalog(student_profile.get("major", ""))
+	with _stage("load"):
+		academic_catalog = datastore.load_academic_catalog(student_profile.get("major", ""))
 	
-	plan, semesters = plan_semesters(student_profile, record, requirements, datastore, academic_catalog)
-	schedule_warnings = assign_sections_to_plan(plan, student_profile, datastore)
+	with _stage("plan_semesters"):
+		plan, semesters = plan_semesters(student_profile, record, requirements, datastore, academic_catalog, skeleton)
+	with _stage("assign_sections_to_plan"):
+		schedule_warnings = assign_sections_to_plan(plan, student_profile, datastore)
 
-	units_remaining = sum(
-		_requirement_units(req, datastore)
-		for req in requirements
-		if req.requirement_type == "course"
-		and req.all_course_slugs()
-		and all(slug not in record.completed_courses for slug in req.all_course_slugs())
-		and all(slug not in record.in_progress_courses for slug in req.all_course_slugs())
-	)
-	units_remaining += sum(
-		_requirement_units(req, datastore)
-		for req in requirements
-		if req.requirement_type == "ge"
-		and any(area not in record.fulfilled_ge for area in req.ge_areas)
-	)
-	units_remaining += sum(
-		_requirement_units(req, datastore)
-		for req in requirements
-		if req.requirement_type == "activity"
-	)
+	units_remaining = _units_remaining(requirements, record, skeleton.facts)
 
 	plan_total_units = sum(term.get("total_units", 0.0) for term in plan)
 	plan_length = len(plan)
@@ -2827,13 +4950,270 @@ def recommendation_engine(
 		"schedule_warnings": schedule_warnings,
 	}
 	
-	# Generate validation report
-	validation_report = generate_validation_report(plan, requirements, summary, datastore)
+	# Validation report: only rendered for callers that ask for it
+	validation_report = None
+	if include_validation:
+		with _stage("generate_validation_report"):
+			validation_report = generate_validation_report(plan, requirements, summary, datastore)
 	summary['validation_report'] = validation_report
 	
 	return summary, plan, semesters
 
 
+@dataclass
+class DegreeAudit:
+	"""Degree progress for one student: requirement statuses and units still owed."""
+
+	major: str
+	units_remaining: float
+	fulfilled: List[Dict[str, Any]] = field(default_factory=list)
+	remaining: List[Dict[str, Any]] = field(default_factory=list)
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"major": self.major,
+			"units_remaining": self.units_remaining,
+			"fulfilled": self.fulfilled,
+			"remaining": self.remaining,
+		}
+
+
+def _audit_requirement(requirement: Requirement, record: StudentRecord, facts: RequirementFacts) -> Dict[str, Any]:
+	"""The status half of evaluate_requirement, without suggestions or prerequisite text.
+
+	Statuses and per-entry units match evaluate_requirement's.
+	"""
+	key = id(requirement)
+	status = "remaining"
+	source: Optional[str] = None
+	units = facts.listed_units[key]
+	if requirement.requirement_type == "course":
+		slugs = facts.slugs[key]
+		completion = next((record.completed_courses[slug] for slug in slugs if slug in record.completed_courses), None)
+		if completion is not None:
+			status, source, units = "fulfilled", completion.source, completion.units or requirement.units
+		elif any(slug in record.in_progress_courses for slug in slugs):
+			status, units = "in_progress", requirement.units
+	elif requirement.requirement_type == "ge":
+		ge_ok = all(area in record.fulfilled_ge for area in requirement.ge_areas or [])
+		ai_ok = True
+		if requirement.ai_areas:
+			satisfied = [area for area in requirement.ai_areas if area in record.fulfilled_ai]
+			any_mode = "or" in requirement.display_name.lower()
+			ai_ok = bool(satisfied) if any_mode else len(satisfied) == len(requirement.ai_areas)
+		if ge_ok and ai_ok:
+			sources = {record.fulfilled_ge[area] for area in requirement.ge_areas or []}
+			status, source = "fulfilled", ", ".join(sorted(sources)) if sources else "Transfer"
+	elif requirement.requirement_type not in {"elective", "activity"}:
+		status = "informational"
+	return {
+		"identifier": requirement.identifier,
+		"display_name": requirement.display_name,
+		"type": requirement.requirement_type,
+		"units": units,
+		"status": status,
+		"source": source,
+	}
+
+
+def degree_audit(student_profile: Dict[str, Any], datastore: Optional[DataStore] = None) -> DegreeAudit:
+	"""Requirement statuses and units remaining, without planning, sections or a report.
+
+	Statuses match analyze_requirements, but entries carry no suggestions or
+	prerequisite text. Everything major- and college-specific comes from the
+	DataStore caches (requirement skeleton, compiled articulation indexes), so once
+	those are warm an audit reads no files.
+	"""
+	datastore = datastore or get_shared_datastore()
+	major = student_profile.get("major", "")
+	skeleton = datastore.requirement_skeleton(major)
+	with _stage("build_student_record"):
+		record = build_student_record(student_profile, datastore)
+	audit = DegreeAudit(major=major, units_remaining=round(_units_remaining(skeleton.requirements, record, skeleton.facts), 1))
+	for requirement in skeleton.requirements:
+		entry = _audit_requirement(requirement, record, skeleton.facts)
+		(audit.remaining if entry["status"] == "remaining" else audit.fulfilled).append(entry)
+	return audit
+
+
+@dataclass
+class CohortAuditResult:
+	index: int
+	major: Optional[str] = None
+	units_remaining: Optional[float] = None
+	remaining: List[str] = field(default_factory=list)
+	error: Optional[str] = None
+
+
+def cohort_audit(
+	profiles: Sequence[Dict[str, Any]],
+	datastore: Optional[DataStore] = None,
+) -> List[CohortAuditResult]:
+	"""Audit many students at once with each major's compiled RequirementMasks.
+
+	Every student's record is encoded as bitsets over DataStore course and area IDs,
+	so a requirement check is an integer AND rather than dict lookups.
+	units_remaining and the remaining identifiers match degree_audit (there are no
+	per-entry units here). Results are in input order; a profile
+	whose major is unknown gets an error instead of aborting the cohort.
+	"""
+	datastore = datastore or get_shared_datastore()
+	results: List[CohortAuditResult] = []
+	for index, profile in enumerate(profiles):
+		major = profile.get("major", "")
+		try:
+			masks = datastore.requirement_skeleton(major).masks
+		except (ValueError, FileNotFoundError) as exc:
+			results.append(CohortAuditResult(index=index, major=major, error=str(exc)))
+			continue
+		with _stage("build_student_record"):
+			student = StudentBits(build_student_record(profile, datastore), datastore)
+		results.append(
+			CohortAuditResult(
+				index=index,
+				major=major,
+				units_remaining=round(masks.units_remaining(student), 1),
+				remaining=masks.identifiers_in(masks.remaining(student)),
+			)
+		)
+	return results
+
+
+@dataclass
+class MajorFit:
+	roadmap: str
+	major: Optional[str]
+	units_remaining: float
+	remaining: List[str] = field(default_factory=list)
+	current: bool = False
+
+
+def major_switch_audit(
+	student_profile: Dict[str, Any],
+	datastore: Optional[DataStore] = None,
+	limit: Optional[int] = None,
+) -> List[MajorFit]:
+	"""Rank every roadmap by how much of it the student has left ("what if I switch majors").
+
+	The student record is built once and checked against each roadmap's compiled
+	RequirementMasks, so every roadmap in roadmaps/ is covered, including ones no
+	major name resolves to (their major is None). Fits are ordered by units
+	remaining, then by the number of remaining requirements; current marks the
+	roadmap of the profile's own major.
+	"""
+	datastore = datastore or get_shared_datastore()
+	names: Dict[str, str] = {}
+	for metadata in datastore.major_index.values():
+		names.setdefault(metadata["slug"], metadata["name"])
+	current_major = datastore.resolve_major(student_profile.get("major", ""))
+	skeletons: List[RequirementSkeleton] = []
+	for slug in datastore.roadmap_files():
+		try:
+			skeletons.append(datastore.roadmap_skeleton(slug, names.get(slug)))
+		except (ValueError, FileNotFoundError):
+			continue
+	# Encode only after every mask is compiled: compiling can hand out new course IDs
+	with _stage("build_student_record"):
+		student = StudentBits(build_student_record(student_profile, datastore), datastore)
+	fits = []
+	for skeleton in skeletons:
+		masks = skeleton.masks
+		fits.append(
+			MajorFit(
+				roadmap=skeleton.major_slug,
+				major=names.get(skeleton.major_slug),
+				units_remaining=round(masks.units_remaining(student), 1),
+				remaining=masks.identifiers_in(masks.remaining(student)),
+				current=current_major is not None and current_major["slug"] == skeleton.major_slug,
+			)
+		)
+	fits.sort(key=lambda fit: (fit.units_remaining, len(fit.remaining), fit.roadmap))
+	return fits[:limit] if limit is not None else fits
+
+
+@dataclass
+class BatchResult:
+	index: int
+	summary: Optional[Dict[str, Any]] = None
+	plan: Optional[List[Dict[str, Any]]] = None
+	semesters: Optional[int] = None
+	error: Optional[str] = None
+
+
+# Worker-side DataStore for recommendation_engine_batch; inherited on fork, loaded on spawn
+_BATCH_DATASTORE: Optional[DataStore] = None
+
+
+def _init_batch_worker(data_dir: Path) -> None:
+	global _BATCH_DATASTORE
+	if _BATCH_DATASTORE is None:
+		_BATCH_DATASTORE = get_shared_datastore(data_dir)
+
+
+def _run_batch_chunk(task: Tuple[str, List[Tuple[int, Dict[str, Any]]]]) -> List[BatchResult]:
+	major, entries = task
+	datastore = _BATCH_DATASTORE or get_shared_datastore()
+	results: List[BatchResult] = []
+	try:
+		# Warms the worker's skeleton cache once for the whole chunk
+		datastore.requirement_skeleton(major)
+	except (ValueError, FileNotFoundError) as exc:
+		return [BatchResult(index=index, error=str(exc)) for index, _ in entries]
+	for index, profile in entries:
+		try:
+			summary, plan, semesters = recommendation_engine(profile, datastore)
+		except Exception as exc:  # one bad profile must not abort the whole batch
+			results.append(BatchResult(index=index, error=f"{type(exc).__name__}: {exc}"))
+			continue
+		results.append(BatchResult(index=index, summary=summary, plan=plan, semesters=semesters))
+	return results
+
+
+def recommendation_engine_batch(
+	profiles: Sequence[Dict[str, Any]],
+	workers: Optional[int] = None,
+	datastore: Optional[DataStore] = None,
+	chunk_size: int = 32,
+) -> Iterator[BatchResult]:
+	"""Plan many student profiles, yielding BatchResults as chunks finish.
+
+	Profiles are grouped by resolved major so each worker builds a major's
+	requirement list once. With workers > 1 the loaded DataStore is shared with a
+	process pool (inherited via fork where available). Results arrive out of order;
+	BatchResult.index points back into profiles.
+	"""
+	global _BATCH_DATASTORE
+	datastore = datastore or get_shared_datastore()
+	groups: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+	for index, profile in enumerate(profiles):
+		major = profile.get("major", "") or ""
+		metadata = datastore.resolve_major(major)
+		key = metadata["name"] if metadata else major
+		groups.setdefault(key, []).append((index, profile))
+	tasks: List[Tuple[str, List[Tuple[int, Dict[str, Any]]]]] = []
+	for major, entries in groups.items():
+		for start in range(0, len(entries), max(1, chunk_size)):
+			tasks.append((major, entries[start:start + chunk_size]))
+
+	if workers is None:
+		workers = os.cpu_count() or 1
+	workers = min(workers, len(tasks))
+	previous = _BATCH_DATASTORE
+	_BATCH_DATASTORE = datastore
+	try:
+		if workers <= 1:
+			for task in tasks:
+				yield from _run_batch_chunk(task)
+			return
+		methods = multiprocessing.get_all_start_methods()
+		context = multiprocessing.get_context("fork" if "fork" in methods else None)
+		with context.Pool(workers, initializer=_init_batch_worker, initargs=(datastore.data_dir,)) as pool:
+			for chunk in pool.imap_unordered(_run_batch_chunk, tasks):
+				yield from chunk
+	finally:
+		_BATCH_DATASTORE = previous
+
+
 def _format_prerequisites_for_display(prereqs: Optional[Any]) -> str:
 	if not prereqs:
 		return "None"
@@ -2990,8 +5370,66 @@ if __name__ == "__main__":
 	parser = argparse.ArgumentParser(description="Generate a SPARQ plan as JSON.")
 	parser.add_argument("--input", "-i", type=Path, help="Path to a student profile JSON file. Defaults to stdin.")
 	parser.add_argument("--output", "-o", type=Path, help="Optional path to write the resulting JSON.")
+	parser.add_argument("--build-snapshot", type=Path, metavar="PATH", help="Write a DataStore snapshot to PATH and exit.")
+	parser.add_argument(
+		"--schedule-delta",
+		type=Path,
+		metavar="PATH",
+		help="With --build-snapshot: apply an open-seats delta to the existing snapshot and rewrite it.",
+	)
+	parser.add_argument(
+		"--build-bundle",
+		type=Path,
+		metavar="PATH",
+		help="Encode the JSON sources into a memory-mappable catalog bundle at PATH and exit.",
+	)
+	parser.add_argument(
+		"--diagnostics",
+		action="store_true",
+		help="Include per-stage timings and counters in the output.",
+	)
+	parser.add_argument(
+		"--audit",
+		action="store_true",
+		help="Only report requirement progress (degree_audit); skip planning and sections.",
+	)
+	parser.add_argument(
+		"--what-if",
+		type=int,
+		nargs="?",
+		const=10,
+		metavar="N",
+		help="Rank every roadmap by units remaining for this student and print the top N (default: 10).",
+	)
+	parser.add_argument(
+		"--warm-cc",
+		action="store_true",
+		help="Load every community college agreement up front and print load times to stderr.",
+	)
 	args = parser.parse_args()
 
+	if args.schedule_delta and not args.build_snapshot:
+		parser.error("--schedule-delta requires --build-snapshot")
+
+	if args.build_bundle:
+		bundle = build_catalog_bundle(args.build_bundle)
+		sys.stderr.write(f"Wrote {len(bundle)} documents ({bundle.size / 1e6:.1f} MB) to {args.build_bundle}\n")
+		sys.exit(0)
+
+	if args.build_snapshot:
+		if args.schedule_delta:
+			datastore = DataStore.load_or_build(DATA_DIR, args.build_snapshot)
+			report = datastore.apply_schedule_delta(args.schedule_delta)
+			if report.unknown:
+				sys.stderr.write(f"Unknown class numbers in delta: {', '.join(report.unknown)}\n")
+		else:
+			datastore = DataStore()
+		datastore.save_snapshot(args.build_snapshot)
+		sys.exit(0)
+
+	if args.warm_cc:
+		sys.stderr.write(get_shared_datastore().warm_cc_articulations().format() + "\n")
+
 	def _load_profile(path: Optional[Path]) -> Dict[str, Any]:
 		if path:
 			with path.open("r", encoding="utf-8") as handle:
@@ -3001,7 +5439,18 @@ if __name__ == "__main__":
 		return json.load(sys.stdin)
 
 	profile = _load_profile(args.input)
-	summary, plan, semesters = recommendation_engine(profile)
+	if args.audit or args.what_if is not None:
+		if args.what_if is not None:
+			output = [asdict(fit) for fit in major_switch_audit(profile, limit=args.what_if)]
+		else:
+			output = degree_audit(profile).as_dict()
+		if args.output:
+			args.output.write_text(json.dumps(output, indent=2), encoding="utf-8")
+		else:
+			json.dump(output, sys.stdout, indent=2)
+			sys.stdout.write("\n")
+		sys.exit(0)
+	summary, plan, semesters = recommendation_engine(profile, diagnostics=args.diagnostics or None)
 
 	output = {
 		"major": profile.get("major"),
@@ -3012,6 +5461,8 @@ if __name__ == "__main__":
 		"semester_plan": plan,
 		"notes": summary.get("notes", []),
 	}
+	if "diagnostics" in summary:
+		output["diagnostics"] = summary["diagnostics"]
 
 	if args.output:
 		args.output.write_text(json.dumps(output, indent=2), encoding="utf-8")
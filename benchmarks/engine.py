@@ -0,0 +1,305 @@
+"""End-to-end latency and allocation benchmark for the recommendation engine.
+
+Profiles cover every roadmap in json/roadmaps/ that a major in sjsu_majors.json
+resolves to (files whose names the slug rules never produce are unreachable from
+the engine and skipped). Each major gets one empty transcript plus --transcripts
+synthetic community college transcripts drawn from the articulation files in
+json/community_college/ (seeded, so runs are comparable). Each profile is run through
+
+  build_student_record, analyze_requirements (which builds the record again),
+  plan_semesters, assign_sections_to_plan, generate_validation_report, the
+  full recommendation_engine and the progress-only degree_audit,
+
+and DataStore construction is timed separately (from JSON, from a snapshot and
+from a catalog bundle). Every stage reports p50/p95/p99 wall time, and a second
+pass under tracemalloc reports the peak memory each call allocated above where it
+started (KiB). Timings and allocations are taken in separate passes because
+tracemalloc slows everything down.
+
+Usage:
+  python benchmarks/engine.py --output bench.json
+  python benchmarks/engine.py --transcripts 1 --limit 40 --compare bench.json
+
+--compare prints each stage's p50/p95 next to a previous run's results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import (  # noqa: E402
+    DATA_DIR,
+    CatalogBundle,
+    DataStore,
+    _articulation_filename,
+    analyze_requirements,
+    assign_sections_to_plan,
+    build_catalog_bundle,
+    build_student_record,
+    degree_audit,
+    generate_validation_report,
+    plan_semesters,
+    recommendation_engine,
+)
+
+PIPELINE_STAGES = (
+    "build_student_record",
+    "analyze_requirements",
+    "plan_semesters",
+    "assign_sections_to_plan",
+    "generate_validation_report",
+    "recommendation_engine",
+    "degree_audit",
+)
+GRADES = ("A", "A", "B", "B", "C", "CR", "D")
+
+
+def _cc_course_pools(data_dir: Path) -> Dict[str, List[str]]:
+    """CC course codes per institution, for the agreements the engine can load."""
+    pools: Dict[str, List[str]] = {}
+    for path in sorted((data_dir / "community_college").glob("*.json")):
+        if _articulation_filename(path.stem) != path.name:
+            continue
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        codes = set()
+        for section in data.get("output", []):
+            for mapped in section.get("courses", []):
+                for equivalent in mapped.get("equivalents") or []:
+                    for code in str(equivalent).replace("&&", "|").replace("||", "|").split("|"):
+                        code = code.lstrip("&|").strip()
+                        if code and code.upper() != "NONE":
+                            codes.add(code)
+        if codes:
+            pools[path.stem.replace("_", " ")] = sorted(codes)
+    return pools
+
+
+def build_profiles(datastore: DataStore, transcripts: int, seed: int) -> List[Dict[str, Any]]:
+    """One empty profile per roadmap plus `transcripts` synthetic CC transcripts each."""
+    rng = random.Random(seed)
+    pools = _cc_course_pools(datastore.data_dir)
+    institutions = sorted(pools)
+    roadmaps = {path.name for path in (datastore.data_dir / "roadmaps").glob("*.json")}
+    majors = sorted({meta["name"] for meta in datastore.major_index.values() if meta["slug"] in roadmaps})
+    profiles: List[Dict[str, Any]] = []
+    for major in majors:
+        profiles.append({"major": major, "units_per_semester": 15})
+        for index in range(transcripts):
+            institution = rng.choice(institutions)
+            codes = rng.sample(pools[institution], min(len(pools[institution]), rng.randint(5, 40)))
+            profile: Dict[str, Any] = {
+                "major": major,
+                "units_per_semester": rng.choice((12, 15, 16, 18)),
+                "cc_courses": [
+                    {"code": code, "title": code, "grade": rng.choice(GRADES), "institution": institution}
+                    for code in codes
+                ],
+            }
+            if index % 2:
+                profile["schedule_preferences"] = {
+                    "enabled": True,
+                    "earliest_start": "9:00 AM",
+                    "avoid_days": ["F"],
+                    "prefer_open_sections": True,
+                }
+            profiles.append(profile)
+    return profiles
+
+
+def _run_pipeline(profile: Dict[str, Any], datastore: DataStore, measure: Callable[..., Any]) -> None:
+    """Run each stage on a fresh copy of the profile, the way recommendation_engine chains them."""
+    major = profile.get("major", "")
+    skeleton = datastore.requirement_skeleton(major)
+    measure("build_student_record", build_student_record, copy.deepcopy(profile), datastore)
+    record, _, _, requirements = measure(
+        "analyze_requirements", analyze_requirements, copy.deepcopy(profile), datastore, list(skeleton.requirements)
+    )
+    academic_catalog = datastore.load_academic_catalog(major)
+    plan, _ = measure(
+        "plan_semesters", plan_semesters, copy.deepcopy(profile), record, requirements, datastore, academic_catalog, skeleton
+    )
+    measure("assign_sections_to_plan", assign_sections_to_plan, plan, copy.deepcopy(profile), datastore)
+    summary, plan, _ = measure("recommendation_engine", recommendation_engine, copy.deepcopy(profile), datastore)
+    measure("generate_validation_report", generate_validation_report, plan, requirements, summary, datastore)
+    measure("degree_audit", degree_audit, copy.deepcopy(profile), datastore)
+
+
+def _timer(samples: Dict[str, List[float]]) -> Callable[..., Any]:
+    def measure(stage: str, function: Callable[..., Any], *args: Any) -> Any:
+        started = time.perf_counter()
+        result = function(*args)
+        samples.setdefault(stage, []).append((time.perf_counter() - started) * 1000.0)
+        return result
+
+    return measure
+
+
+def _allocation_meter(samples: Dict[str, List[float]]) -> Callable[..., Any]:
+    def measure(stage: str, function: Callable[..., Any], *args: Any) -> Any:
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = function(*args)
+        samples.setdefault(stage, []).append((tracemalloc.get_traced_memory()[1] - start) / 1024.0)
+        return result
+
+    return measure
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "p99": values[0]}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def _summarize(timings: Dict[str, List[float]], allocations: Dict[str, List[float]]) -> Dict[str, Dict[str, Any]]:
+    stages: Dict[str, Dict[str, Any]] = {}
+    order = [stage for stage in timings if stage not in PIPELINE_STAGES] + list(PIPELINE_STAGES)
+    for stage in order:
+        values = timings.get(stage)
+        if not values:
+            continue
+        latency = _percentiles(values)
+        entry: Dict[str, Any] = {
+            "samples": len(values),
+            "p50_ms": round(latency["p50"], 3),
+            "p95_ms": round(latency["p95"], 3),
+            "p99_ms": round(latency["p99"], 3),
+            "mean_ms": round(statistics.mean(values), 3),
+            "max_ms": round(max(values), 3),
+        }
+        if allocations.get(stage):
+            allocated = _percentiles(allocations[stage])
+            entry.update({
+                "alloc_p50_kib": round(allocated["p50"], 1),
+                "alloc_p95_kib": round(allocated["p95"], 1),
+                "alloc_p99_kib": round(allocated["p99"], 1),
+            })
+        stages[stage] = entry
+    return stages
+
+
+def _datastore_loaders(scratch: Path) -> Dict[str, Callable[[], DataStore]]:
+    snapshot_path = scratch / "datastore.snapshot"
+    DataStore(DATA_DIR).save_snapshot(snapshot_path)
+    bundle_path = scratch / "catalog.bundle"
+    build_catalog_bundle(bundle_path).close()
+    return {
+        "datastore_json": lambda: DataStore(DATA_DIR),
+        "datastore_snapshot": lambda: DataStore.from_snapshot(snapshot_path, DATA_DIR),
+        "datastore_bundle": lambda: DataStore(DATA_DIR, CatalogBundle(bundle_path)),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=DATA_DIR.parent, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run(transcripts: int, seed: int, limit: Optional[int], repeats: int, allocations: bool) -> Dict[str, Any]:
+    timings: Dict[str, List[float]] = {}
+    allocated: Dict[str, List[float]] = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        loaders = _datastore_loaders(Path(scratch))
+        for _ in range(repeats):
+            for stage, loader in loaders.items():
+                _timer(timings)(stage, loader)
+        if allocations:
+            tracemalloc.start()
+            for stage, loader in loaders.items():
+                _allocation_meter(allocated)(stage, loader)
+            tracemalloc.stop()
+
+    datastore = DataStore(DATA_DIR)
+    profiles = build_profiles(datastore, transcripts, seed)
+    if limit is not None:
+        profiles = profiles[:limit]
+    # Warm the per-major caches so stage timings reflect steady-state requests
+    for profile in profiles:
+        datastore.requirement_skeleton(profile["major"])
+        datastore.load_academic_catalog(profile["major"])
+    datastore.warm_cc_articulations()
+
+    for profile in profiles:
+        _run_pipeline(profile, datastore, _timer(timings))
+    if allocations:
+        tracemalloc.start()
+        for profile in profiles:
+            _run_pipeline(profile, datastore, _allocation_meter(allocated))
+        tracemalloc.stop()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "profiles": len(profiles),
+            "transcripts_per_major": transcripts,
+            "seed": seed,
+            "datastore_repeats": repeats,
+        },
+        "stages": _summarize(timings, allocated),
+    }
+
+
+def _print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'stage':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'alloc p50 KiB':>15}"
+    if baseline:
+        header += f"{'p50 vs base':>14}{'p95 vs base':>14}"
+    print(header)
+    for stage, entry in results["stages"].items():
+        allocated = f"{entry['alloc_p50_kib']:.1f}" if "alloc_p50_kib" in entry else "-"
+        line = (
+            f"{stage:<28}{entry['samples']:>6}{entry['p50_ms']:>10.2f}{entry['p95_ms']:>10.2f}"
+            f"{entry['p99_ms']:>10.2f}{allocated:>15}"
+        )
+        previous = (baseline or {}).get("stages", {}).get(stage)
+        if previous:
+            for key in ("p50_ms", "p95_ms"):
+                ratio = entry[key] / previous[key] if previous[key] else float("nan")
+                line += f"{ratio:>13.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=int, default=2, help="Synthetic CC transcripts per major (default: 2).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic transcripts.")
+    parser.add_argument("--limit", type=int, help="Only run the first N profiles.")
+    parser.add_argument("--repeats", type=int, default=5, help="DataStore constructions per loader (default: 5).")
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass.")
+    parser.add_argument("--output", "-o", type=Path, metavar="PATH", help="Write the results as JSON to PATH.")
+    parser.add_argument("--compare", type=Path, metavar="PATH", help="Previous results to compare against.")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    results = run(args.transcripts, args.seed, args.limit, args.repeats, not args.no_allocations)
+    _print_results(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Regression checks for the section solver, ranked schedule options and the JSON streamer.
+
+Each check compares an optimized code path against a brute-force reference:
+
+  solve     TermSectionProblem.solve() places as many courses, at as high a summed
+            score, as the best schedule found by enumerating every combination
+  ranked    TermSectionProblem.ranked() yields exactly the schedules that place the
+            most courses, in non-increasing score order, with the enumerated scores
+  stream    _iter_json_array() with the stdlib fallback (ijson disabled) and tiny
+            chunk sizes returns the same elements as json.load, for synthetic
+            documents and for the top-level arrays in json/
+
+Terms for the solver checks are random (seeded): a few courses, each with one or
+two section types and a handful of sections on overlapping day patterns and times,
+some of them online (no meeting time). Conflicts in the reference are computed
+pairwise from the sections' days and times, independently of the solver's masks.
+
+Usage:
+  python benchmarks/regression.py
+  python benchmarks/regression.py --cases 500 --seed 7 --only solve ranked
+
+Exits non-zero and prints the first failing case of each check on a mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+from app import (  # noqa: E402
+    DATA_DIR,
+    DAY_BITS,
+    ScheduleSection,
+    TermSectionProblem,
+    _iter_json_array,
+    _parse_schedule_preferences,
+)
+
+DAY_PATTERNS = ("MW", "TR", "MWF", "F", "T", "")
+START_TIMES = tuple(range(8 * 60, 16 * 60, 30))
+SECTION_TYPES = (("LEC",), ("LEC",), ("LEC", "LAB"), ("SEM", "ACT"))
+CHUNK_SIZES = (1, 2, 3, 5, 8, 64)
+# Files larger than this are streamed with the larger chunk sizes only
+SMALL_FILE_BYTES = 16 * 1024
+
+Schedule = Dict[int, List[int]]
+
+
+def random_term(rng: random.Random) -> List[Tuple[str, List[ScheduleSection]]]:
+    courses: List[Tuple[str, List[ScheduleSection]]] = []
+    for course_number in range(rng.randint(2, 5)):
+        slug = f"test{course_number}"
+        sections: List[ScheduleSection] = []
+        for section_type in rng.choice(SECTION_TYPES):
+            for section_number in range(rng.randint(1, 3)):
+                pattern = rng.choice(DAY_PATTERNS)
+                start = rng.choice(START_TIMES) if pattern else None
+                end = start + rng.choice((50, 75, 165)) if start is not None else None
+                day_mask = 0
+                for day in pattern:
+                    day_mask |= DAY_BITS[day]
+                sections.append(
+                    ScheduleSection(
+                        course_slug=slug,
+                        course_code=f"TEST {course_number}",
+                        section=f"{section_type}{section_number}",
+                        class_number=f"{course_number}{section_type}{section_number}",
+                        instruction_mode="In Person" if pattern else "Fully Online",
+                        title="",
+                        satisfies="",
+                        units=3.0,
+                        section_type=section_type,
+                        day_pattern=pattern,
+                        day_mask=day_mask,
+                        start_minutes=start,
+                        end_minutes=end,
+                        time_string="",
+                        instructor=rng.choice(("Ada", "Grace", "Alan", "Staff")),
+                        location="",
+                        dates="",
+                        open_seats=rng.choice((None, 0, 4, 20)),
+                        notes="",
+                    )
+                )
+        courses.append((slug, sections))
+    return courses
+
+
+def random_preferences(rng: random.Random) -> Dict[str, Any]:
+    raw: Dict[str, Any] = {"instructor_ratings": {"Ada": rng.choice((0.5, 1.0)), "Alan": -0.5}}
+    if rng.random() < 0.3:
+        raw["no_8am"] = True
+    if rng.random() < 0.3:
+        raw["preferred_days"] = ["T", "R"]
+    return raw
+
+
+def overlaps(a: ScheduleSection, b: ScheduleSection) -> bool:
+    if a.start_minutes is None or b.start_minutes is None or not a.day_mask & b.day_mask:
+        return False
+    return a.start_minutes < b.end_minutes and b.start_minutes < a.end_minutes
+
+
+def valid(problem: TermSectionProblem, schedule: Schedule) -> bool:
+    chosen = [problem.sections[candidate] for picks in schedule.values() for candidate in picks]
+    for course_index, picks in schedule.items():
+        types = [problem.sections[candidate].section_type for candidate in picks]
+        if types != problem.component_types[course_index]:
+            return False
+    return not any(overlaps(a, b) for a, b in itertools.combinations(chosen, 2))
+
+
+def enumerate_schedules(problem: TermSectionProblem) -> List[Tuple[float, Schedule]]:
+    """Every conflict-free schedule placing the most courses, by brute force."""
+    options: List[List[Optional[Tuple[int, ...]]]] = []
+    for components in problem.all_components:
+        options.append([None] + (list(itertools.product(*components)) if components else []))
+    best_count = 0
+    found: List[Tuple[float, Schedule]] = []
+    for choice in itertools.product(*options):
+        schedule = {index: list(picks) for index, picks in enumerate(choice) if picks is not None}
+        if len(schedule) < best_count or not valid(problem, schedule):
+            continue
+        if len(schedule) > best_count:
+            best_count = len(schedule)
+            found = []
+        score = sum(problem.scores[candidate] for picks in schedule.values() for candidate in picks)
+        found.append((score, schedule))
+    found.sort(key=lambda item: item[0], reverse=True)
+    return found
+
+
+def schedule_key(schedule: Schedule) -> Tuple[Tuple[int, Tuple[int, ...]], ...]:
+    return tuple(sorted((index, tuple(picks)) for index, picks in schedule.items()))
+
+
+def check_solve(problem: TermSectionProblem, expected: List[Tuple[float, Schedule]]) -> Optional[str]:
+    schedule = problem.solve(node_limit=10 ** 7)
+    if not valid(problem, schedule):
+        return f"solve() returned a conflicting schedule {schedule}"
+    score = sum(problem.scores[candidate] for picks in schedule.values() for candidate in picks)
+    best_score, best = expected[0]
+    if len(schedule) != len(best) or round(score, 6) != round(best_score, 6):
+        return f"solve() placed {len(schedule)} courses scoring {score:.4f}; best is {len(best)} scoring {best_score:.4f}"
+    return None
+
+
+def check_ranked(problem: TermSectionProblem, expected: List[Tuple[float, Schedule]]) -> Optional[str]:
+    ranked = list(problem.ranked(expansion_limit=10 ** 7))
+    scores = [round(score, 6) for score, _ in ranked]
+    if scores != sorted(scores, reverse=True):
+        return f"ranked() scores out of order: {scores}"
+    if scores != [round(score, 6) for score, _ in expected]:
+        return f"ranked() scores {scores} != enumerated {[round(score, 6) for score, _ in expected]}"
+    keys = [schedule_key(schedule) for _, schedule in ranked]
+    if len(set(keys)) != len(keys):
+        return "ranked() yielded a schedule twice"
+    if set(keys) != {schedule_key(schedule) for _, schedule in expected}:
+        return "ranked() schedules differ from the enumerated ones"
+    for _, schedule in ranked[:5]:
+        if not valid(problem, schedule):
+            return f"ranked() yielded a conflicting schedule {schedule}"
+    return None
+
+
+def run_solver_checks(cases: int, seed: int, names: List[str]) -> Dict[str, Optional[str]]:
+    checks: Dict[str, Callable[[TermSectionProblem, List[Tuple[float, Schedule]]], Optional[str]]] = {
+        "solve": check_solve,
+        "ranked": check_ranked,
+    }
+    failures: Dict[str, Optional[str]] = {name: None for name in names if name in checks}
+    rng = random.Random(seed)
+    for case in range(cases):
+        courses = random_term(rng)
+        preferences = _parse_schedule_preferences(random_preferences(rng))
+        problem = TermSectionProblem(courses, preferences)
+        expected = enumerate_schedules(problem)
+        for name in failures:
+            if failures[name] is not None:
+                continue
+            message = checks[name](problem, expected)
+            if message is not None:
+                failures[name] = f"case {case}: {message}"
+    return failures
+
+
+def synthetic_documents(rng: random.Random) -> List[str]:
+    documents = [
+        "[]",
+        " \n[ ] ",
+        "[1, 22, 333, -4.5e+10, 0.25]",
+        '[true, false, null, "]", "\\"[,]\\"", "caf\\u00e9", "über"]',
+        '[{"a": [1, [2, [3]]], "b": {"c": "x, y"}}, [], {}]',
+        "[12345678901234567890, 1E5, 7]",
+    ]
+    for _ in range(20):
+        values = [
+            rng.choice(
+                (
+                    rng.randint(-10 ** 6, 10 ** 6),
+                    rng.random() * 1000,
+                    "".join(rng.choice("ab ,[]{}:\"\\é") for _ in range(rng.randint(0, 12))),
+                    {"k": [rng.randint(0, 9) for _ in range(rng.randint(0, 4))], "s": None},
+                    [True, False],
+                )
+            )
+            for _ in range(rng.randint(0, 12))
+        ]
+        separators = rng.choice(((",", ":"), (", ", ": "), (" ,\n  ", " : ")))
+        documents.append(json.dumps(values, separators=separators, ensure_ascii=rng.random() < 0.5))
+    return documents
+
+
+def stream(path: Path, chunk_size: int) -> List[Any]:
+    saved = app.ijson, app.JSON_STREAM_CHUNK_SIZE
+    app.ijson, app.JSON_STREAM_CHUNK_SIZE = None, chunk_size
+    try:
+        return list(_iter_json_array(path))
+    finally:
+        app.ijson, app.JSON_STREAM_CHUNK_SIZE = saved
+
+
+def streams_as(path: Path, chunk_size: int, expected: List[Any]) -> bool:
+    try:
+        return stream(path, chunk_size) == expected
+    except ValueError:
+        return False
+
+
+def run_stream_checks(seed: int) -> Optional[str]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "document.json"
+        for number, document in enumerate(synthetic_documents(random.Random(seed))):
+            path.write_text(document, encoding="utf-8")
+            expected = json.loads(document)
+            for chunk_size in CHUNK_SIZES:
+                if not streams_as(path, chunk_size, expected):
+                    return f"synthetic document {number} at chunk size {chunk_size}: {document[:80]!r}"
+        for bad in ("{}", "[1 2]", "[1,"):
+            path.write_text(bad, encoding="utf-8")
+            try:
+                stream(path, 1)
+            except ValueError:
+                continue
+            return f"malformed document {bad!r} was accepted"
+    for path in sorted(DATA_DIR.rglob("*.json")):
+        with path.open("r", encoding="utf-8") as handle:
+            expected = json.load(handle)
+        if not isinstance(expected, list):
+            continue
+        small = path.stat().st_size <= SMALL_FILE_BYTES
+        for chunk_size in CHUNK_SIZES if small else (4096, app.JSON_STREAM_CHUNK_SIZE):
+            if not streams_as(path, chunk_size, expected):
+                return f"{path.relative_to(DATA_DIR)} at chunk size {chunk_size}"
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=300, help="Random terms for the solver checks (default: 300).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random terms and documents.")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=("solve", "ranked", "stream"),
+        default=["solve", "ranked", "stream"],
+        help="Run only these checks.",
+    )
+    args = parser.parse_args()
+
+    failures = run_solver_checks(args.cases, args.seed, args.only)
+    if "stream" in args.only:
+        failures["stream"] = run_stream_checks(args.seed)
+    for name in args.only:
+        message = failures.get(name)
+        print(f"{name:<8} {'FAIL ' + message if message else 'ok'}")
+    if any(failures.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Per-worker memory of the planner with JSON sources versus a shared catalog bundle.
+
+Starts N worker processes the way a pre-fork server does, has every worker plan
+one profile per major and compile every community college agreement, and reports
+each worker's memory while all N are alive. Three setups are compared:
+
+  json     each worker builds its own DataStore from the JSON files
+  bundle   each worker builds its own DataStore, reading the mmap'd catalog bundle
+  preload  the parent runs preload_shared_datastore (bundle-backed) and forks the
+           workers afterwards, so they share its compiled indexes copy-on-write
+
+Memory columns:
+
+  rss  resident pages, including ones shared with other processes
+  pss  proportional set size: shared pages divided among the processes mapping them
+  uss  pages private to the worker
+
+Usage:
+  python benchmarks/worker_memory.py --workers 1 2 4 8
+  python benchmarks/worker_memory.py --bundle cache/catalog.bundle --json memory.json
+
+The bundle is built at --bundle (default: a temporary file) when it does not exist.
+PSS and USS come from /proc/self/smaps_rollup, so this benchmark targets Linux
+(workers are started with fork).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import (  # noqa: E402
+    DATA_DIR,
+    CatalogBundle,
+    DataStore,
+    build_catalog_bundle,
+    get_shared_datastore,
+    preload_shared_datastore,
+    recommendation_engine,
+)
+
+MODES = ("json", "bundle", "preload")
+
+
+def memory_usage() -> Dict[str, Optional[int]]:
+    """RSS, PSS and USS of this process in bytes (None where unavailable)."""
+    usage: Dict[str, Optional[int]] = {"rss": None, "pss": None, "uss": None}
+    try:
+        with open("/proc/self/smaps_rollup", "r", encoding="ascii") as handle:
+            fields = {}
+            for line in handle:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+    except OSError:
+        fields = {}
+    if fields:
+        usage["rss"] = fields.get("Rss")
+        usage["pss"] = fields.get("Pss")
+        usage["uss"] = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    else:
+        try:
+            import resource
+        except ImportError:
+            return usage
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss"] = peak if sys.platform == "darwin" else peak * 1024
+    return usage
+
+
+def _majors() -> List[str]:
+    with (DATA_DIR / "sjsu_majors.json").open("r", encoding="utf-8") as handle:
+        return [entry["major"] for entry in json.load(handle) if entry.get("major")]
+
+
+def _worker(mode: str, bundle_path: Optional[str], barrier: Any, results: Any) -> None:
+    if mode == "preload":
+        datastore = get_shared_datastore()
+    else:
+        datastore = DataStore(DATA_DIR, CatalogBundle(Path(bundle_path)) if mode == "bundle" else None)
+    planned = 0
+    for major in _majors():
+        try:
+            recommendation_engine({"major": major, "units_per_semester": 15}, datastore)
+            planned += 1
+        except (ValueError, FileNotFoundError):
+            continue
+    datastore.warm_cc_articulations(workers=1)
+    # Measure only once every worker is loaded, so shared pages are split N ways
+    barrier.wait()
+    usage = memory_usage()
+    usage["plans"] = planned
+    results.put(usage)
+    barrier.wait()
+
+
+def _start_workers(context: Any, mode: str, workers: int, bundle_path: Optional[str], results: Any) -> None:
+    barrier = context.Barrier(workers)
+    processes = [context.Process(target=_worker, args=(mode, bundle_path, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def _preloading_parent(context: Any, workers: int, bundle_path: str, results: Any) -> None:
+    preload_shared_datastore(DATA_DIR, bundle_path=Path(bundle_path))
+    _start_workers(context, "preload", workers, bundle_path, results)
+
+
+def run(mode: str, workers: int, bundle_path: Path) -> Dict[str, Any]:
+    # The preload setup only makes sense with fork, which is what pre-fork servers use
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    if mode == "preload":
+        # A throwaway parent, so this process's own memory stays out of the picture
+        parent = context.Process(target=_preloading_parent, args=(context, workers, str(bundle_path), results))
+    else:
+        parent = context.Process(target=_start_workers, args=(context, mode, workers, str(bundle_path), results))
+    parent.start()
+    samples = [results.get() for _ in range(workers)]
+    parent.join()
+
+    def mean_mb(key: str) -> Optional[float]:
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        return round(statistics.mean(values) / 1e6, 1) if values else None
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "rss_mb": mean_mb("rss"),
+        "pss_mb": mean_mb("pss"),
+        "uss_mb": mean_mb("uss"),
+        "plans_per_worker": samples[0]["plans"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to measure.")
+    parser.add_argument("--bundle", type=Path, help="Catalog bundle to use (built here if missing).")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="Also write the results as JSON to PATH.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        bundle_path = args.bundle or Path(scratch) / "catalog.bundle"
+        if not bundle_path.exists():
+            build_catalog_bundle(bundle_path).close()
+
+        rows = []
+        for workers in args.workers:
+            for mode in MODES:
+                rows.append(run(mode, workers, bundle_path))
+                row = rows[-1]
+                print(
+                    f"{row['mode']:>7}  workers={row['workers']:<3} rss={row['rss_mb']} MB  "
+                    f"pss={row['pss_mb']} MB  uss={row['uss_mb']} MB  (per worker)",
+                    flush=True,
+                )
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,59 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
+import os
 import time
 
+SCHEDULE_PATH = 'json/schedule.json'
+DELTA_PATH = 'json/schedule_delta.json'
+
+
+def open_seats_delta(previous, current, previous_delta=None):
+    """Return a schedule delta if only "Open Seats" changed between two scrapes, else None.
+
+    previous is schedule.json, which is left alone while deltas are in use, so the
+    delta always describes the current seats relative to it. Class numbers listed
+    in previous_delta (the delta being replaced) are carried over even when their
+    seats went back to the schedule.json value, so a DataStore that applied the
+    older delta is brought up to date too. A seat change on a row without a
+    Class Number cannot be keyed, so it falls back to a full rewrite (None).
+
+    DataStore applies json/schedule_delta.json on load, and again on
+    apply_pending_schedule_delta() or reload_schedule().
+    """
+    def without_seats(row):
+        return {key: value for key, value in row.items() if key != 'Open Seats'}
+
+    if len(previous) != len(current):
+        return None
+    carried = set((previous_delta or {}).get('open_seats') or {})
+    seats = {}
+    for old_row, new_row in zip(previous, current):
+        if without_seats(old_row) != without_seats(new_row):
+            return None
+        class_number = (new_row.get('Class Number') or '').strip()
+        if old_row.get('Open Seats') != new_row.get('Open Seats'):
+            if not class_number:
+                return None
+            seats[class_number] = new_row.get('Open Seats')
+        elif class_number in carried:
+            seats[class_number] = new_row.get('Open Seats')
+    return {"format": "sparq-schedule-delta", "version": 1, "open_seats": seats}
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to a temporary file next to path, then rename it over path.
+
+    os.replace is atomic, so a DataStore loading at the same moment sees either the
+    old file or the complete new one, never a partly written file.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
 # JS code modified to return the JSON string
 js_code = """
 // Get the DataTable instance
@@ -91,10 +142,27 @@ try:
     
     # Parse and save to file
     courses = json.loads(json_str)
-    with open('json/schedule.json', 'w', encoding='utf-8') as f:
-        json.dump(courses, f, indent=2)
-    
-    print("JSON file saved successfully.")
+    delta = None
+    if os.path.exists(SCHEDULE_PATH):
+        previous_delta = None
+        if os.path.exists(DELTA_PATH):
+            try:
+                with open(DELTA_PATH, 'r', encoding='utf-8') as f:
+                    previous_delta = json.load(f)
+            except ValueError:
+                print(f"Ignoring unreadable {DELTA_PATH}.")
+        with open(SCHEDULE_PATH, 'r', encoding='utf-8') as f:
+            delta = open_seats_delta(json.load(f), courses, previous_delta)
+
+    if delta is not None:
+        # Only seat counts moved: ship the small delta and leave schedule.json alone
+        write_json_atomic(DELTA_PATH, delta)
+        print(f"Open seats changed for {len(delta['open_seats'])} sections; delta saved to {DELTA_PATH}.")
+    else:
+        write_json_atomic(SCHEDULE_PATH, courses)
+        if os.path.exists(DELTA_PATH):
+            os.remove(DELTA_PATH)
+        print("JSON file saved successfully.")
     print(f"Number of courses: {len(courses)}")
 
 finally: